@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from event_store import EVENT_TYPE_CODES, MISSING, build_event_columns, build_path_index
+
+
+def _per_path_sum(path_id, mask, n_paths, weights=None):
+    """Sum a boolean mask (or weights) over events, grouped by path segment."""
+    selected = mask & (path_id >= 0)
+    if weights is not None:
+        weights = weights[selected]
+    return np.bincount(path_id[selected], weights=weights, minlength=n_paths)
+
+
+def _safe_ratio(numerator, denominator):
+    """Element-wise division that yields NaN where the denominator is 0."""
+    numerator = numerator.astype(float)
+    denominator = denominator.astype(float)
+    out = np.full(len(numerator), np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def compute_path_analytics(events, columns=None, path_index=None):
+    """Compute planner efficiency metrics for every path segment in the events.
+
+    All metrics are computed with grouped NumPy reductions over the event
+    columns rather than a Python loop per path. Returns a DataFrame with one
+    row per path_calculation_started segment:
+        nodes_expanded:          chosen_node events (A* pops)
+        explored_accepted / explored_rejected / accept_ratio
+        branching_factor:        mean parsed neighbours per neighbour_nodes event
+        re_expansions:           chosen_node events on a cell already expanded in the path
+        wasted_ratio:            re_expansions / nodes_expanded
+        cannot_revisit:          cannot_revisit_node events
+        duration_ms / ms_per_expansion
+        conflict_checks / conflicts_found / conflict_checks_per_expansion
+    """
+    if columns is None:
+        columns = build_event_columns(events)
+    if path_index is None:
+        path_index = build_path_index(columns)
+
+    path_id = path_index['path_id']
+    start_idx = path_index['start_idx']
+    end_idx = path_index['end_idx']
+    n_paths = len(start_idx)
+    if n_paths == 0:
+        return pd.DataFrame()
+
+    event = columns['event']
+    is_chosen = event == EVENT_TYPE_CODES['chosen_node']
+    is_exploring = event == EVENT_TYPE_CODES['exploring_node']
+    is_neighbours = event == EVENT_TYPE_CODES['neighbour_nodes']
+    is_conflict_check = event == EVENT_TYPE_CODES['conflict_check']
+
+    nodes_expanded = _per_path_sum(path_id, is_chosen, n_paths)
+    explored_rejected = _per_path_sum(path_id, is_exploring & columns['rejected'], n_paths)
+    explored_accepted = _per_path_sum(path_id, is_exploring & ~columns['rejected'], n_paths)
+    neighbour_events = _per_path_sum(path_id, is_neighbours, n_paths)
+    neighbour_total = _per_path_sum(path_id, is_neighbours, n_paths, weights=columns['neighbor_count'])
+    conflict_checks = _per_path_sum(path_id, is_conflict_check, n_paths)
+    conflicts_found = _per_path_sum(path_id, is_conflict_check & columns['conflict_found'], n_paths)
+    cannot_revisit = _per_path_sum(path_id, event == EVENT_TYPE_CODES['cannot_revisit_node'], n_paths)
+
+    # Re-expansions: chosen cells that appear more than once within a path. Chosen nodes
+    # without a coordinate (MISSING x / y) have no cell to repeat and are left out
+    located_chosen = is_chosen & (columns['x'] != MISSING) & (columns['y'] != MISSING)
+    chosen_rows = np.flatnonzero(located_chosen & (path_id >= 0))
+    chosen_keys = (
+        path_id[chosen_rows].astype(np.int64) << 42
+        | columns['x'][chosen_rows].astype(np.int64) << 21
+        | columns['y'][chosen_rows].astype(np.int64)
+    )
+    unique_keys = np.unique(chosen_keys)
+    unique_per_path = np.bincount((unique_keys >> 42).astype(np.int64), minlength=n_paths)
+    re_expansions = _per_path_sum(path_id, located_chosen, n_paths) - unique_per_path
+
+    # Duration: end event timestamp, or the last timestamp seen in an unclosed segment
+    timestamp_ms = columns['timestamp_ms']
+    timed = (path_id >= 0) & columns['has_timestamp']
+    last_ts = np.full(n_paths, np.iinfo(np.int64).min)
+    np.maximum.at(last_ts, path_id[timed], timestamp_ms[timed])
+    first_ts = timestamp_ms[start_idx]
+    has_duration = columns['has_timestamp'][start_idx] & (last_ts > np.iinfo(np.int64).min)
+    duration_ms = np.where(has_duration, last_ts - first_ts, 0).astype(float)
+    duration_ms[~has_duration] = np.nan
+
+    bot_ids = np.array(columns['bot_ids'] + [None], dtype=object)
+    src_x = columns['x'][start_idx]
+    src_y = columns['y'][start_idx]
+    dest_coords = [events[i].get('dest', {}).get('coordinate', {}) for i in start_idx] if events else [{}] * n_paths
+
+    return pd.DataFrame({
+        'path': np.arange(n_paths),
+        'bot_id': bot_ids[path_index['bot']],
+        'start_idx': start_idx,
+        'end_idx': end_idx,
+        'src': [f"({x},{y})" for x, y in zip(src_x, src_y)],
+        'dest': [f"({c.get('x')},{c.get('y')})" if c else "(?,?)" for c in dest_coords],
+        'completed': end_idx >= 0,
+        'nodes_expanded': nodes_expanded,
+        'explored_accepted': explored_accepted,
+        'explored_rejected': explored_rejected,
+        'accept_ratio': _safe_ratio(explored_accepted, explored_accepted + explored_rejected),
+        'branching_factor': _safe_ratio(neighbour_total, neighbour_events),
+        're_expansions': re_expansions,
+        'wasted_ratio': _safe_ratio(re_expansions, nodes_expanded),
+        'cannot_revisit': cannot_revisit,
+        'duration_ms': duration_ms,
+        'ms_per_expansion': _safe_ratio(duration_ms, nodes_expanded),
+        'conflict_checks': conflict_checks,
+        'conflicts_found': conflicts_found,
+        'conflict_checks_per_expansion': _safe_ratio(conflict_checks, nodes_expanded),
+    })
+
+
+def compute_path_latencies(events, columns=None, path_index=None):
+    """Get the planning latency of every completed path segment.
+
+    Latency is the difference between the integer millisecond timestamps of the
+    path_calculation_started and path_calculation_ended events. Segments that
+    never ended, or that lack a timestamp on either side, are left out.
+    """
+    if columns is None:
+        columns = build_event_columns(events)
+    if path_index is None:
+        path_index = build_path_index(columns)
+
+    start_idx = path_index['start_idx']
+    end_idx = path_index['end_idx']
+    closed = end_idx >= 0
+    safe_end = np.where(closed, end_idx, 0)
+    has_timestamp = columns['has_timestamp']
+    valid = closed & has_timestamp[start_idx] & has_timestamp[safe_end]
+
+    timestamp_ms = columns['timestamp_ms']
+    start_ms = timestamp_ms[start_idx[valid]]
+    latency_ms = timestamp_ms[end_idx[valid]] - start_ms
+
+    bot_ids = np.array(columns['bot_ids'] + [None], dtype=object)
+    return pd.DataFrame({
+        'path': np.flatnonzero(valid),
+        'bot_id': bot_ids[path_index['bot'][valid]],
+        'start_idx': start_idx[valid],
+        'end_idx': end_idx[valid],
+        'start_time': start_ms.astype('datetime64[ms]'),
+        'latency_ms': latency_ms,
+    })
+
+
+def latency_percentiles(latencies, by):
+    """Summarize latency_ms as count, p50, p90, p99 and max for each group.
+
+    Arguments:
+        latencies: DataFrame from compute_path_latencies
+        by: Column (or list of columns / Series) to group by, e.g. 'bot_id'
+    """
+    if latencies.empty:
+        return pd.DataFrame(columns=['paths', 'p50', 'p90', 'p99', 'max'])
+
+    grouped = latencies.groupby(by)['latency_ms']
+    summary = grouped.quantile([0.5, 0.9, 0.99]).unstack()
+    summary.columns = ['p50', 'p90', 'p99']
+    summary.insert(0, 'paths', grouped.size())
+    summary['max'] = grouped.max()
+    return summary
+
+
+def latency_by_window(latencies, window_seconds):
+    """Latency percentiles per fixed time window of path start times."""
+    if latencies.empty:
+        return latency_percentiles(latencies, 'bot_id')
+    window = latencies['start_time'].dt.floor(f"{int(window_seconds)}s").rename('window')
+    return latency_percentiles(latencies, window)
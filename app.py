@@ -2,17 +2,10 @@ import streamlit as st
 import os
 import json
 import time
+from contextlib import contextmanager
 from datetime import datetime
-import pandas as pd
-import plotly.graph_objects as go
-
-from log_parser import parse_log_to_json
-from visualization import (
-    create_grid_visualization, 
-    display_event_details,
-    display_metrics,
-    display_priority_queue
-)
+
+from dataset_registry import get_registry, is_event_database
 from utils import (
     get_log_files,
     extract_bot_id_from_filename,
@@ -24,6 +17,8 @@ from utils import (
     save_uploaded_file
 )
 
+script_started = time.perf_counter()
+
 # Page configuration
 st.set_page_config(
     page_title="Warehouse Robot Path Visualization",
@@ -40,6 +35,8 @@ st.markdown(
     Upload a log file or select a sample file to begin exploring robot path planning data.
     """
 )
+# Filled at the end of the run (when enabled in the sidebar), once this run's sections are timed
+timing_overlay = st.container()
 
 # Sidebar for file selection and controls
 st.sidebar.header("Data Selection")
@@ -55,7 +52,8 @@ sample_data_path = "log_files"
 sample_files = []
 
 if os.path.exists(sample_data_path):
-    sample_files = [f for f in os.listdir(sample_data_path) if f.endswith('.log')]
+    # Event databases built with event_db.py are opened like logs, one path at a time
+    sample_files = [f for f in os.listdir(sample_data_path) if f.endswith('.log') or is_event_database(f)]
 
 selected_sample = st.sidebar.selectbox(
     "Select a sample log file:",
@@ -68,8 +66,8 @@ if 'play_animation' not in st.session_state:
     st.session_state.play_animation = False
 if 'current_step' not in st.session_state:
     st.session_state.current_step = 0
-if 'parsed_events' not in st.session_state:
-    st.session_state.parsed_events = []
+if 'dataset' not in st.session_state:
+    st.session_state.dataset = None  # handle to the shared parsed log (see dataset_registry)
 if 'bot_id_filter' not in st.session_state:
     st.session_state.bot_id_filter = None
 if 'path_filter' not in st.session_state:
@@ -90,6 +88,308 @@ if 'event_type_filters' not in st.session_state:
     }
 if 'filter_navigation' not in st.session_state:
     st.session_state.filter_navigation = False
+if 'grid_viewport' not in st.session_state:
+    st.session_state.grid_viewport = None
+if 'interaction_timings' not in st.session_state:
+    st.session_state.interaction_timings = []
+if 'rerun_id' not in st.session_state:
+    st.session_state.rerun_id = 0
+st.session_state.rerun_id += 1
+# Whether the current run executes the whole script (False while only a fragment reruns)
+st.session_state.full_run = True
+
+# Seconds between refreshes while a log is parsed in the background
+PARSE_REFRESH_SECONDS = 0.5
+# Section timings kept per session (a rolling history of the last reruns)
+MAX_INTERACTION_TIMINGS = 5000
+
+def record_interaction_timing(scope, started):
+    """Record how long a section, a fragment or the whole app ('app') took in this rerun, in milliseconds."""
+    timings = st.session_state.interaction_timings
+    timings.append({
+        'run': st.session_state.rerun_id,
+        'scope': scope,
+        'ms': (time.perf_counter() - started) * 1000,
+        'at': time.time()
+    })
+    del timings[:-MAX_INTERACTION_TIMINGS]
+
+@contextmanager
+def timed_section(scope):
+    """Time the code in the with block as one section of the current rerun."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_interaction_timing(scope, started)
+
+def percentile(sorted_values, share):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(int(round(share * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def timing_summary(timings):
+    """Summarize the recorded timings: p50 / p95 / last per section, slowest p50 first."""
+    by_scope = {}
+    for timing in timings:
+        by_scope.setdefault(timing['scope'], []).append(timing['ms'])
+    rows = []
+    for scope, values in by_scope.items():
+        ordered = sorted(values)
+        rows.append({
+            'section': scope,
+            'reruns': len(values),
+            'p50_ms': percentile(ordered, 0.50),
+            'p95_ms': percentile(ordered, 0.95),
+            'last_ms': values[-1]
+        })
+    rows.sort(key=lambda row: row['p50_ms'], reverse=True)
+    return rows
+
+def timings_csv(timings):
+    lines = ["run,section,ms,unix_time"]
+    lines.extend(f"{t['run']},{t['scope']},{t['ms']:.3f},{t['at']:.3f}" for t in timings)
+    return "\n".join(lines) + "\n"
+
+def display_timing_overlay(timings):
+    """Debug overlay: p50 / p95 per app section over the rolling history, with export."""
+    with st.expander("⏱️ Rerun timings", expanded=True):
+        if not timings:
+            st.caption("No timings recorded yet.")
+            return
+        runs = len({timing['run'] for timing in timings})
+        st.caption(f"{len(timings):,} section timings over the last {runs:,} reruns "
+                   "(fragment reruns show up on the next full rerun).")
+        st.dataframe(timing_summary(timings), use_container_width=True, hide_index=True, column_config={
+            'p50_ms': st.column_config.NumberColumn("p50 ms", format="%.1f"),
+            'p95_ms': st.column_config.NumberColumn("p95 ms", format="%.1f"),
+            'last_ms': st.column_config.NumberColumn("last ms", format="%.1f")
+        })
+        export_col1, export_col2, export_col3 = st.columns(3)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        export_col1.download_button(
+            label="Download CSV",
+            data=lambda: timings_csv(timings),
+            file_name=f"rerun_timings_{stamp}.csv",
+            mime="text/csv",
+            key="timings_csv"
+        )
+        export_col2.download_button(
+            label="Download JSON",
+            data=lambda: json.dumps(timings, indent=2),
+            file_name=f"rerun_timings_{stamp}.json",
+            mime="application/json",
+            key="timings_json"
+        )
+        export_col3.button("Clear timings", key="timings_clear", on_click=timings.clear)
+
+def cached_view_data(name, key, compute):
+    """Get a value derived from the filtered events, recomputed only when key changes."""
+    cache = st.session_state.setdefault('view_cache', {})
+    entry = cache.get(name)
+    if entry is None or entry[0] != key:
+        entry = cache[name] = (key, compute())
+    return entry[1]
+
+def compute_log_analytics(events):
+    """Compute the inputs of the analytics panels, building the event columns and path index once."""
+    columns = build_event_columns(events)
+    path_index = build_path_index(columns)
+    return {
+        'paths': compute_path_analytics(events, columns, path_index),
+        'latencies': compute_path_latencies(events, columns, path_index),
+        'hotspots': build_hotspot_index(events, columns),
+    }
+
+def build_event_table(events):
+    """Build the event table: one row per event, coordinates as text, nested columns dropped."""
+    # pandas is only loaded once the table is built
+    import pandas as pd
+    
+    # Convert to DataFrame for display
+    df = pd.DataFrame(events)
+    
+    # Format coordinate columns for better readability
+    if 'coordinate' in df.columns:
+        df['coordinate'] = df['coordinate'].apply(
+            lambda x: f"({x.get('x')}, {x.get('y')})" if isinstance(x, dict) and 'x' in x and 'y' in x else None
+        )
+    
+    if 'from_coordinate' in df.columns:
+        df['from_coordinate'] = df['from_coordinate'].apply(
+            lambda x: f"({x.get('x')}, {x.get('y')})" if isinstance(x, dict) and 'x' in x and 'y' in x else None
+        )
+    
+    # Drop unnecesary columns for display
+    cols_to_drop = [col for col in df.columns if isinstance(df[col].iloc[0] if not df.empty else None, (dict, list))]
+    return df.drop(columns=cols_to_drop, errors='ignore')
+
+def animation_tick_seconds():
+    """Seconds between animation steps while playing, None when paused."""
+    return 0.2 / st.session_state.speed if st.session_state.play_animation else None
+
+def reset_grid_viewport():
+    st.session_state.grid_viewport = None
+
+def sync_step_from_slider():
+    st.session_state.current_step = st.session_state.step_slider
+    st.session_state.play_animation = False  # Stop animation when manually changing step
+
+@st.fragment
+def analytics_panel(display_function, events, precomputed):
+    """Show an analytics panel; its own widgets rerun only the panel."""
+    display_function(events, precomputed)
+
+def step_view(filtered_events, min_x, min_y, max_x, max_y, tick_seconds):
+    """Step controls, grid, event details and priority queue.
+
+    Run as a fragment (run_every=tick_seconds while the animation plays), so
+    stepping reruns only this view instead of the whole app.
+    """
+    started = time.perf_counter()
+    if not st.session_state.full_run:
+        st.session_state.rerun_id += 1
+    max_step = len(filtered_events) - 1
+    if max_step >= 0:
+        st.session_state.current_step = min(st.session_state.current_step, max_step)
+
+    # Auto-advance animation if playing, using filtered navigation
+    if tick_seconds is not None and not st.session_state.full_run:
+        next_step = find_filtered_event_index(
+            filtered_events,
+            st.session_state.current_step,
+            'next',
+            st.session_state.event_type_filters
+        )
+        # If we couldn't advance (at the end or no matching events), stop animation
+        if next_step == st.session_state.current_step:
+            st.session_state.play_animation = False
+        else:
+            st.session_state.current_step = next_step
+
+    # A box selection on the grid zooms into that region; apply each new selection once
+    grid_selection = st.session_state.get('grid_chart')
+    selection_boxes = grid_selection.selection.box if grid_selection and grid_selection.selection else []
+    if selection_boxes and selection_boxes != st.session_state.get('last_grid_selection'):
+        box = selection_boxes[-1]
+        st.session_state.grid_viewport = (
+            int(min(box['x'])), int(min(box['y'])),
+            int(max(box['x'])) + 1, int(max(box['y'])) + 1
+        )
+        st.session_state.last_grid_selection = selection_boxes
+
+    # Step slider (a single event, e.g. early in a background parse, has no range to slide over)
+    if max_step > 0:
+        st.session_state.step_slider = min(st.session_state.current_step, max_step)
+        st.slider("Step", 0, max_step, key="step_slider", on_change=sync_step_from_slider)
+
+    # Step buttons and jump to event ID
+    col1, col2, col3, jump_col1, jump_col2 = st.columns([1, 1, 1, 2, 1], vertical_alignment="bottom")
+    with col1:
+        if st.button("⏮️ First"):
+            st.session_state.current_step = 0
+            st.session_state.play_animation = False
+
+    with col2:
+        if st.button("⏪ Previous"):
+            st.session_state.current_step = find_filtered_event_index(
+                filtered_events,
+                st.session_state.current_step,
+                'previous',
+                st.session_state.event_type_filters
+            )
+            st.session_state.play_animation = False
+
+    with col3:
+        if st.button("⏩ Next"):
+            st.session_state.current_step = find_filtered_event_index(
+                filtered_events,
+                st.session_state.current_step,
+                'next',
+                st.session_state.event_type_filters
+            )
+            st.session_state.play_animation = False
+
+    with jump_col1:
+        # A loaded segment keeps its full-log event ids, so bound by the ids shown
+        max_event_id = max((event.get('event_id', 0) for event in filtered_events), default=0)
+        event_id_input = st.number_input("Jump to Event ID", min_value=1, max_value=max(max_event_id, max_step+1, 1), step=1, value=1)
+    with jump_col2:
+        if st.button("Jump"):
+            # Find the index of the event with the specified event_id
+            for i, event in enumerate(filtered_events):
+                if event.get('event_id') == event_id_input:
+                    st.session_state.current_step = i
+                    st.session_state.play_animation = False  # Stop animation when jumping
+                    break
+
+    # grid visualization and event details
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        if filtered_events:
+            # Pass all event types as visible for visualization regardless of filter settings
+            # This ensures the plot is not affected by the filter settings
+            visualization_filters = {
+                'chosen_node': True,
+                'exploring_node': True,
+                'processing_node': True,
+                'conflict_check': True,
+                'conflict_detected': True,
+                'pause_node': True,
+                'cannot_revisit_node': True,
+                'neighbour_nodes': True,
+            }
+            with timed_section('grid figure'):
+                grid_fig = create_grid_visualization(
+                    filtered_events,
+                    st.session_state.current_step,
+                    min_x, min_y, max_x, max_y,
+                    event_type_filters=visualization_filters,
+                    spatial_index=st.session_state.spatial_index,
+                    viewport=st.session_state.grid_viewport,
+                    tile_pyramid=st.session_state.tile_pyramid
+                )
+                grid_fig.update_layout(dragmode='select')
+                st.plotly_chart(grid_fig, use_container_width=True, key="grid_chart",
+                                on_select="rerun", selection_mode="box")
+            if st.session_state.grid_viewport:
+                view_col1, view_col2 = st.columns([3, 1])
+                with view_col1:
+                    st.caption(f"Zoomed to x {st.session_state.grid_viewport[0]}–{st.session_state.grid_viewport[2]}, "
+                               f"y {st.session_state.grid_viewport[1]}–{st.session_state.grid_viewport[3]}")
+                with view_col2:
+                    st.button("Reset Zoom", on_click=reset_grid_viewport)
+            else:
+                st.caption("Drag a box on the grid to zoom into a region.")
+        else:
+            st.warning("No events to visualize. Try selecting a different file or bot ID.")
+
+    with col2:
+        if 0 <= st.session_state.current_step < len(filtered_events):
+            current_event = filtered_events[st.session_state.current_step]
+            event_type = current_event.get('event')
+
+            # Checking if the current event type is filtered out
+            if event_type in st.session_state.event_type_filters and not st.session_state.event_type_filters[event_type]:
+                st.warning(f"Current event type '{event_type}' is filtered out in visualization. Enable it in the filters to see details.")
+            with timed_section('event details'):
+                display_event_details(current_event)
+        else:
+            st.warning("No event data available for the current step.")
+
+    # Priority Queue Visualization
+    st.markdown("---")
+    st.subheader("Priority Queue Visualization")
+    st.markdown("This section shows the nodes currently in the priority queue during the A* path finding algorithm.")
+    with timed_section('priority queue'):
+        display_priority_queue(filtered_events, st.session_state.current_step)
+
+    record_interaction_timing('step_view', started)
+    if not st.session_state.full_run:
+        # Starting or stopping the animation changes the fragment's timer, set by the whole app
+        if animation_tick_seconds() != tick_seconds:
+            st.rerun()
 
 # function to find the next/previous event that matches the selected event types
 def find_filtered_event_index(events, current_index, direction, event_type_filters):
@@ -131,25 +431,78 @@ def find_filtered_event_index(events, current_index, direction, event_type_filte
 log_file_path = None
 
 if uploaded_file:
-    log_file_path = save_uploaded_file(uploaded_file)
+    # Each upload is saved once; reruns reuse its file, so the dataset and step are kept
+    if st.session_state.get('upload_id') != uploaded_file.file_id:
+        st.session_state.upload_path = save_uploaded_file(uploaded_file)
+        st.session_state.upload_id = uploaded_file.file_id
+    log_file_path = st.session_state.upload_path
     st.sidebar.success(f"File uploaded: {uploaded_file.name}")
 elif selected_sample:
     log_file_path = os.path.join(sample_data_path, selected_sample)
     st.sidebar.success(f"Using sample file: {selected_sample}")
 
 if log_file_path:
+    # The analysis stack (NumPy, pandas, Plotly) is loaded only once a log is opened
+    from analytics import compute_path_analytics, compute_path_latencies
+    from conflict_index import build_hotspot_index
+    from event_filter import compile_filter
+    from event_store import build_event_columns, build_path_index
+    from log_parser import profile_log_file
+    from spatial_index import build_spatial_index, build_tile_pyramid
+    from visualization import (
+        create_grid_visualization, 
+        display_conflict_hotspots,
+        display_event_details,
+        display_latency_analytics,
+        display_metrics,
+        display_parser_profile,
+        display_path_analytics,
+        display_priority_queue
+    )
+    
     # Extracting bot_id from filename 
     bot_id = extract_bot_id_from_filename(os.path.basename(log_file_path))
     
-    if not st.session_state.parsed_events or st.session_state.get('last_file') != log_file_path:
-        with st.spinner("Parsing log file..."):
-            parsed_events = parse_log_to_json(log_file_path)
-            st.session_state.parsed_events = parsed_events
-            st.session_state.last_file = log_file_path
-            st.session_state.current_step = 0
-            st.session_state.play_animation = False
+    if st.session_state.get('last_file') != log_file_path or st.session_state.dataset is None:
+        # Sessions opening the same content share one dataset, parsed once per process.
+        # Small logs are parsed in a worker thread (the page refreshes with each batch of
+        # events); large logs are indexed by path segment and parsed when a path is selected.
+        previous_dataset = st.session_state.dataset
+        with st.spinner("Loading log file..."), timed_section('load log'):
+            st.session_state.dataset = get_registry().acquire(log_file_path)
+        if previous_dataset is not None:
+            previous_dataset.release()
+        st.session_state.last_file = log_file_path
+        st.session_state.current_step = 0
+        st.session_state.play_animation = False
+        st.session_state.shown_event_count = 0
     
-    bot_ids = get_unique_bot_ids(st.session_state.parsed_events)
+    dataset = st.session_state.dataset.dataset
+    parse_job = dataset.parse_job
+    path_offset_index = dataset.path_offset_index
+    parsed_events = dataset.events()
+    if parse_job is not None and not parse_job.done:
+        parsed_fraction = parse_job.bytes_done / parse_job.total_bytes if parse_job.total_bytes else 0.0
+        st.sidebar.progress(
+            min(parsed_fraction, 1.0),
+            text=f"Parsing log: {parse_job.lines_per_second():,.0f} lines/s, "
+                 f"{parse_job.bytes_remaining() / 1e6:,.1f} MB remaining"
+        )
+        # The views show the events parsed when first opened or when asked for, so the spatial
+        # index, columns and analytics are not rebuilt on every refresh (only again once parsed)
+        shown_count = st.session_state.get('shown_event_count', 0)
+        new_count = len(parsed_events) - shown_count
+        if st.sidebar.button(f"Show {new_count:,} new events", key="show_new_events",
+                             disabled=new_count <= 0) or not shown_count:
+            shown_count = st.session_state.shown_event_count = len(parsed_events)
+        parsed_events = parsed_events[:shown_count]
+    if dataset.refcount > 1:
+        st.sidebar.caption(f"Log shared with {dataset.refcount - 1} other session(s); parsed once.")
+    
+    if path_offset_index is not None:
+        bot_ids = path_offset_index.bot_ids()
+    else:
+        bot_ids = get_unique_bot_ids(parsed_events)
     
     # Bot ID filter in sidebar
     st.sidebar.markdown("---")
@@ -161,16 +514,44 @@ if log_file_path:
         index=0 if "All" not in bot_ids else bot_ids.index(bot_id) + 1 if bot_id in bot_ids else 0
     )
     
+    st.session_state.bot_id_filter = selected_bot if selected_bot != "All" else None
+    
+    if path_offset_index is not None:
+        # Only the selected path segment is parsed (and cached by the index)
+        segments = path_offset_index.segments_for_bot(st.session_state.bot_id_filter)
+        if is_event_database(log_file_path):
+            st.sidebar.caption(f"Event database: {path_offset_index.path_count():,} paths from "
+                               f"{path_offset_index.log_count():,} logs, each loaded when selected.")
+        else:
+            st.sidebar.caption(f"Large log: {len(path_offset_index)} paths indexed, each parsed when selected.")
+        if segments:
+            selected_path = st.sidebar.selectbox(
+                "Select Path to Visualize:",
+                [segment['label'] for segment in segments],
+                index=0
+            )
+            selected_segment = next(segment for segment in segments if segment['label'] == selected_path)
+            with st.spinner("Parsing path segment..."), timed_section('parse path segment'):
+                parsed_events = path_offset_index.load_segment(selected_segment['segment'])
+            st.session_state.path_filter = selected_path
+            if st.session_state.get('last_path') != selected_path:
+                st.session_state.current_step = 0
+                st.session_state.last_path = selected_path
+        else:
+            st.session_state.path_filter = None
+    
     # bot ID filter
-    filtered_events = st.session_state.parsed_events
-    if selected_bot != "All":
-        filtered_events = get_events_by_bot_id(filtered_events, selected_bot)
-        st.session_state.bot_id_filter = selected_bot
-    else:
-        st.session_state.bot_id_filter = None
+    filtered_events = parsed_events
+    if st.session_state.bot_id_filter:
+        with timed_section('bot filter'):
+            filtered_events = get_events_by_bot_id(filtered_events, selected_bot)
         
     # Path selection dropdown
-    path_events = get_path_calculation_events(filtered_events)  
+    with timed_section('path events'):
+        path_events = get_path_calculation_events(filtered_events) if path_offset_index is None else []
+    if parse_job is not None and not parse_job.done:
+        # A path without its end event yet may still be growing
+        path_events = [path for path in path_events if path['end_idx'] is not None]
     
     if path_events:
         path_options = ["All Paths"] + [path['label'] for path in path_events]      
@@ -186,11 +567,12 @@ if log_file_path:
 
             if selected_path_event:
                 # Filter events to show only those between start and end of the selected path
-                filtered_events = filter_events_by_path(
-                    filtered_events, 
-                    selected_path_event['start_idx'], 
-                    selected_path_event['end_idx']
-                )
+                with timed_section('path filter'):
+                    filtered_events = filter_events_by_path(
+                        filtered_events, 
+                        selected_path_event['start_idx'], 
+                        selected_path_event['end_idx']
+                    )
                 st.session_state.path_filter = selected_path
                 
                 # Reset current step when path changes
@@ -200,40 +582,56 @@ if log_file_path:
         else:
             st.session_state.path_filter = None
     
-    # Animation controls in sidebar
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("Animation Controls")
+    # Filter expression, evaluated as NumPy masks over the columns of the selected events
+    filter_expression = st.sidebar.text_input(
+        "Filter expression:",
+        key="filter_expression",
+        placeholder="event in (conflict_check, pause_node) and x between 100 and 140",
+        help="Fields: event, bot_id, x, y, from_x, from_y, t, neighbor_count, conflict_type, direction, "
+             "rejected, conflict_found. Combine conditions (==, !=, <, <=, >, >=, in (...), between ... and ...) "
+             "with and / or / not; times are 10:02:03 or '2024-05-01 10:02:03'."
+    ).strip()
+    if filter_expression:
+        try:
+            expression = compile_filter(filter_expression)
+        except ValueError as e:
+            st.sidebar.error(f"Invalid filter expression: {e}")
+            filter_expression = ''
+        else:
+            columns_key = (st.session_state.get('last_file'), selected_bot, st.session_state.path_filter,
+                           len(filtered_events))
+            with timed_section('filter expression'):
+                filter_columns = cached_view_data(
+                    'filter_columns', columns_key, lambda: build_event_columns(filtered_events)
+                )
+                filtered_events = [filtered_events[row] for row in expression.rows(filter_columns).tolist()]
+    if st.session_state.get('last_filter_expression', '') != filter_expression:
+        st.session_state.current_step = 0
+        st.session_state.last_filter_expression = filter_expression
     
-    max_step = len(filtered_events) - 1
-    if max_step >= 0:
-        st.session_state.current_step = min(st.session_state.current_step, max_step)
+    # Spatial index and level-of-detail tiles over the filtered events, rebuilt only when the
+    # selection changes or a background parse adds events
+    selection_key = (st.session_state.get('last_file'), selected_bot, st.session_state.path_filter,
+                     filter_expression)
+    index_key = selection_key + (len(filtered_events),)
+    if st.session_state.get('spatial_index_key') != index_key:
+        with timed_section('spatial index'):
+            event_columns = build_event_columns(filtered_events)
+            st.session_state.spatial_index = build_spatial_index(filtered_events, event_columns)
+            st.session_state.tile_pyramid = build_tile_pyramid(filtered_events, event_columns)
+        if st.session_state.get('spatial_index_key', ())[:-1] != selection_key:
+            st.session_state.grid_viewport = None
+        st.session_state.spatial_index_key = index_key
     
-    # Step slider
-    step_slider = st.sidebar.slider(
-        "Step",
-        0, max(max_step, 0),
-        min(st.session_state.current_step, max(max_step, 0)),
-        key="step_slider"
-    )
+    # Grid boundaries only change with the selection or as a background parse adds events
+    with timed_section('grid bounds'):
+        min_x, min_y, max_x, max_y = cached_view_data(
+            'grid_bounds', index_key, lambda: get_min_max_coordinates(filtered_events)
+        )
     
-    # Updating current step if slider changed
-    if step_slider != st.session_state.current_step:
-        st.session_state.current_step = step_slider
-        st.session_state.play_animation = False  # Stop animation when manually changing step
-
-    # Jump to event ID
+    # Animation controls in sidebar (stepping controls are next to the grid, see step_view)
     st.sidebar.markdown("---")
-    jump_col1, jump_col2 = st.sidebar.columns([3, 1])
-    with jump_col1:
-        event_id_input = st.number_input("Jump to Event ID", min_value=1, max_value=max(max_step+1, 1), step=1, value=1)
-    with jump_col2:
-        if st.button("Jump"):
-            # Find the index of the event with the specified event_id
-            for i, event in enumerate(filtered_events):
-                if event.get('event_id') == event_id_input:
-                    st.session_state.current_step = i
-                    st.session_state.play_animation = False  # Stop animation when jumping
-                    break
+    st.sidebar.subheader("Animation Controls")
     
     # Play/Pause button
     play_text = "⏸️ Pause" if st.session_state.play_animation else "▶️ Play"
@@ -247,33 +645,6 @@ if log_file_path:
         help="When enabled, Next/Previous buttons will skip to events of selected types only"
     )
     
-    # Step buttons
-    col1, col2, col3 = st.sidebar.columns(3)
-    with col1:
-        if st.button("⏮️ First"):
-            st.session_state.current_step = 0
-            st.session_state.play_animation = False
-    
-    with col2:
-        if st.button("⏪ Previous"):
-            st.session_state.current_step = find_filtered_event_index(
-                filtered_events, 
-                st.session_state.current_step, 
-                'previous', 
-                st.session_state.event_type_filters
-            )
-            st.session_state.play_animation = False
-    
-    with col3:
-        if st.button("⏩ Next"):
-            st.session_state.current_step = find_filtered_event_index(
-                filtered_events, 
-                st.session_state.current_step, 
-                'next', 
-                st.session_state.event_type_filters
-            )
-            st.session_state.play_animation = False
-    
     # Speed control
     st.session_state.speed = st.sidebar.slider(
         "Animation Speed",
@@ -283,6 +654,7 @@ if log_file_path:
         step=0.1
     )
 
+
     # Event type filters
     st.sidebar.markdown("---")
     st.sidebar.subheader("Event Type Filters")
@@ -342,6 +714,8 @@ if log_file_path:
         filter_info.append(f"Bot ID: {st.session_state.bot_id_filter}")
     if st.session_state.path_filter:
         filter_info.append(f"Path: {st.session_state.path_filter}")
+    if filter_expression:
+        filter_info.append(f"Expression: {filter_expression}")
 
     # Adding event type filters to the filter info
     event_filters = [k for k, v in st.session_state.event_type_filters.items() if not v]
@@ -351,88 +725,63 @@ if log_file_path:
     if filter_info:
         st.info(f"Filtered to show: {' | '.join(filter_info)}")                    
   
-    # grid boundaries
-    min_x, min_y, max_x, max_y = get_min_max_coordinates(filtered_events)
-    
-    # grid visualization and event details
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        if filtered_events:
-            # Pass all event types as visible for visualization regardless of filter settings
-            # This ensures the plot is not affected by the filter settings
-            visualization_filters = {
-                'chosen_node': True,
-                'exploring_node': True,
-                'processing_node': True,
-                'conflict_check': True,
-                'conflict_detected': True,
-                'pause_node': True,
-                'cannot_revisit_node': True,
-                'neighbour_nodes': True,
-            }
-            grid_fig = create_grid_visualization(
-                filtered_events, 
-                st.session_state.current_step,
-                min_x, min_y, max_x, max_y,
-                event_type_filters=visualization_filters
-            )
-            st.plotly_chart(grid_fig, use_container_width=True)
-        else:
-            st.warning("No events to visualize. Try selecting a different file or bot ID.")
-    
-    with col2:
-        if 0 <= st.session_state.current_step < len(filtered_events):
-            current_event = filtered_events[st.session_state.current_step]
-            event_type = current_event.get('event')
-            
-            # Checking if the current event type is filtered out
-            if event_type in st.session_state.event_type_filters and not st.session_state.event_type_filters[event_type]:
-                st.warning(f"Current event type '{event_type}' is filtered out in visualization. Enable it in the filters to see details.")
-            display_event_details(current_event)
-        else:
-            st.warning("No event data available for the current step.")
-            
-    # Priority Queue Visualization
-    st.markdown("---")
-    st.subheader("Priority Queue Visualization")
-    st.markdown("This section shows the nodes currently in the priority queue during the A* path finding algorithm.")
-    display_priority_queue(filtered_events, st.session_state.current_step)
+    # Stepping reruns only this fragment; the panels below rerun when the data or filters change
+    tick_seconds = animation_tick_seconds()
+    st.fragment(step_view, run_every=tick_seconds)(
+        filtered_events, min_x, min_y, max_x, max_y, tick_seconds
+    )
     
     # Metrics and statistics
     st.markdown("---")
     st.subheader("Path Planning Metrics")
-    display_metrics(filtered_events)
+    with timed_section('metrics'):
+        display_metrics(filtered_events)
+    
+    # Large logs only hold the selected path segment in memory
+    analytics_scope = "all paths" if path_offset_index is None else "loaded path"
+    # Computed once per dataset (and loaded segment) for every session that opened the log
+    with timed_section('analytics'):
+        analytics = dataset.derived(
+            'analytics',
+            (st.session_state.path_filter if path_offset_index is not None else None, len(parsed_events)),
+            lambda: compute_log_analytics(parsed_events)
+        )
+    
+    # Planner efficiency across every path in the log
+    with st.expander(f"Planner Efficiency ({analytics_scope})"):
+        analytics_panel(display_path_analytics, parsed_events, analytics['paths'])
+    
+    # Planning latency distribution across every path in the log
+    with st.expander(f"Planning Latency ({analytics_scope})"):
+        analytics_panel(display_latency_analytics, parsed_events, analytics['latencies'])
+    
+    # Contested cells across every path in the log
+    with st.expander(f"Conflict Hotspots ({analytics_scope})"):
+        analytics_panel(display_conflict_hotspots, parsed_events, analytics['hotspots'])
+    
+    # Opt-in: re-parses the whole file with per-handler timing, once per dataset
+    with st.expander("Parser Profile"):
+        if st.button("Profile parsing of this log", key="profile_parser"):
+            st.session_state.parser_profile_file = log_file_path
+        if st.session_state.get('parser_profile_file') == log_file_path:
+            with st.spinner("Profiling parser..."):
+                profile = dataset.derived('parser_profile', None, lambda: profile_log_file(log_file_path))
+            display_parser_profile(profile)
+        else:
+            st.caption("Time each tag handler, count unmatched and dropped lines and fallback hits.")
     
     # Event table 
     st.markdown("---")
-    with st.expander("View Event Data Table"):
+    with st.expander("View Event Data Table"), timed_section('event table'):
         if filtered_events:
-            # Convert to DataFrame for display
-            df = pd.DataFrame(filtered_events)
-            
-            # Format coordinate columns for better readability
-            if 'coordinate' in df.columns:
-                df['coordinate'] = df['coordinate'].apply(
-                    lambda x: f"({x.get('x')}, {x.get('y')})" if isinstance(x, dict) and 'x' in x and 'y' in x else None
-                )
-            
-            if 'from_coordinate' in df.columns:
-                df['from_coordinate'] = df['from_coordinate'].apply(
-                    lambda x: f"({x.get('x')}, {x.get('y')})" if isinstance(x, dict) and 'x' in x and 'y' in x else None
-                )
-            
-            # Drop unnecesary columns for display
-            cols_to_drop = [col for col in df.columns if isinstance(df[col].iloc[0] if not df.empty else None, (dict, list))]
-            display_df = df.drop(columns=cols_to_drop, errors='ignore')
+            display_df = cached_view_data('event_table', index_key, lambda: build_event_table(filtered_events))
             
             st.dataframe(display_df)
             
-            # Download button for CSV
-            csv = display_df.to_csv(index=False)
+            # Download button for CSV (written only when clicked)
             st.download_button(
                 label="Download CSV",
-                data=csv,
+                data=lambda: display_df.to_csv(index=False),
                 file_name=f"robot_path_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )
@@ -441,7 +790,7 @@ if log_file_path:
     
     # JSON preview 
     st.markdown("---")
-    with st.expander("View JSON Data Preview"):
+    with st.expander("View JSON Data Preview"), timed_section('json preview'):
         if filtered_events:
             preview_limit = min(5, len(filtered_events))
             preview_events = filtered_events[:preview_limit]
@@ -454,41 +803,36 @@ if log_file_path:
             
             st.code(preview_json, language="json")
             
-            # Download button for full JSON
-            full_json_str = json.dumps(filtered_events, indent=2)
+            # Download button for full JSON (serialized only when clicked)
             st.download_button(
                 label="Download Full JSON",
-                data=full_json_str,
+                data=lambda: json.dumps(filtered_events, indent=2),
                 file_name=f"robot_path_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json"
             )
         else:
             st.warning("No JSON data available.")
     
-    # Auto-advance animation if playing
-    if st.session_state.play_animation and st.session_state.current_step < max_step:
-        time.sleep(0.2 / st.session_state.speed)  # Adjust speed based on slider
-        # st.session_state.current_step += 1
-        
-        # Using filtered navigation 
-        next_step = find_filtered_event_index(
-            filtered_events, 
-            st.session_state.current_step, 
-            'next', 
-            st.session_state.event_type_filters
-        )
-        
-        # If we couldn't advance (at the end or no matching events), stop animation
-        if next_step == st.session_state.current_step:
-            st.session_state.play_animation = False
-        else:
-            st.session_state.current_step = next_step
-        st.rerun()
+    st.session_state.full_run = False
 
 else:
     # No file selected yet
     st.info("Please upload a log file or select a sample file to begin.")
 
+record_interaction_timing('app', script_started)
+
+# Debug overlay at the top of the page
+st.sidebar.markdown("---")
+if st.sidebar.checkbox("Show rerun timings", key="show_timing_overlay",
+                       help="p50 / p95 of each app section over the last reruns, with export"):
+    with timing_overlay:
+        display_timing_overlay(st.session_state.interaction_timings)
+
+# Keep refreshing while the log is still being parsed in the background
+if log_file_path and parse_job is not None and not parse_job.done:
+    time.sleep(PARSE_REFRESH_SECONDS)
+    st.rerun()
+
 # Footer
 st.markdown("---")
 st.caption("Warehouse Robot Path Visualization Tool")
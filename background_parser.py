@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+
+from log_parser import PathLogParser
+
+
+class BackgroundParse:
+    """
+    Parses a log file in a worker thread.
+    The parser publishes its events after every chunk, so the paths that are
+    already complete can be shown while the rest of the file is parsed.
+    A thread (rather than a process) lets the UI read the event dictionaries
+    directly, without pickling them across.
+    """
+
+    def __init__(self, log_file_path):
+        self.log_file_path = log_file_path
+        self.total_bytes = os.path.getsize(log_file_path)
+        self.bytes_done = 0
+        self.lines_done = 0
+        self.started_at = None
+        self.finished_at = None
+        self._parser = PathLogParser()
+        self._result = None
+        self._published = 0
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start parsing in the background and return self."""
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Ask the worker to stop after the current chunk."""
+        self._cancelled.set()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def events(self):
+        """Get the events parsed so far (every event of each finished chunk)."""
+        if self.done:
+            return self._result
+        return self._parser.events[:self._published]
+
+    def lines_per_second(self):
+        """Get the average parse rate since the worker started."""
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return self.lines_done / elapsed if elapsed > 0 else 0.0
+
+    def bytes_remaining(self):
+        return max(self.total_bytes - self.bytes_done, 0)
+
+    def wait(self, timeout=None):
+        """Block until the worker finishes (or timeout seconds pass); return done."""
+        self._thread.join(timeout)
+        return self.done
+
+    def _on_progress(self, bytes_read, lines_read):
+        self.bytes_done = bytes_read
+        self.lines_done = lines_read
+        self._published = len(self._parser.events)
+        return not self._cancelled.is_set()
+
+    def _run(self):
+        try:
+            self._result = self._parser.parse_log_file(self.log_file_path, progress=self._on_progress)
+        finally:
+            if self._result is None:
+                self._result = []
+            self.finished_at = time.perf_counter()
+
+
+def start_background_parse(log_file_path):
+    """Start parsing a log file in a worker thread and return the BackgroundParse."""
+    return BackgroundParse(log_file_path).start()
@@ -0,0 +1,64 @@
+"""
+Per-interaction latency of the Streamlit app.
+Opens a log with AppTest, moves the step slider repeatedly and reports the
+p50 / p95 of the timings the app records for each rerun: 'app' is the whole
+script (what every interaction cost before the page was split into
+fragments), 'step_view' is the stepping fragment alone (what a step costs in
+a browser session, where only the fragment reruns); the other rows are the
+app's timed sections (grid figure, priority queue, metrics, ...).
+
+Usage: python benchmarks/bench_app_interactions.py <log file> [steps]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    log_file_path = os.path.abspath(sys.argv[1])
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app lists sample logs from ./log_files
+        os.makedirs(os.path.join(tmp, 'log_files'))
+        shutil.copy(log_file_path, os.path.join(tmp, 'log_files', os.path.basename(log_file_path)))
+        os.chdir(tmp)
+
+        at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=600)
+        at.run()
+        at.sidebar.selectbox[0].select(os.path.basename(log_file_path)).run()
+        parse_job = at.session_state['dataset'].dataset.parse_job
+        if parse_job is not None:
+            parse_job.wait()
+        at.run()
+        if at.exception:
+            sys.exit(at.exception)
+
+        max_step = at.slider(key='step_slider').max
+        at.session_state['interaction_timings'] = []
+        for i in range(1, steps + 1):
+            at.slider(key='step_slider').set_value(i * max_step // (steps + 1)).run()
+            if at.exception:
+                sys.exit(at.exception)
+
+        timings = at.session_state['interaction_timings']
+        print(f"{len(parse_job.events() if parse_job else [])} events, {steps} steps")
+        by_scope = {}
+        for timing in timings:
+            by_scope.setdefault(timing['scope'], []).append(timing['ms'])
+        for scope, ms in sorted(by_scope.items(), key=lambda item: -np.percentile(item[1], 50)):
+            print(f"{scope:>16}: p50 {np.percentile(ms, 50):8.1f} ms   p95 {np.percentile(ms, 95):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
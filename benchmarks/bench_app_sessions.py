@@ -0,0 +1,178 @@
+"""
+Headless multi-session load test of the Streamlit app.
+Simulates N sessions of app.py with AppTest. Each session opens the log,
+picks a bot and a path, scrubs the step slider and plays the animation
+(AppTest cannot fire the fragment timer, so each animation tick is a rerun
+after advancing current_step while playing). Reports wall-clock rerun
+latency percentiles per action, CPU time and RSS growth.
+
+AppTest keeps process-wide runtime state, so sessions cannot rerun in
+threads of one process at the same time. Two modes:
+  processes    one process per session, all running at once (real CPU
+               contention; each process parses the log for itself)
+  interleaved  all sessions in this process taking turns rerun by rerun
+               (one shared dataset registry, as in a single server)
+
+Usage: python benchmarks/bench_app_sessions.py <log file> [--sessions 4] [--scrubs 20] [--mode processes|interleaved]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Steps advanced while the animation plays
+ANIMATION_TICKS = 10
+
+
+def rss_mb():
+    """Current resident set size of the process, in MB (peak RSS where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class Session:
+    """
+    One simulated user. Every rerun is timed from the outside and recorded
+    under the action that triggered it; steps() yields after each rerun.
+    """
+
+    def __init__(self, session_id, log_name, scrubs):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(session_id)
+        self.log_name = log_name
+        self.scrubs = scrubs
+        self.latencies = {}
+        self.at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=600)
+
+    def rerun(self, action, widget=None):
+        started = time.perf_counter()
+        (widget.run() if widget is not None else self.at.run())
+        self.latencies.setdefault(action, []).append(time.perf_counter() - started)
+        if self.at.exception:
+            raise RuntimeError(f"{action}: {self.at.exception[0].value}")
+
+    def sidebar_selectbox(self, label):
+        return next((box for box in self.at.sidebar.selectbox if box.label == label), None)
+
+    def steps(self):
+        at = self.at
+        yield self.rerun('start')
+        yield self.rerun('open log', at.sidebar.selectbox[0].select(self.log_name))
+        # Wait for the background parse like a user watching the progress bar
+        parse_job = at.session_state['dataset'].dataset.parse_job
+        if parse_job is not None:
+            parse_job.wait()
+        yield self.rerun('open log')
+
+        bots = self.sidebar_selectbox("Select Bot ID:")
+        if bots is not None and len(bots.options) > 1:
+            yield self.rerun('pick bot', bots.select(self.rng.choice(bots.options[1:])))
+        paths = self.sidebar_selectbox("Select Path to Visualize:")
+        if paths is not None and len(paths.options) > 1:
+            yield self.rerun('pick path', paths.select(self.rng.choice(paths.options[1:])))
+
+        if 'step_slider' not in at.session_state:
+            return  # fewer than two events in the selection
+        for _ in range(self.scrubs):
+            slider = at.slider(key='step_slider')
+            yield self.rerun('scrub', slider.set_value(self.rng.randint(int(slider.min), int(slider.max))))
+
+        yield self.rerun('play', next(b for b in at.sidebar.button if 'Play' in b.label).click())
+        for _ in range(ANIMATION_TICKS):
+            at.session_state['current_step'] = at.session_state['current_step'] + 1
+            yield self.rerun('animation tick')
+        yield self.rerun('pause', next(b for b in at.sidebar.button if 'Pause' in b.label).click())
+
+
+def session_process(session_id, log_name, scrubs, start, results):
+    """Run one session to completion in its own process and report its latencies and usage."""
+    session = Session(session_id, log_name, scrubs)
+    rss_before = rss_mb()
+    start.wait()
+    cpu_before = time.process_time()
+    for _ in session.steps():
+        pass
+    results.put((session.latencies, time.process_time() - cpu_before, rss_mb() - rss_before))
+
+
+def run_processes(session_count, log_name, scrubs):
+    """Run the sessions in parallel processes; return (latencies per session, CPU seconds, RSS growth MB)."""
+    start = multiprocessing.Barrier(session_count + 1)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=session_process, args=(i, log_name, scrubs, start, results))
+        for i in range(session_count)
+    ]
+    for process in processes:
+        process.start()
+    start.wait()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return [report[0] for report in reports], sum(report[1] for report in reports), sum(report[2] for report in reports)
+
+
+def run_interleaved(session_count, log_name, scrubs):
+    """Run the sessions in this process, one rerun of each in turn."""
+    sessions = [Session(i, log_name, scrubs) for i in range(session_count)]
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    active = [session.steps() for session in sessions]
+    while active:
+        for steps in list(active):
+            if next(steps, StopIteration) is StopIteration:
+                active.remove(steps)
+    return [session.latencies for session in sessions], time.process_time() - cpu_before, rss_mb() - rss_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent app sessions with AppTest.")
+    parser.add_argument('log_file', help="log to open in every session")
+    parser.add_argument('--sessions', type=int, default=4, help="simulated sessions")
+    parser.add_argument('--scrubs', type=int, default=20, help="step slider moves per session")
+    parser.add_argument('--mode', choices=('processes', 'interleaved'), default='processes')
+    args = parser.parse_args()
+    log_file_path = os.path.abspath(args.log_file)
+    log_name = os.path.basename(log_file_path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app lists sample logs from ./log_files
+        os.makedirs(os.path.join(tmp, 'log_files'))
+        shutil.copy(log_file_path, os.path.join(tmp, 'log_files', log_name))
+        os.chdir(tmp)
+
+        started = time.perf_counter()
+        run = run_processes if args.mode == 'processes' else run_interleaved
+        session_latencies, cpu, rss_growth = run(args.sessions, log_name, args.scrubs)
+        wall = time.perf_counter() - started
+
+    print(f"{args.sessions} sessions ({args.mode}), {args.scrubs} scrubs each: {wall:.1f} s wall, "
+          f"{cpu:.1f} s CPU ({cpu / wall:.0%} of one core), RSS growth {rss_growth:+,.0f} MB "
+          f"({rss_growth / args.sessions:+,.1f} MB per session)")
+    print(f"{'action':<16} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    actions = {}
+    for latencies in session_latencies:
+        for action, values in latencies.items():
+            actions.setdefault(action, []).extend(values)
+    for action, values in actions.items():
+        ms = np.array(values) * 1000
+        print(f"{action:<16} {len(ms):>7} {np.percentile(ms, 50):>9.1f} {np.percentile(ms, 95):>9.1f} "
+              f"{np.percentile(ms, 99):>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Cold import time of the parser CLI and the app's modules, from -X importtime.
+Each target is imported in a fresh interpreter; the report shows the total
+import time and which heavy packages (NumPy, pandas, Plotly, Streamlit) it
+pulled in. The parser modules must not import any of them: the script exits
+with an error if they do.
+
+Usage: python benchmarks/bench_import_time.py [repeat]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_PACKAGES = ('numpy', 'pandas', 'plotly', 'streamlit')
+
+# (statement, heavy packages it may import)
+TARGETS = [
+    ("import log_parser", ()),
+    ("import utils", ()),
+    ("import path_index", ()),
+    ("import dataset_registry", ()),
+    ("import streamlit", ('streamlit', 'numpy', 'plotly')),
+    ("import visualization", HEAVY_PACKAGES),
+]
+
+
+def import_profile(statement):
+    """Run statement in a fresh interpreter; return (total microseconds, heavy packages imported)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line.split('|')
+        total_us += int(self_us.split(':')[-1])
+        name = name.strip()
+        if name in HEAVY_PACKAGES:
+            imported.add(name)
+    return total_us, imported
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    failures = []
+    print(f"{'target':<26} {'best ms':>8}  heavy packages")
+    for statement, allowed in TARGETS:
+        runs = [import_profile(statement) for _ in range(repeat)]
+        best_us = min(total_us for total_us, _ in runs)
+        imported = runs[0][1]
+        print(f"{statement:<26} {best_us / 1000:>8.1f}  {', '.join(sorted(imported)) or '-'}")
+        unexpected = imported - set(allowed)
+        if unexpected:
+            failures.append(f"{statement} imports {', '.join(sorted(unexpected))}")
+
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Memory footprint of parsed events, in bytes per event.
+Parses a log under tracemalloc and attributes every allocation still alive
+after parsing to the PathLogParser handler that made it (found from the
+allocation's traceback), giving the bytes per event of each event type
+including its nested coordinate dicts, direction strings and span
+tuples. A field breakdown shows where those bytes go and how much of it is
+repeated copies of equal strings.
+
+It then measures what a session holds on top of the parsed list (the copies
+made by get_events_by_bot_id, filter_events_by_path and
+pd.DataFrame(filtered_events)) and compares the list of dicts with the
+compact representations in the tree: the typed event records, the NumPy
+event columns and the query service index.
+
+Usage: python benchmarks/bench_memory.py [log file | generated lines]
+"""
+import gc
+import inspect
+import os
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import log_parser
+from log_generator import LogGenerator
+from log_parser import PathLogParser
+
+TRACEBACK_FRAMES = 16
+# Event type produced by each handler
+HANDLER_EVENTS = {
+    '_parse_path_calculation_started': 'path_calculation_started',
+    '_parse_chosen_node': 'chosen_node',
+    '_parse_neighbour_nodes': 'neighbour_nodes',
+    '_parse_exploring_node': 'exploring_node',
+    '_parse_rejected_exploring_node': 'exploring_node',
+    '_parse_processing_node': 'processing_node',
+    '_parse_pause_node': 'pause_node',
+    '_parse_cannot_revisit_node': 'cannot_revisit_node',
+    '_parse_conflict_check': 'conflict_check',
+    '_parse_time_conflict': 'conflict_detected',
+    '_parse_added_node': 'added_node',
+    '_parse_path_calculation_ended': 'path_calculation_ended',
+}
+
+
+def handler_line_ranges():
+    """Map each handler to its (first, last) source line in log_parser.py."""
+    ranges = {}
+    for name in HANDLER_EVENTS:
+        lines, first = inspect.getsourcelines(getattr(PathLogParser, name))
+        ranges[name] = (first, first + len(lines) - 1)
+    return ranges
+
+
+def bytes_by_event_type(snapshot):
+    """Sum the traced bytes per event type, by the innermost handler frame of each allocation."""
+    parser_file = os.path.abspath(log_parser.__file__)
+    ranges = handler_line_ranges()
+    totals = {}
+    for stat in snapshot.statistics('traceback'):
+        owner = 'other'
+        for frame in reversed(stat.traceback):
+            if os.path.abspath(frame.filename) != parser_file:
+                continue
+            handler = next((name for name, (first, last) in ranges.items() if first <= frame.lineno <= last), None)
+            if handler is not None:
+                owner = HANDLER_EVENTS[handler]
+                break
+        totals[owner] = totals.get(owner, 0) + stat.size
+    return totals
+
+
+def field_breakdown(events):
+    """Per event type and field: bytes per event (each object counted once) and bytes of repeated equal strings."""
+    seen = set()
+    string_values = set()
+    fields = {}
+
+    def walk(value):
+        """Return (new bytes, repeated string bytes) of value and everything it holds."""
+        if id(value) in seen:
+            return 0, 0
+        seen.add(id(value))
+        size = sys.getsizeof(value)
+        repeated = 0
+        if isinstance(value, str):
+            if value in string_values:
+                repeated = size
+            string_values.add(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                item_size, item_repeated = walk(item)
+                size += item_size
+                repeated += item_repeated
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                item_size, item_repeated = walk(item)
+                size += item_size
+                repeated += item_repeated
+        return size, repeated
+
+    for event in events:
+        event_type = event.get('event')
+        seen.add(id(event))
+        row = fields.setdefault(event_type, {'(dict)': [0, 0]})
+        row['(dict)'][0] += sys.getsizeof(event)
+        for key, value in event.items():
+            size, repeated = walk(value)
+            entry = row.setdefault(key, [0, 0])
+            entry[0] += size
+            entry[1] += repeated
+    return fields
+
+
+def traced_delta(build):
+    """Run build(); return (its result, bytes it left allocated)."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '50000'
+    with tempfile.TemporaryDirectory() as tmp:
+        if os.path.exists(arg):
+            log_path = arg
+        else:
+            log_path = os.path.join(tmp, 'planner.log')
+            LogGenerator(seed=0).write(log_path, max_lines=int(arg))
+
+        tracemalloc.start(TRACEBACK_FRAMES)
+        events, parsed_bytes = traced_delta(lambda: PathLogParser().parse_log_file(log_path))
+        by_type = bytes_by_event_type(tracemalloc.take_snapshot())
+        tracemalloc.stop()
+
+    counts = {}
+    for event in events:
+        counts[event['event']] = counts.get(event['event'], 0) + 1
+    n = len(events)
+    print(f"{n:,} events, {parsed_bytes / 1e6:,.1f} MB as a list of dicts ({parsed_bytes / n:,.0f} bytes/event)\n")
+
+    print(f"{'event type':<26} {'events':>9} {'bytes/event':>12} {'MB':>8}")
+    for event_type, count in sorted(counts.items(), key=lambda item: -by_type.get(item[0], 0)):
+        size = by_type.get(event_type, 0)
+        print(f"{event_type:<26} {count:>9,} {size / count:>12,.0f} {size / 1e6:>8.1f}")
+    if by_type.get('other'):
+        print(f"{'(list, other)':<26} {'':>9} {by_type['other'] / n:>12,.0f} {by_type['other'] / 1e6:>8.1f}")
+
+    print("\nField breakdown, bytes per event (repeated: copies of strings equal to one already held)")
+    breakdown = field_breakdown(events)
+    for event_type, row in sorted(breakdown.items(), key=lambda item: -counts[item[0]]):
+        count = counts[event_type]
+        parts = sorted(row.items(), key=lambda item: -item[1][0])
+        total = sum(size for size, _ in row.values())
+        repeated = sum(rep for _, rep in row.values())
+        print(f"  {event_type} ({total / count:,.0f} bytes, {repeated / total:.0%} repeated strings): " + ", ".join(
+            f"{key} {size / count:,.0f}" + (f" ({rep / count:,.0f} rep)" if rep else "") for key, (size, rep) in parts
+        ))
+
+    # What a session holds on top of the parsed events
+    import pandas as pd
+    from event_records import event_record
+    from event_store import build_event_columns
+    from query_service import EventQueryIndex
+    from utils import filter_events_by_path, get_events_by_bot_id, get_path_calculation_events
+
+    tracemalloc.start()
+    busiest_bot = max(
+        {event.get('bot_id') for event in events},
+        key=lambda bot_id: sum(1 for event in events if event.get('bot_id') == bot_id)
+    )
+    bot_events, bot_bytes = traced_delta(lambda: get_events_by_bot_id(events, busiest_bot))
+    paths = get_path_calculation_events(bot_events)
+    longest = max(paths, key=lambda path: (path['end_idx'] or len(bot_events)) - path['start_idx'])
+    path_events, path_bytes = traced_delta(
+        lambda: filter_events_by_path(bot_events, longest['start_idx'], longest['end_idx'])
+    )
+    frame, frame_bytes = traced_delta(lambda: pd.DataFrame(events))
+    path_frame, path_frame_bytes = traced_delta(lambda: pd.DataFrame(path_events))
+    records, records_bytes = traced_delta(lambda: [event_record(event) for event in events])
+    columns, columns_bytes = traced_delta(lambda: build_event_columns(events))
+    query_index, query_bytes = traced_delta(lambda: EventQueryIndex(events))
+    tracemalloc.stop()
+
+    print(f"\n{'session footprint':<44} {'MB':>8} {'bytes/event':>12}")
+    session = [
+        ("parsed events (list of dicts)", parsed_bytes, n),
+        (f"get_events_by_bot_id (bot {busiest_bot}, {len(bot_events):,} events)", bot_bytes, len(bot_events)),
+        (f"filter_events_by_path ({len(path_events):,} events)", path_bytes, len(path_events)),
+        ("pd.DataFrame(all events)", frame_bytes, n),
+        ("pd.DataFrame(path events)", path_frame_bytes, len(path_events)),
+    ]
+    for label, size, rows in session:
+        print(f"{label:<44} {size / 1e6:>8.1f} {size / max(rows, 1):>12,.0f}")
+    total = sum(size for _, size, _ in session)
+    print(f"{'total':<44} {total / 1e6:>8.1f} {total / n:>12,.0f}")
+
+    print(f"\n{'compact representations':<44} {'MB':>8} {'bytes/event':>12} {'vs dicts':>9}")
+    for label, size in (("typed event records (event_records.py)", records_bytes),
+                        ("event columns (build_event_columns)", columns_bytes),
+                        ("query service index (EventQueryIndex)", query_bytes)):
+        print(f"{label:<44} {size / 1e6:>8.1f} {size / n:>12,.0f} {size / parsed_bytes:>9.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Load test for query_service.py.
+Builds an EventQueryIndex over synthetic events (5M by default) in a server
+process, then sends each kind of /api/steps query (filters, 100-event pages,
+field projection, NDJSON) from concurrent keep-alive clients and reports
+requests/sec with p50 / p99 latency per query kind.
+
+Usage: python benchmarks/bench_query_service.py [events] [requests per kind] [clients]
+"""
+import http.client
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BOTS = 100
+GRID = 200
+# Every bot starts a new path calculation after this many of its events
+PATH_EVENTS = 40
+STEP_TYPES = ['chosen_node', 'neighbour_nodes', 'exploring_node', 'conflict_check', 'processing_node']
+START = datetime(2024, 5, 1)
+
+QUERY_KINDS = ['timestamp', 'start', 'dest', 'start+dest', 'bot_id+range',
+               'page', 'page+fields', 'bot_id page', 'bot_id', 'bot_id ndjson']
+# Kinds returning a whole bot's events (sent 20x less often)
+FULL_RESULT_KINDS = ('bot_id', 'bot_id ndjson')
+
+
+def timestamp_text(i):
+    """Timestamp of event i, one millisecond apart, in the log's format."""
+    return (START + timedelta(milliseconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def path_endpoints(path):
+    """Deterministic src / dest coordinates of a synthetic path."""
+    rng = random.Random(path[0] * 1_000_003 + path[1])
+    return (rng.randrange(GRID), rng.randrange(GRID)), (rng.randrange(GRID), rng.randrange(GRID))
+
+
+def synthetic_events(count):
+    """Yield count events of BOTS interleaved bots, each planning a new path every PATH_EVENTS events."""
+    for i in range(count):
+        bot = i % BOTS
+        local = i // BOTS
+        event = {'event_id': i + 1, 'timestamp': timestamp_text(i), 'bot_id': str(bot)}
+        if local % PATH_EVENTS == 0:
+            src, dest = path_endpoints((bot, local // PATH_EVENTS))
+            event['event'] = 'path_calculation_started'
+            event['src'] = {'coordinate': {'x': src[0], 'y': src[1]}, 'bot_direction': 'north', 'rack_direction': 'north'}
+            event['dest'] = {'coordinate': {'x': dest[0], 'y': dest[1]}, 'direction': 'south'}
+        else:
+            event['event'] = STEP_TYPES[local % len(STEP_TYPES)]
+            event['coordinate'] = {'x': (bot + local) % GRID, 'y': local % GRID}
+        yield event
+
+
+def serve(event_count, ready):
+    from query_service import DatasetCatalog, EventQueryIndex, create_server
+
+    started = time.perf_counter()
+    catalog = DatasetCatalog()
+    catalog.put('synthetic', EventQueryIndex(synthetic_events(event_count)))
+    server = create_server(catalog, '127.0.0.1', 0)
+    ready.put((server.server_address[1], time.perf_counter() - started))
+    server.serve_forever()
+
+
+def query_paths(kind, event_count, count, rng):
+    """Build count /api/steps URLs of one query kind."""
+    paths = []
+    for _ in range(count):
+        i = rng.randrange(event_count)
+        bot, local = i % BOTS, i // BOTS
+        src, dest = path_endpoints((bot, local // PATH_EVENTS))
+        if kind == 'bot_id':
+            paths.append(f"/api/steps?bot_id={bot}")
+        elif kind == 'timestamp':
+            paths.append(f"/api/steps?timestamp={timestamp_text(i).replace(' ', '%20')}")
+        elif kind == 'bot_id+range':
+            paths.append(f"/api/steps?bot_id={bot}&from={timestamp_text(i).replace(' ', '%20')}"
+                         f"&to={timestamp_text(i + 1000).replace(' ', '%20')}")
+        elif kind == 'start':
+            paths.append(f"/api/steps?start={src[0]},{src[1]}")
+        elif kind == 'dest':
+            paths.append(f"/api/steps?dest={dest[0]},{dest[1]}")
+        elif kind == 'start+dest':
+            paths.append(f"/api/steps?start={src[0]},{src[1]}&dest={dest[0]},{dest[1]}")
+        elif kind == 'page':
+            paths.append(f"/api/steps?limit=100&cursor={i}")
+        elif kind == 'page+fields':
+            paths.append(f"/api/steps?limit=100&cursor={i}&fields=event,timestamp,bot_id")
+        elif kind == 'bot_id page':
+            paths.append(f"/api/steps?bot_id={bot}&limit=100&cursor={i}")
+        elif kind == 'bot_id ndjson':
+            paths.append(f"/api/steps?bot_id={bot}&format=ndjson")
+    return paths
+
+
+def run_client(port, paths):
+    """Send paths over one keep-alive connection; return (latencies in seconds, response bytes)."""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    latencies = []
+    received = 0
+    for path in paths:
+        started = time.perf_counter()
+        connection.request('GET', path)
+        response = connection.getresponse()
+        body = response.read()
+        latencies.append(time.perf_counter() - started)
+        assert response.status == 200, (path, response.status)
+        received += len(body)
+    connection.close()
+    return latencies, received
+
+
+def main():
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    per_kind = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(event_count, ready), daemon=True)
+    server.start()
+    while True:
+        try:
+            port, build_seconds = ready.get(timeout=1)
+            break
+        except queue.Empty:
+            if not server.is_alive():
+                sys.exit("query server failed to start")
+    print(f"{event_count:,} events indexed in {build_seconds:.1f} s, {clients} clients")
+
+    rng = random.Random(0)
+    print(f"{'query':<14} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'KB/resp':>8}")
+    try:
+        for kind in QUERY_KINDS:
+            count = per_kind if kind not in FULL_RESULT_KINDS else max(per_kind // 20, clients)
+            paths = query_paths(kind, event_count, count, rng)
+            shares = [paths[i::clients] for i in range(clients)]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(clients) as pool:
+                results = list(pool.map(lambda share: run_client(port, share), shares))
+            elapsed = time.perf_counter() - started
+            latencies = np.concatenate([np.array(result[0]) for result in results]) * 1000
+            received = sum(result[1] for result in results)
+            print(f"{kind:<14} {count / elapsed:>9.0f} {np.percentile(latencies, 50):>8.2f} "
+                  f"{np.percentile(latencies, 99):>8.2f} {received / count / 1024:>8.1f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
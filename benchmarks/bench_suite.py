@@ -0,0 +1,153 @@
+"""
+End-to-end benchmark suite with a stored baseline and a regression gate.
+For each log size (synthetic logs from log_generator.py, fixed seed) it times
+parse_log_to_json, the event store and path offset indexes,
+get_min_max_coordinates, calculate_path_metrics, track_priority_queue at 10%,
+50% and 100% of the steps, create_grid_visualization and the JSON export.
+Each metric records its best throughput over the repeats and its peak
+memory (tracemalloc, in a separate untimed run).
+
+A run with --save writes the baseline file; other runs compare against
+it and exit with an error when any throughput drops, or any peak memory
+grows, by more than the tolerance. Baselines are specific to the machine
+they were recorded on, so benchmarks/baseline.json is not committed: record
+one on the machine that runs the gate, from the commit to compare against
+(e.g. git stash; python benchmarks/bench_suite.py --save; git stash pop).
+Without a baseline the gate exits with an error instead of passing.
+
+Usage: python benchmarks/bench_suite.py [--sizes 10000 100000] [--repeat 3] [--tolerance 0.2] [--save]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from log_generator import LogGenerator
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SEED = 42
+# Peak memory changes below this many MB are noise, not regressions
+MEMORY_SLACK_MB = 0.5
+# Fast cases are repeated until they have run at least this long in total
+MIN_TOTAL_SECONDS = 1.0
+
+
+def measure(func, repeat):
+    """Return (best seconds over at least repeat runs, peak traced MB of one more run)."""
+    best = None
+    runs = total = 0
+    while runs < repeat or total < MIN_TOTAL_SECONDS:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        runs += 1
+        total += elapsed
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def suite_cases(log_path, line_count, tmp):
+    """Build the (name, unit, units of work, function) cases for one log."""
+    from event_store import build_event_columns, build_path_index
+    from log_parser import PathLogParser, parse_log_to_json
+    from path_index import build_path_offset_index
+    from utils import calculate_path_metrics, get_min_max_coordinates
+    from visualization import create_grid_visualization, track_priority_queue
+
+    events = parse_log_to_json(log_path)
+    bounds = get_min_max_coordinates(events)
+    export_path = os.path.join(tmp, 'export.json')
+    exporter = PathLogParser()
+    exporter.events = events
+
+    cases = [
+        ('parse_log_to_json', 'lines', line_count, lambda: parse_log_to_json(log_path)),
+        ('event store index', 'events', len(events), lambda: build_path_index(build_event_columns(events))),
+        ('path offset index', 'lines', line_count, lambda: build_path_offset_index(log_path)),
+        ('get_min_max_coordinates', 'events', len(events), lambda: get_min_max_coordinates(events)),
+        ('calculate_path_metrics', 'events', len(events), lambda: calculate_path_metrics(events)),
+    ]
+    for share in (0.1, 0.5, 1.0):
+        step = max(int(len(events) * share) - 1, 0)
+        cases.append((f"track_priority_queue {share:.0%}", 'events', step + 1,
+                      lambda step=step: track_priority_queue(events, step)))
+    last_step = len(events) - 1
+    cases.append(('create_grid_visualization', 'events', len(events),
+                  lambda: create_grid_visualization(events, last_step, *bounds)))
+    cases.append(('JSON export', 'events', len(events), lambda: exporter.save_to_json(export_path)))
+    return cases
+
+
+def run_suite(sizes, repeat):
+    """Run every case for every log size; return {metric key: result}."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            log_path = os.path.join(tmp, f"planner_{size}.log")
+            line_count, _, _ = LogGenerator(seed=SEED).write(log_path, max_lines=size)
+            for name, unit, work, func in suite_cases(log_path, line_count, tmp):
+                seconds, peak_mb = measure(func, repeat)
+                key = f"{name} @ {size} lines"
+                results[key] = {'unit': unit, 'per_sec': work / seconds, 'peak_mb': peak_mb}
+                print(f"{key:<48} {work / seconds:>12,.0f} {unit}/s {peak_mb:>9.1f} MB")
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """List the metrics that regressed beyond tolerance against the baseline."""
+    failures = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if result['per_sec'] < before['per_sec'] * (1 - tolerance):
+            failures.append(f"{key}: {result['per_sec']:,.0f} {result['unit']}/s, "
+                            f"baseline {before['per_sec']:,.0f} ({result['per_sec'] / before['per_sec'] - 1:+.0%})")
+        if result['peak_mb'] > before['peak_mb'] * (1 + tolerance) + MEMORY_SLACK_MB:
+            failures.append(f"{key}: peak {result['peak_mb']:.1f} MB, baseline {before['peak_mb']:.1f} MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths against a stored baseline.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="log sizes in lines")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per metric (best is kept)")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed regression, as a fraction")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline file to compare against")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    args = parser.parse_args()
+    if not args.save and not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}; record one first with --save (see the module docstring)")
+
+    print(f"{'metric':<48} {'throughput':>20} {'peak':>12}")
+    results = run_suite(args.sizes, args.repeat)
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"Not in the baseline (run with --save to add): {', '.join(missing)}")
+    failures = regressions(results, baseline, args.tolerance)
+    if failures:
+        sys.exit(f"Regressions beyond {args.tolerance:.0%}:\n" + "\n".join(failures))
+    print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for term_parser.parse_payload.
+Compares the single-pass term parser against the per-field regexes the
+log parser used before, on representative planner lines.
+
+Usage: python benchmarks/bench_term_parser.py [iterations]
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from term_parser import parse_payload
+
+SAMPLE_LINES = {
+    'chosen_node': (
+        "#chosen_node = {{442,20}, {444,20}, rest, butler_moving, east, east, south, no_turn_rotate}, "
+        "GCost = 10, HCost = 5, FScore = 15"
+    ),
+    'neighbour_nodes': (
+        "#neighbour_nodes = [{{443,20},east,south,rest,butler_moving},{{442,21},north,south,rest,butler_moving},"
+        "{{441,20},west,south,rest,butler_moving},{{442,19},south,south,rest,butler_moving}]"
+    ),
+    'added_node': (
+        "\"#added_node\", Coor = {441,20}, FromCoor = {442,20}, TurnTag = no_turn, MovingStatus = butler_moving, "
+        "BDir = east, PhyBDir = east, RDir = south, GCost = 11, HCost = 4, FScore = 15, PauseTime = 0"
+    ),
+    'cannot_revisit_node': "#cannot_revisit_node {{436,18}, {435,20}, rest, butler_moving, north, south}",
+}
+
+
+def regex_chosen_node(line):
+    coord = re.search(r'\{\{(\d+),(\d+)\}, \{(\d+),(\d+)\}', line)
+    costs = [re.search(pattern, line) for pattern in (r'GCost = (\d+)', r'HCost = (\d+)', r'FScore = (\d+)')]
+    directions = re.search(r'\}, ([^,]+), ([^,]+), ([^,]+), ([^,]+), ([^,]+)', line)
+    return coord, costs, directions
+
+
+def regex_neighbour_nodes(line):
+    raw = re.search(r'#neighbour_nodes = \[(.*?)\]', line).group(1)
+    return re.findall(r'\{\{(\d+),(\d+)\},(\w+),(\w+),(\w+),(\w+)?\}', raw)
+
+
+def regex_added_node(line):
+    coord = (re.search(r'Coor = \{(\d+),(\d+)\}, FromCoor = \{(\d+),(\d+)\}', line) or
+             re.search(r'"#added_node".*?Coor = \{(\d+),(\d+)\}, FromCoor = \{(\d+),(\d+)\}', line) or
+             re.search(r'#added_node.*?\{\{(\d+),(\d+)\},\s*\{(\d+),(\d+)\}', line))
+    fields = [
+        re.search(r'TurnTag = (\{[^}]+\}|[^,]+),', line),
+        re.search(r'MovingStatus = ([^,]+)', line),
+        re.search(r'BDir = ([^,]+), PhyBDir = ([^,]+), RDir = ([^,]+)', line),
+        re.search(r'GCost = (\d+)', line),
+        re.search(r'HCost = (\d+)', line),
+        re.search(r'FScore = (\d+)', line),
+        re.search(r'PauseTime = (\d+)', line),
+    ]
+    return coord, fields
+
+
+def regex_cannot_revisit_node(line):
+    return re.search(r'#cannot_revisit_node\s*\{\{(\d+),(\d+)\},\s*\{(\d+),(\d+)\},\s*(\w+),\s*(\w+),\s*(\w+),\s*(\w+)\}', line)
+
+
+REGEX_HANDLERS = {
+    'chosen_node': regex_chosen_node,
+    'neighbour_nodes': regex_neighbour_nodes,
+    'added_node': regex_added_node,
+    'cannot_revisit_node': regex_cannot_revisit_node,
+}
+
+
+def run(iterations=20000):
+    print(f"{'line':<22}{'term parser':>16}{'regex':>16}{'speedup':>10}")
+    for tag, line in SAMPLE_LINES.items():
+        payload = line[line.find(tag) + len(tag):]
+        term_time = timeit.timeit(lambda: parse_payload(payload), number=iterations)
+        regex_time = timeit.timeit(lambda: REGEX_HANDLERS[tag](line), number=iterations)
+        term_us = term_time / iterations * 1e6
+        regex_us = regex_time / iterations * 1e6
+        print(f"{tag:<22}{term_us:>13.2f} us{regex_us:>13.2f} us{regex_us / term_us:>9.2f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
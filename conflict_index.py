@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from event_store import EVENT_TYPE_CODES, MISSING, build_event_columns
+from log_parser import CONFLICT_TYPES
+
+
+def _cell_key(x, y):
+    """Pack integer cell coordinates into a single int64 key."""
+    return x.astype(np.int64) << 32 | y.astype(np.int64)
+
+
+def build_conflict_cells(events, columns=None):
+    """Flatten every conflicting check into one row per (check, cell).
+
+    The cells of a conflict_check are its anchor plus all span coordinates;
+    a conflict_detected event contributes its own coordinate. Only events
+    with a conflict are included. Returns a dictionary of aligned arrays:
+        row:            index of the source event
+        x, y:           int32 cell coordinates
+        bot:            int32 bot code (see columns['bot_ids'])
+        conflict_type:  int8 code into CONFLICT_TYPES, -1 if unknown
+    """
+    if columns is None:
+        columns = build_event_columns(events)
+
+    event = columns['event']
+    conflicting = columns['conflict_found'] & (
+        (event == EVENT_TYPE_CODES['conflict_check']) |
+        (event == EVENT_TYPE_CODES['conflict_detected'])
+    )
+    conflict_rows = np.flatnonzero(conflicting & (columns['x'] != MISSING))
+
+    # Span cells live in a flat (x0, y0, x1, y1, ...) tuple per event, so gather them into flat arrays first
+    span_rows, span_x, span_y = [], [], []
+    for row in conflict_rows.tolist():
+        span = events[row].get('span') or ()
+        span_rows.extend([row] * (len(span) // 2))
+        span_x.extend(span[0::2])
+        span_y.extend(span[1::2])
+
+    rows = np.concatenate((conflict_rows, np.array(span_rows, dtype=np.int64)))
+    x = np.concatenate((columns['x'][conflict_rows], np.array(span_x, dtype=np.int32)))
+    y = np.concatenate((columns['y'][conflict_rows], np.array(span_y, dtype=np.int32)))
+
+    # A cell can be both anchor and span of the same check; count it once
+    _, first = np.unique(np.stack((rows, _cell_key(x, y))), axis=1, return_index=True)
+    first.sort()
+    rows, x, y = rows[first], x[first], y[first]
+
+    return {
+        'row': rows,
+        'x': x.astype(np.int32),
+        'y': y.astype(np.int32),
+        'bot': columns['bot'][rows],
+        'conflict_type': columns['conflict_type'][rows],
+    }
+
+
+def build_hotspot_index(events, columns=None):
+    """Aggregate conflicts per grid cell.
+
+    Returns a DataFrame indexed by (x, y) with the total conflict count, one
+    count column per conflict type, the number of distinct bots and the list
+    of bot IDs involved, sorted by count (most contested cells first).
+    """
+    if columns is None:
+        columns = build_event_columns(events)
+    cells = build_conflict_cells(events, columns)
+    type_columns = [f"{name}_count" for name in CONFLICT_TYPES] + ['unknown_count']
+    if len(cells['row']) == 0:
+        return pd.DataFrame(columns=['x', 'y', 'count'] + type_columns + ['bots', 'bot_ids']).set_index(['x', 'y'])
+
+    keys = _cell_key(cells['x'], cells['y'])
+    unique_keys, cell_of_row, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    n_cells = len(unique_keys)
+
+    # Per-type counts via one bincount over (cell, type) pairs; unknown types go last
+    n_types = len(CONFLICT_TYPES) + 1
+    type_code = np.where(cells['conflict_type'] >= 0, cells['conflict_type'], n_types - 1)
+    type_counts = np.bincount(cell_of_row * n_types + type_code, minlength=n_cells * n_types)
+    type_counts = type_counts.reshape(n_cells, n_types)
+
+    # Distinct bots per cell
+    cell_bot = np.unique(np.stack((cell_of_row, cells['bot'])), axis=1)
+    bot_counts = np.bincount(cell_bot[0], minlength=n_cells)
+    bot_ids = np.array(columns['bot_ids'] + [None], dtype=object)
+    bots_per_cell = np.split(bot_ids[cell_bot[1]], np.cumsum(bot_counts)[:-1])
+
+    hotspots = pd.DataFrame(type_counts, columns=type_columns)
+    hotspots.insert(0, 'count', counts)
+    hotspots.insert(0, 'y', (unique_keys & 0xFFFFFFFF).astype(np.int64))
+    hotspots.insert(0, 'x', (unique_keys >> 32).astype(np.int64))
+    hotspots['bots'] = bot_counts
+    hotspots['bot_ids'] = [sorted(b for b in bots if b is not None) for bots in bots_per_cell]
+    return hotspots.sort_values('count', ascending=False, kind='stable').set_index(['x', 'y'])
+
+
+def query_hotspots(hotspots, min_x=None, min_y=None, max_x=None, max_y=None,
+                   conflict_type=None, bot_id=None, min_count=1, top=None):
+    """Filter the hotspot index to a region, conflict type and/or bot.
+
+    When conflict_type is given, 'count' is replaced by that type's count so
+    the ranking reflects only that kind of conflict.
+    """
+    result = hotspots.reset_index()
+    mask = np.ones(len(result), dtype=bool)
+    if min_x is not None:
+        mask &= result['x'].to_numpy() >= min_x
+    if max_x is not None:
+        mask &= result['x'].to_numpy() <= max_x
+    if min_y is not None:
+        mask &= result['y'].to_numpy() >= min_y
+    if max_y is not None:
+        mask &= result['y'].to_numpy() <= max_y
+    if bot_id is not None:
+        mask &= result['bot_ids'].map(lambda bots: bot_id in bots).to_numpy(dtype=bool)
+    result = result[mask]
+
+    if conflict_type is not None:
+        result = result.assign(count=result[f"{conflict_type}_count"])
+    result = result[result['count'] >= min_count].sort_values('count', ascending=False, kind='stable')
+    if top is not None:
+        result = result.head(top)
+    return result.set_index(['x', 'y'])
@@ -0,0 +1,240 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+import weakref
+
+from background_parser import start_background_parse
+from path_index import LAZY_PARSE_MIN_BYTES, build_path_offset_index
+
+# Memory the registry may hold for datasets no session is using
+DEFAULT_MEMORY_BUDGET = 2 * 1024 ** 3
+HASH_CHUNK_SIZE = 1 << 20
+# Events sampled to estimate the memory of a dataset
+SIZE_SAMPLE_EVENTS = 256
+# Files opened as an event database (see event_db.py) rather than parsed
+DATABASE_SUFFIXES = ('.db', '.sqlite')
+
+
+def file_content_hash(log_file_path):
+    """Get the BLAKE2b hex digest of a file's bytes."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(log_file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_event_database(path):
+    return path.endswith(DATABASE_SUFFIXES)
+
+
+def _deep_size(value):
+    """Approximate memory of a value including the dicts, lists and tuples it holds."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(key) + _deep_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_size(item) for item in value)
+    return size
+
+
+def estimate_events_bytes(events):
+    """Estimate the memory of an event list from an evenly spaced sample of its events."""
+    if not events:
+        return 0
+    step = max(len(events) // SIZE_SAMPLE_EVENTS, 1)
+    sample = events[::step]
+    per_event = sum(_deep_size(event) for event in sample) / len(sample)
+    return int(per_event * len(events)) + sys.getsizeof(events)
+
+
+class Dataset:
+    """
+    A parsed log shared by every session that opened the same content.
+    Holds either a background parse of the whole file or, for large logs,
+    a byte-offset path index. An event database (see event_db.py) takes the
+    place of the path index: its paths are loaded from the database when
+    selected. Its events are shared and must not be modified.
+    """
+
+    def __init__(self, key, log_file_path):
+        self.key = key
+        self.log_file_path = log_file_path
+        self.refcount = 0
+        self.last_used = time.monotonic()
+        self._memory_bytes = None
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+        if is_event_database(log_file_path):
+            from event_db import EventDatabase
+            self.parse_job = None
+            self.path_offset_index = EventDatabase(log_file_path)
+        elif os.path.getsize(log_file_path) >= LAZY_PARSE_MIN_BYTES:
+            self.parse_job = None
+            self.path_offset_index = build_path_offset_index(log_file_path)
+        else:
+            self.parse_job = start_background_parse(log_file_path)
+            self.path_offset_index = None
+
+    def events(self):
+        """Get the events parsed so far (empty for an indexed log; load its segments instead)."""
+        if self.parse_job is not None:
+            return self.parse_job.events()
+        return []
+
+    def derived(self, name, version, compute):
+        """Get a value computed from the dataset, shared by all its sessions.
+
+        The value is recomputed when version changes, e.g. the number of
+        events parsed so far.
+        """
+        with self._derived_lock:
+            entry = self._derived.get(name)
+        if entry is None or entry[0] != version:
+            entry = (version, compute())
+            with self._derived_lock:
+                self._derived[name] = entry
+        return entry[1]
+
+    def memory_bytes(self):
+        """Estimate the memory held by the dataset's events."""
+        if self.path_offset_index is not None:
+            return sum(estimate_events_bytes(events) for events in self.path_offset_index.cached_segments())
+        if self._memory_bytes is not None:
+            return self._memory_bytes
+        size = estimate_events_bytes(self.parse_job.events())
+        if self.parse_job.done:
+            self._memory_bytes = size
+        return size
+
+    def close(self):
+        """Stop a parse that is still running, or close an event database."""
+        if self.parse_job is not None:
+            self.parse_job.cancel()
+        elif is_event_database(self.log_file_path):
+            self.path_offset_index.close()
+
+
+class DatasetHandle:
+    """
+    A session's reference to a shared Dataset.
+    The reference is released by release(), or when the handle is garbage
+    collected together with the session that held it.
+    """
+
+    def __init__(self, registry, dataset):
+        self.dataset = dataset
+        self._finalizer = weakref.finalize(self, registry.release, dataset.key)
+
+    @property
+    def released(self):
+        return not self._finalizer.alive
+
+    def release(self):
+        """Drop this reference (only the first call has an effect)."""
+        self._finalizer()
+
+
+class DatasetRegistry:
+    """
+    Process-wide registry of parsed datasets keyed by file content hash.
+    Opening content that is already loaded, or being loaded by another
+    session, shares that dataset instead of parsing it again. Datasets no
+    session references are evicted, least recently used first, while the
+    total memory is over budget.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._datasets = {}
+        self._loading = {}  # key -> threading.Event set when its load finishes
+        self._lock = threading.Lock()
+
+    def acquire(self, log_file_path):
+        """Get a handle to the dataset of a log file, loading it if needed."""
+        # An event database is read in place (and may grow), so it is keyed by its path, not hashed
+        if is_event_database(log_file_path):
+            key = f"db:{os.path.abspath(log_file_path)}"
+        else:
+            key = file_content_hash(log_file_path)
+        while True:
+            with self._lock:
+                dataset = self._datasets.get(key)
+                if dataset is not None:
+                    dataset.refcount += 1
+                    dataset.last_used = time.monotonic()
+                    return DatasetHandle(self, dataset)
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another session is loading the same content; use its result
+            loading.wait()
+
+        try:
+            dataset = Dataset(key, log_file_path)
+            with self._lock:
+                dataset.refcount = 1
+                self._datasets[key] = dataset
+                self._evict()
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+        return DatasetHandle(self, dataset)
+
+    def release(self, key):
+        """Drop one reference to a dataset and evict datasets if over budget."""
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                dataset.refcount = max(dataset.refcount - 1, 0)
+                dataset.last_used = time.monotonic()
+            self._evict()
+
+    def stats(self):
+        """Get one dictionary per loaded dataset: key, file, refcount, memory_bytes, parsing."""
+        with self._lock:
+            datasets = list(self._datasets.values())
+        return [
+            {
+                'key': dataset.key,
+                'file': dataset.log_file_path,
+                'refcount': dataset.refcount,
+                'memory_bytes': dataset.memory_bytes(),
+                'parsing': dataset.parse_job is not None and not dataset.parse_job.done,
+            }
+            for dataset in datasets
+        ]
+
+    def _evict(self):
+        """Evict unreferenced datasets, least recently used first, until within budget (lock held)."""
+        sizes = {key: dataset.memory_bytes() for key, dataset in self._datasets.items()}
+        total = sum(sizes.values())
+        if total <= self.memory_budget:
+            return
+        idle = sorted(
+            (dataset for dataset in self._datasets.values() if dataset.refcount == 0),
+            key=lambda dataset: dataset.last_used
+        )
+        for dataset in idle:
+            if total <= self.memory_budget:
+                break
+            del self._datasets[dataset.key]
+            dataset.close()
+            total -= sizes[dataset.key]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Get the process-wide DatasetRegistry, shared by all Streamlit sessions."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DatasetRegistry()
+        return _registry
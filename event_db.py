@@ -0,0 +1,405 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+from dataset_registry import file_content_hash
+from event_filter import compile_filter
+from event_records import events_to_dicts
+from event_rows import EMPTY_ROWS, STREAM_CHUNK_ROWS, parse_timestamp_ms, project_record
+from event_store import EVENT_TYPE_CODES, MISSING, build_event_columns, build_path_index
+from log_parser import PathLogParser
+from path_index import MAX_CACHED_SEGMENTS
+
+# Events converted to rows per executemany call while a log is imported
+INSERT_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    log_id INTEGER PRIMARY KEY,
+    source TEXT,
+    content_hash TEXT UNIQUE,
+    first_row INTEGER,
+    events INTEGER,
+    imported_at REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    row INTEGER PRIMARY KEY,
+    log_id INTEGER NOT NULL,
+    event INTEGER,
+    bot_id TEXT,
+    timestamp_ms INTEGER,
+    path_id INTEGER,
+    x INTEGER,
+    y INTEGER,
+    dest_x INTEGER,
+    dest_y INTEGER,
+    record BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_bot_timestamp ON events (bot_id, timestamp_ms);
+CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp_ms);
+-- Entries of an index end with the row, so this one pages a bot's rows in order without sorting them
+CREATE INDEX IF NOT EXISTS events_bot ON events (bot_id);
+CREATE INDEX IF NOT EXISTS events_event_path ON events (event, path_id);
+CREATE INDEX IF NOT EXISTS events_xy ON events (x, y);
+CREATE TABLE IF NOT EXISTS paths (
+    path_id INTEGER PRIMARY KEY,
+    log_id INTEGER NOT NULL,
+    bot_id TEXT,
+    timestamp TEXT,
+    start_row INTEGER NOT NULL,
+    end_row INTEGER,
+    src_x INTEGER,
+    src_y INTEGER,
+    dest_x INTEGER,
+    dest_y INTEGER
+);
+CREATE INDEX IF NOT EXISTS paths_bot ON paths (bot_id, path_id);
+"""
+
+
+def _nullable(values):
+    """Convert an int column slice to a list with MISSING as None (NULL)."""
+    return [None if value == MISSING else value for value in values.tolist()]
+
+
+def _coordinate_label(x, y):
+    return f"({x},{y})" if x is not None else "(?,?)"
+
+
+def _path_end_rows(columns, start_idx):
+    """End row of each path: the next path_calculation_ended of the same bot, or MISSING.
+
+    Like utils.get_path_calculation_events, every path of a bot still
+    waiting for its end closes at that bot's next end event.
+    """
+    event = columns['event']
+    ends = [MISSING] * len(start_idx)
+    start_position = {row: position for position, row in enumerate(start_idx.tolist())}
+    boundaries = np.flatnonzero(
+        (event == EVENT_TYPE_CODES['path_calculation_started']) | (event == EVENT_TYPE_CODES['path_calculation_ended'])
+    )
+    open_paths = {}  # bot code -> positions of the paths waiting for their end
+    for row in boundaries.tolist():
+        bot = columns['bot'][row]
+        if row in start_position:
+            open_paths.setdefault(bot, []).append(start_position[row])
+        else:
+            for position in open_paths.pop(bot, []):
+                ends[position] = row
+    return ends
+
+
+class EventDatabase:
+    """
+    Persistent SQLite store of parsed events, for searching many logs
+    without loading them. Each imported log is added in one transaction
+    (rows inserted with executemany, INSERT_BATCH_SIZE at a time); events
+    are indexed by (bot_id, timestamp), timestamp, (event, path_id) and (x, y), and
+    stored with their JSON record so pages are served without re-encoding.
+
+    Rows are numbered from 0 in import order. For the query server it
+    answers page / record / record_chunks like an EventQueryIndex; for the
+    app it lists and loads path segments like a PathOffsetIndex, keeping the
+    max_cached_segments most recently loaded ones in memory.
+    """
+
+    def __init__(self, database_path, max_cached_segments=MAX_CACHED_SEGMENTS):
+        self.database_path = database_path
+        self.max_cached_segments = max_cached_segments
+        self._segment_cache = {}
+        self._cache_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # One connection shared by the server / session threads, used under the lock
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        with self._lock:
+            # WAL lets readers page through the database while a log is being imported
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _fetch(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def __len__(self):
+        return self._fetch('SELECT COALESCE(MAX(row) + 1, 0) FROM events')[0][0]
+
+    def log_count(self):
+        return self._fetch('SELECT COUNT(*) FROM logs')[0][0]
+
+    def path_count(self):
+        return self._fetch('SELECT COUNT(*) FROM paths')[0][0]
+
+    def import_log(self, log_file_path):
+        """Add the events of a log file (or of a parsed .json file).
+
+        Returns the number of events added; 0 if a file with the same
+        content was imported before.
+        """
+        content_hash = file_content_hash(log_file_path)
+        if self._fetch('SELECT 1 FROM logs WHERE content_hash = ?', (content_hash,)):
+            return 0
+        if log_file_path.endswith('.json'):
+            with open(log_file_path, 'r') as file:
+                events = json.load(file)
+        else:
+            events = PathLogParser().parse_log_file(log_file_path)
+        return self.import_events(events, log_file_path, content_hash)
+
+    def import_events(self, events, source=None, content_hash=None):
+        """Add a list of parsed events (dicts or EventRecords) as one log; return the number added."""
+        with self._cache_lock:
+            self._segment_cache.clear()
+        events = events_to_dicts(events)
+        columns = build_event_columns(events)
+        path_index = build_path_index(columns)
+        start_idx = path_index['start_idx']
+        end_rows = _path_end_rows(columns, start_idx)
+        bot_ids = columns['bot_ids']
+        x, y = columns['x'], columns['y']
+        timestamps = np.where(columns['has_timestamp'], columns['timestamp_ms'], MISSING)
+
+        # Source / destination of the path starts; build_event_columns already puts the source in x / y
+        dest_x = np.full(len(events), MISSING, dtype=np.int32)
+        dest_y = np.full(len(events), MISSING, dtype=np.int32)
+        for row in start_idx.tolist():
+            dest = (events[row].get('dest') or {}).get('coordinate') or {}
+            dest_x[row] = dest.get('x', MISSING)
+            dest_y[row] = dest.get('y', MISSING)
+
+        with self._lock, self._connection:
+            connection = self._connection
+            first_row, path_offset = connection.execute(
+                'SELECT (SELECT COALESCE(MAX(row) + 1, 0) FROM events), '
+                '(SELECT COALESCE(MAX(path_id) + 1, 0) FROM paths)'
+            ).fetchone()
+            log_id = connection.execute(
+                'INSERT INTO logs (source, content_hash, first_row, events, imported_at) VALUES (?, ?, ?, ?, ?)',
+                (source, content_hash, first_row, len(events), time.time())
+            ).lastrowid
+            path_ids = np.where(path_index['path_id'] == MISSING, MISSING, path_index['path_id'] + path_offset)
+
+            for start in range(0, len(events), INSERT_BATCH_SIZE):
+                end = min(start + INSERT_BATCH_SIZE, len(events))
+                bots = columns['bot'][start:end].tolist()
+                connection.executemany(
+                    'INSERT INTO events (row, log_id, event, bot_id, timestamp_ms, path_id, x, y, dest_x, dest_y, record) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    zip(
+                        range(first_row + start, first_row + end),
+                        [log_id] * (end - start),
+                        _nullable(columns['event'][start:end]),
+                        [bot_ids[bot] if bot != MISSING else None for bot in bots],
+                        _nullable(timestamps[start:end]),
+                        _nullable(path_ids[start:end]),
+                        _nullable(x[start:end]),
+                        _nullable(y[start:end]),
+                        _nullable(dest_x[start:end]),
+                        _nullable(dest_y[start:end]),
+                        (json.dumps(event, separators=(',', ':')).encode() for event in events[start:end]),
+                    )
+                )
+
+            connection.executemany(
+                'INSERT INTO paths (path_id, log_id, bot_id, timestamp, start_row, end_row, src_x, src_y, dest_x, dest_y) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        path_offset + position, log_id, events[row].get('bot_id'), events[row].get('timestamp'),
+                        first_row + row, first_row + end_row if end_row != MISSING else None,
+                        None if x[row] == MISSING else int(x[row]), None if y[row] == MISSING else int(y[row]),
+                        None if dest_x[row] == MISSING else int(dest_x[row]),
+                        None if dest_y[row] == MISSING else int(dest_y[row]),
+                    )
+                    for position, (row, end_row) in enumerate(zip(start_idx.tolist(), end_rows))
+                ]
+            )
+        with self._lock:
+            # Refresh the statistics the query planner uses to choose between the indexes
+            self._connection.execute('PRAGMA optimize')
+        return len(events)
+
+    def _filters(self, bot_id=None, timestamp=None, start=None, dest=None, time_from=None, time_to=None,
+                 event=None, path_id=None, where=None):
+        """Build the WHERE clauses and parameters of a query, or (None, None) if nothing can match.
+
+        A where expression (see event_filter.py) may only use the fields
+        stored as columns; ValueError otherwise.
+        """
+        clauses = []
+        params = []
+        if where is not None:
+            condition, condition_params = compile_filter(where).sql()
+            clauses.append(condition)
+            params.extend(condition_params)
+        if bot_id is not None:
+            clauses.append('bot_id = ?')
+            params.append(bot_id)
+        if timestamp is not None:
+            timestamp_ms = parse_timestamp_ms(timestamp)
+            if timestamp_ms is None:
+                return None, None
+            clauses.append('timestamp_ms = ?')
+            params.append(timestamp_ms)
+        for bound, operator in ((time_from, '>='), (time_to, '<=')):
+            if bound is not None:
+                bound_ms = parse_timestamp_ms(bound)
+                if bound_ms is None:
+                    return None, None
+                clauses.append(f'timestamp_ms {operator} ?')
+                params.append(bound_ms)
+        if start is not None or dest is not None:
+            # Only path starts have a source / destination
+            if event not in (None, 'path_calculation_started'):
+                return None, None
+            event = 'path_calculation_started'
+        if event is not None:
+            code = EVENT_TYPE_CODES.get(event)
+            if code is None:
+                return None, None
+            clauses.append('event = ?')
+            params.append(code)
+        if path_id is not None:
+            clauses.append('path_id = ?')
+            params.append(path_id)
+        for coordinate, columns in ((start, ('x', 'y')), (dest, ('dest_x', 'dest_y'))):
+            if coordinate is not None:
+                clauses.append(f'{columns[0]} = ? AND {columns[1]} = ?')
+                params.extend(coordinate)
+        return clauses, params
+
+    def page(self, cursor=None, limit=None, **filters):
+        """Get (rows, next cursor) of the events matching every filter, like EventQueryIndex.page.
+
+        Filters are those of EventQueryIndex.query, plus event (event type
+        name) and path_id. Rows come back as an ascending NumPy array, at
+        most limit of them starting at row cursor; the next cursor is None
+        after the last page.
+        """
+        clauses, params = self._filters(**filters)
+        if clauses is None:
+            return EMPTY_ROWS, None
+        if cursor is not None:
+            clauses.append('row >= ?')
+            params.append(cursor)
+        sql = 'SELECT row FROM events'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY row'
+        if limit is not None:
+            # One row more than the page tells whether there is a next page
+            sql += ' LIMIT ?'
+            params.append(limit + 1)
+        rows = np.array([row for row, in self._fetch(sql, params)], dtype=np.int64)
+        if limit is not None and len(rows) > limit:
+            return rows[:limit], int(rows[limit])
+        return rows, None
+
+    def query(self, **filters):
+        """Get the ascending rows of every event matching the filters (see page)."""
+        return self.page(**filters)[0]
+
+    def record(self, row):
+        """Get the JSON record of a row, or None if there is no such row."""
+        found = self._fetch('SELECT record FROM events WHERE row = ?', (row,))
+        return found[0][0] if found else None
+
+    def record_chunks(self, rows, fields=None):
+        """Yield the JSON records of rows, STREAM_CHUNK_ROWS at a time, keeping only fields if given."""
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = rows[start:start + STREAM_CHUNK_ROWS]
+            chunk = chunk.tolist() if isinstance(chunk, np.ndarray) else list(chunk)
+            records = dict(self._fetch(
+                f"SELECT row, record FROM events WHERE row IN ({','.join('?' * len(chunk))})", chunk
+            ))
+            chunk = [records[row] for row in chunk]
+            if fields:
+                chunk = [project_record(record, fields) for record in chunk]
+            yield chunk
+
+    def events(self, rows):
+        """Load the events of rows as dicts, in the order given."""
+        return [json.loads(record) for records in self.record_chunks(rows) for record in records]
+
+    def bot_ids(self):
+        """Get the sorted bot ids that have at least one path."""
+        return [bot_id for bot_id, in self._fetch(
+            'SELECT DISTINCT bot_id FROM paths WHERE bot_id IS NOT NULL ORDER BY bot_id'
+        )]
+
+    def segments_for_bot(self, bot_id=None):
+        """Get the paths of one bot, or all paths if bot_id is None, as PathOffsetIndex segments."""
+        sql = 'SELECT path_id, bot_id, timestamp, end_row, src_x, src_y, dest_x, dest_y FROM paths'
+        params = ()
+        if bot_id is not None:
+            sql += ' WHERE bot_id = ?'
+            params = (bot_id,)
+        segments = []
+        for path_id, path_bot_id, timestamp, end_row, src_x, src_y, dest_x, dest_y in self._fetch(
+                sql + ' ORDER BY path_id', params):
+            src = _coordinate_label(src_x, src_y)
+            dest = _coordinate_label(dest_x, dest_y)
+            segments.append({
+                'segment': path_id,
+                'bot_id': path_bot_id,
+                'timestamp': timestamp,
+                'src': src,
+                'dest': dest,
+                'label': f"Path {path_id + 1}: {src} → {dest}",
+                'closed': end_row is not None,
+            })
+        return segments
+
+    def load_segment(self, segment_id):
+        """Load the events from a path's start row to its end row (or the end of its log).
+
+        As with PathOffsetIndex.load_segment, the events of every bot logged
+        in between are included, and the segment is cached after the first call.
+        """
+        with self._cache_lock:
+            events = self._segment_cache.pop(segment_id, None)
+        if events is None:
+            found = self._fetch(
+                'SELECT start_row, COALESCE(end_row, logs.first_row + logs.events - 1) '
+                'FROM paths JOIN logs USING (log_id) WHERE path_id = ?', (segment_id,)
+            )
+            if not found:
+                return []
+            start_row, end_row = found[0]
+            events = self.events(range(start_row, end_row + 1))
+        with self._cache_lock:
+            self._segment_cache.pop(segment_id, None)
+            if len(self._segment_cache) >= self.max_cached_segments:
+                # Drop the least recently used segment (dicts keep insertion order)
+                del self._segment_cache[next(iter(self._segment_cache))]
+            self._segment_cache[segment_id] = events
+        return events
+
+    def cached_segments(self):
+        """Return the loaded segments currently held in memory."""
+        with self._cache_lock:
+            return list(self._segment_cache.values())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python event_db.py <database> [log or parsed .json files to import...]")
+        sys.exit(1)
+
+    database = EventDatabase(sys.argv[1])
+    for path in sys.argv[2:]:
+        started = time.perf_counter()
+        added = database.import_log(path)
+        if added:
+            print(f"{os.path.basename(path)}: {added:,} events in {time.perf_counter() - started:.1f} s")
+        else:
+            print(f"{os.path.basename(path)}: already imported")
+    print(f"{sys.argv[1]}: {len(database):,} events, {database.path_count():,} paths, {database.log_count():,} logs")
@@ -0,0 +1,351 @@
+import re
+
+import numpy as np
+
+from event_store import CONFLICT_TYPE_CODES, DIRECTION_CODES, EVENT_TYPE_CODES, MISSING
+
+# Time-of-day values (10:02:03) are compared with the timestamp modulo one day
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Filterable fields: name -> (event column, kind). A kind is 'int', 'time',
+# 'bool', 'bot' or the dictionary of codes of a categorical column
+FIELDS = {
+    'event': ('event', EVENT_TYPE_CODES),
+    'bot_id': ('bot', 'bot'),
+    'x': ('x', 'int'),
+    'y': ('y', 'int'),
+    'from_x': ('from_x', 'int'),
+    'from_y': ('from_y', 'int'),
+    't': ('timestamp_ms', 'time'),
+    'timestamp': ('timestamp_ms', 'time'),
+    'neighbor_count': ('neighbor_count', 'int'),
+    'conflict_type': ('conflict_type', CONFLICT_TYPE_CODES),
+    'direction': ('direction', DIRECTION_CODES),
+    'rejected': ('rejected', 'bool'),
+    'conflict_found': ('conflict_found', 'bool'),
+}
+# Columns of the fields an event database (see event_db.py) can filter on
+DATABASE_COLUMNS = {'event': 'event', 'bot_id': 'bot_id', 'x': 'x', 'y': 'y', 't': 'timestamp_ms',
+                    'timestamp': 'timestamp_ms'}
+
+COMPARISONS = {
+    '==': np.equal,
+    '=': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+KEYWORDS = {'and', 'or', 'not', 'in', 'between', 'true', 'false'}
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<datetime>\d{4}-\d{2}-\d{2}[T\ ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d{1,3})?)?)
+      | (?P<time>\d{1,2}:\d{2}(?::\d{2}(?:\.\d{1,3})?)?)
+      | (?P<number>-?\d+)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<operator>==|!=|<=|>=|<|>|=|\(|\)|,)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+
+def tokenize(text):
+    """Split a filter expression into (kind, text, position) tokens; raise ValueError on anything else."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unexpected character at {position + 1}: {text[position:position + 10]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == 'string':
+            value = value[1:-1]
+        elif kind == 'word' and value.lower() in KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value, start))
+        position = match.end()
+    return tokens
+
+
+def _time_of_day_ms(text):
+    """Milliseconds since midnight of an "HH:MM[:SS[.fff]]" value."""
+    clock, _, fraction = text.partition('.')
+    hours, minutes, *seconds = (int(part) for part in clock.split(':'))
+    return ((hours * 60 + minutes) * 60 + (seconds[0] if seconds else 0)) * 1000 + int(fraction.ljust(3, '0') or 0)
+
+
+def _datetime_ms(text):
+    """Epoch milliseconds of a "YYYY-MM-DD HH:MM[:SS[.fff]]" value, read like the log timestamps."""
+    date, _, clock = text.replace('T', ' ').partition(' ')
+    return int(np.datetime64(date, 'ms').astype(np.int64)) + _time_of_day_ms(clock)
+
+
+class _Parser:
+    """
+    Recursive descent over the tokens of a filter expression:
+        expression := term ('or' term)*
+        term       := factor ('and' factor)*
+        factor     := 'not' factor | '(' expression ')' | condition
+        condition  := field [('==' | '!=' | '<' | '<=' | '>' | '>=') value
+                      | ['not'] 'in' '(' value (',' value)* ')'
+                      | 'between' value 'and' value]
+    A field alone is a condition for the boolean fields. Each node is a tuple
+    whose values are already converted for their field (codes, ints,
+    milliseconds).
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty filter expression")
+        tree = self._expression()
+        if self.position < len(self.tokens):
+            self._fail("Unexpected")
+        return tree
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None, len(self.text))
+
+    def _accept(self, kind, value=None):
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return token
+        return None
+
+    def _expect(self, kind, value=None):
+        token = self._accept(kind, value)
+        if token is None:
+            self._fail(f"Expected {value or kind}")
+        return token
+
+    def _fail(self, message):
+        kind, value, position = self._peek()
+        found = f"{value!r} at {position + 1}" if kind is not None else "end of expression"
+        raise ValueError(f"{message}, found {found}")
+
+    def _expression(self):
+        node = self._term()
+        while self._accept('keyword', 'or'):
+            node = ('or', node, self._term())
+        return node
+
+    def _term(self):
+        node = self._factor()
+        while self._accept('keyword', 'and'):
+            node = ('and', node, self._factor())
+        return node
+
+    def _factor(self):
+        if self._accept('keyword', 'not'):
+            return ('not', self._factor())
+        if self._accept('operator', '('):
+            node = self._expression()
+            self._expect('operator', ')')
+            return node
+        return self._condition()
+
+    def _condition(self):
+        kind, name, position = self._peek()
+        if kind != 'word' or name not in FIELDS:
+            self._fail(f"Expected a field ({', '.join(FIELDS)})")
+        self.position += 1
+        field_kind = FIELDS[name][1]
+
+        operator = self._accept('operator')
+        if operator is not None and operator[1] in COMPARISONS:
+            field, value = self._value(name)
+            if not isinstance(field_kind, str) or field_kind == 'bot':
+                if operator[1] not in ('==', '=', '!='):
+                    raise ValueError(f"{name} only supports ==, != and in")
+            return ('compare', field, operator[1], value)
+        if operator is not None:
+            self.position -= 1
+
+        negate = self._accept('keyword', 'not') is not None
+        if self._accept('keyword', 'in'):
+            self._expect('operator', '(')
+            values = [self._value(name)]
+            while self._accept('operator', ','):
+                values.append(self._value(name))
+            self._expect('operator', ')')
+            return ('in', self._same_field(name, values), [value for _, value in values], negate)
+        if negate:
+            self._fail("Expected in")
+
+        if self._accept('keyword', 'between'):
+            low = self._value(name)
+            self._expect('keyword', 'and')
+            high = self._value(name)
+            if field_kind not in ('int', 'time'):
+                raise ValueError(f"{name} does not support between")
+            return ('between', self._same_field(name, [low, high]), low[1], high[1])
+
+        if field_kind == 'bool':
+            return ('compare', name, '==', True)
+        self._fail(f"Expected a comparison after {name}")
+
+    def _same_field(self, name, values):
+        fields = {field for field, _ in values}
+        if len(fields) > 1:
+            raise ValueError(f"Cannot mix dates and times of day in one {name} condition")
+        return fields.pop()
+
+    def _value(self, name):
+        """Read a literal and convert it for the field; return (field, value).
+
+        The field is 'time_of_day' instead of the time field when a time
+        field is compared with a time of day.
+        """
+        kind, text, position = self._peek()
+        if kind not in ('datetime', 'time', 'number', 'string', 'word', 'keyword') or \
+                kind == 'keyword' and text not in ('true', 'false'):
+            self._fail("Expected a value")
+        self.position += 1
+        field_kind = FIELDS[name][1]
+
+        if field_kind == 'time':
+            if kind == 'string':
+                # A quoted date and time may hold a space
+                match = TOKEN_RE.fullmatch(text)
+                kind = match.lastgroup if match else kind
+            if kind == 'datetime':
+                return name, _datetime_ms(text)
+            if kind == 'time':
+                return 'time_of_day', _time_of_day_ms(text)
+        elif field_kind == 'int':
+            if kind == 'number':
+                return name, int(text)
+        elif field_kind == 'bool':
+            if kind == 'keyword':
+                return name, text == 'true'
+        elif field_kind == 'bot':
+            if kind in ('number', 'string', 'word'):
+                return name, text
+        elif kind in ('string', 'word'):
+            if text not in field_kind:
+                raise ValueError(f"Unknown {name} {text!r} (one of {', '.join(field_kind)})")
+            return name, field_kind[text]
+        raise ValueError(f"Invalid value for {name}: {text!r} at {position + 1}")
+
+
+def _field_values(field, columns):
+    """Get the values a field is compared on and the mask of events that have one (None if all do)."""
+    if field == 'time_of_day':
+        return columns['timestamp_ms'] % DAY_MS, columns['has_timestamp']
+    column, kind = FIELDS[field]
+    values = columns[column]
+    if kind == 'time':
+        return values, columns['has_timestamp']
+    if kind == 'bool':
+        return values, None
+    return values, values != MISSING
+
+
+def _codes(field, values, columns):
+    """Convert bot ids to the codes of the bot column (bot ids not in the columns match nothing)."""
+    if field != 'bot_id':
+        return values
+    bot_codes = {bot_id: code for code, bot_id in enumerate(columns['bot_ids'])}
+    return [bot_codes.get(value, MISSING - 1) for value in values]
+
+
+def _mask(node, columns):
+    """Evaluate a parsed node over the event columns."""
+    kind = node[0]
+    if kind == 'and':
+        return _mask(node[1], columns) & _mask(node[2], columns)
+    if kind == 'or':
+        return _mask(node[1], columns) | _mask(node[2], columns)
+    if kind == 'not':
+        return ~_mask(node[1], columns)
+
+    field = node[1]
+    values, present = _field_values(field, columns)
+    if kind == 'compare':
+        mask = COMPARISONS[node[2]](values, _codes(field, [node[3]], columns)[0])
+    elif kind == 'in':
+        # In lists are short, and OR-ed comparisons beat the sort behind np.isin
+        mask = np.zeros(len(values), dtype=bool)
+        for value in _codes(field, node[2], columns):
+            mask |= values == value
+        if node[3]:
+            mask = ~mask
+    else:
+        mask = (values >= node[2]) & (values <= node[3])
+    # Events without a value for the field match no condition on it
+    return mask & present if present is not None else mask
+
+
+def _sql(node, params):
+    """Render a parsed node as an SQL condition over the event database columns, adding its parameters."""
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return f"({_sql(node[1], params)} {kind.upper()} {_sql(node[2], params)})"
+    if kind == 'not':
+        return f"NOT {_sql(node[1], params)}"
+
+    field = node[1]
+    column = DATABASE_COLUMNS.get('t' if field == 'time_of_day' else field)
+    if column is None:
+        raise ValueError(f"{field} cannot be filtered in an event database "
+                         f"(only {', '.join(sorted(set(DATABASE_COLUMNS)))})")
+    value = f"({column} % {DAY_MS})" if field == 'time_of_day' else column
+    if kind == 'compare':
+        params.append(node[3])
+        condition = f"{value} {'=' if node[2] == '==' else node[2]} ?"
+    elif kind == 'in':
+        params.extend(node[2])
+        condition = f"{value} {'NOT IN' if node[3] else 'IN'} ({', '.join('?' * len(node[2]))})"
+    else:
+        params.extend((node[2], node[3]))
+        condition = f"{value} BETWEEN ? AND ?"
+    # Never NULL, so NOT keeps the same meaning as in the NumPy masks
+    return f"({column} IS NOT NULL AND {condition})"
+
+
+class EventFilter:
+    """
+    A compiled filter expression over the event columns, e.g.
+        event in (conflict_check, pause_node) and bot_id == 12
+        and x between 100 and 140 and t > 10:02:03
+    Conditions compare a field with ==, !=, <, <=, >, >=, in (...),
+    not in (...) or between ... and ..., and combine with and / or / not and
+    parentheses. Times are a time of day (10:02:03.250) or a date and time
+    ('2024-05-01 10:02:03'). Events without a value for a field (no
+    coordinate, no timestamp) match no condition on it.
+
+    The expression is parsed once; mask(columns) evaluates it over the
+    columns of event_store.build_event_columns as NumPy boolean masks.
+    Invalid expressions raise ValueError.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tree = _Parser(text).parse()
+
+    def mask(self, columns):
+        """Get the boolean mask of the events matching the expression."""
+        return _mask(self.tree, columns)
+
+    def rows(self, columns):
+        """Get the ascending rows of the events matching the expression."""
+        return np.flatnonzero(self.mask(columns))
+
+    def sql(self):
+        """Get (condition, parameters) over the events table of an event database; ValueError for unsupported fields."""
+        params = []
+        return _sql(self.tree, params), params
+
+
+def compile_filter(text):
+    """Compile a filter expression (see EventFilter)."""
+    return EventFilter(text)
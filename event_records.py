@@ -0,0 +1,471 @@
+# Typed, __slots__-based event records, built by PathLogParser's handlers.
+# Coordinates are stored flat (x / y, from_x / from_y, ...) as ints, or None
+# where the parser had no coordinate, and to_dict() rebuilds the exact dict the
+# parser emits in its default mode. The record types of the hot handlers also
+# have a from_fields() constructor, so the parser builds them without a dict,
+# and a literal to_dict(), since every default-mode parse converts them.
+
+
+def _xy(coord):
+    """Split a {"x": .., "y": ..} dict into (x, y), (None, None) if missing."""
+    if coord:
+        return coord.get('x'), coord.get('y')
+    return None, None
+
+
+def _coordinate(x, y):
+    """Rebuild the parser's coordinate dict from flat fields."""
+    return {"x": x, "y": y} if x is not None else None
+
+
+class EventRecord:
+    """
+    Base of the typed event records: one class per event type, with the
+    fields of the parser's dict as slots. Besides attribute access, records
+    answer dict-style reads (event['coordinate'], event.get('src'),
+    'FScore' in event) with the same values as the dict, building nested
+    values on demand, so code written for dict events accepts records too.
+    """
+    __slots__ = ('event_id', 'timestamp', 'bot_id')
+    event = None
+    # Keys of to_dict(), in the parser's order
+    KEYS = ('event_id', 'event', 'timestamp', 'bot_id')
+
+    def __init__(self, event):
+        self.event_id = event.get('event_id')
+        self.timestamp = event.get('timestamp')
+        self.bot_id = event.get('bot_id')
+
+    def keys(self):
+        return self.KEYS
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def to_dict(self):
+        """Return the event as the dict PathLogParser emits by default (JSON compatible)."""
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.keys() else default
+
+    def __getitem__(self, key):
+        if key in self.keys():
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, EventRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+class _NodeRecord(EventRecord):
+    """An event at one node: coordinate as flat x / y."""
+    __slots__ = ('x', 'y')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.x, self.y = _xy(event.get('coordinate'))
+
+    @property
+    def coordinate(self):
+        return _coordinate(self.x, self.y)
+
+
+class _EdgeRecord(_NodeRecord):
+    """A node event reached from another node: from_coordinate as flat from_x / from_y."""
+    __slots__ = ('from_x', 'from_y')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.from_x, self.from_y = _xy(event.get('from_coordinate'))
+
+    @property
+    def from_coordinate(self):
+        return _coordinate(self.from_x, self.from_y)
+
+
+class PathCalculationStarted(EventRecord):
+    """
+    Start of a path calculation. x / y and bot_direction are the source node,
+    dest_x / dest_y the destination; src / dest are empty dicts when the log
+    line had none, as in the parser's dict.
+    """
+    __slots__ = ('x', 'y', 'bot_direction', 'dest_x', 'dest_y')
+    event = 'path_calculation_started'
+    KEYS = EventRecord.KEYS + ('src', 'dest')
+
+    def __init__(self, event):
+        super().__init__(event)
+        src = event.get('src') or {}
+        self.x, self.y = _xy(src.get('coordinate'))
+        self.bot_direction = src.get('bot_direction')
+        self.dest_x, self.dest_y = _xy((event.get('dest') or {}).get('coordinate'))
+
+    @property
+    def src(self):
+        if self.x is None:
+            return {}
+        return {"coordinate": _coordinate(self.x, self.y), "bot_direction": self.bot_direction}
+
+    @property
+    def dest(self):
+        if self.dest_x is None:
+            return {}
+        return {"coordinate": _coordinate(self.dest_x, self.dest_y)}
+
+
+class PathCalculationEnded(EventRecord):
+    __slots__ = ('status', 'path_length')
+    event = 'path_calculation_ended'
+    KEYS = EventRecord.KEYS + ('status', 'path_length')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.status = event.get('status')
+        self.path_length = event.get('path_length')
+
+
+class ChosenNode(_EdgeRecord):
+    __slots__ = ('GCost', 'HCost', 'FScore', 'bot_direction', 'physical_direction', 'rack_direction')
+    event = 'chosen_node'
+    KEYS = EventRecord.KEYS + ('coordinate', 'from_coordinate', 'GCost', 'HCost', 'FScore',
+                               'bot_direction', 'physical_direction', 'rack_direction')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.GCost = event.get('GCost')
+        self.HCost = event.get('HCost')
+        self.FScore = event.get('FScore')
+        self.bot_direction = event.get('bot_direction')
+        self.physical_direction = event.get('physical_direction')
+        self.rack_direction = event.get('rack_direction')
+
+    @classmethod
+    def from_fields(cls, event_id, timestamp, bot_id, x, y, from_x, from_y, GCost, HCost, FScore,
+                    bot_direction, physical_direction, rack_direction):
+        """Build the record from parsed fields, without an event dict."""
+        record = cls.__new__(cls)
+        record.event_id, record.timestamp, record.bot_id = event_id, timestamp, bot_id
+        record.x, record.y, record.from_x, record.from_y = x, y, from_x, from_y
+        record.GCost, record.HCost, record.FScore = GCost, HCost, FScore
+        record.bot_direction, record.physical_direction, record.rack_direction = \
+            bot_direction, physical_direction, rack_direction
+        return record
+
+    def to_dict(self):
+        return {
+            "event_id": self.event_id,
+            "event": "chosen_node",
+            "timestamp": self.timestamp,
+            "bot_id": self.bot_id,
+            "coordinate": {"x": self.x, "y": self.y} if self.x is not None else None,
+            "from_coordinate": {"x": self.from_x, "y": self.from_y} if self.from_x is not None else None,
+            "GCost": self.GCost,
+            "HCost": self.HCost,
+            "FScore": self.FScore,
+            "bot_direction": self.bot_direction,
+            "physical_direction": self.physical_direction,
+            "rack_direction": self.rack_direction
+        }
+
+
+class NeighbourNodes(EventRecord):
+    """
+    Neighbours of the current node. neighbors holds one
+    (x, y, bot_direction, rack_direction, turn_tag, moving_status) tuple per
+    parsed neighbour; parsed_neighbors rebuilds the parser's list of dicts.
+    """
+    __slots__ = ('neighbors_raw', 'neighbors')
+    event = 'neighbour_nodes'
+    KEYS = EventRecord.KEYS + ('neighbors_raw', 'parsed_neighbors')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.neighbors_raw = event.get('neighbors_raw')
+        self.neighbors = tuple(
+            _xy(neighbor['coordinate']) + (neighbor.get('bot_direction'), neighbor.get('rack_direction'),
+                                           neighbor.get('turn_tag'), neighbor.get('moving_status'))
+            for neighbor in event.get('parsed_neighbors') or ()
+        )
+
+    @classmethod
+    def from_fields(cls, event_id, timestamp, bot_id, neighbors_raw, neighbors):
+        """Build the record from parsed fields (neighbors as tuples), without an event dict."""
+        record = cls.__new__(cls)
+        record.event_id, record.timestamp, record.bot_id = event_id, timestamp, bot_id
+        record.neighbors_raw, record.neighbors = neighbors_raw, neighbors
+        return record
+
+    def to_dict(self):
+        return {
+            "event_id": self.event_id,
+            "event": "neighbour_nodes",
+            "timestamp": self.timestamp,
+            "bot_id": self.bot_id,
+            "neighbors_raw": self.neighbors_raw,
+            "parsed_neighbors": self.parsed_neighbors
+        }
+
+    @property
+    def parsed_neighbors(self):
+        return [
+            {
+                "coordinate": {"x": x, "y": y},
+                "bot_direction": bot_direction,
+                "rack_direction": rack_direction,
+                "turn_tag": turn_tag,
+                "moving_status": moving_status
+            }
+            for x, y, bot_direction, rack_direction, turn_tag, moving_status in self.neighbors
+        ]
+
+
+class ExploringNode(_NodeRecord):
+    """Node being explored; rejection_reason is None (and not a key) unless the planner rejected it."""
+    __slots__ = ('bot_direction', 'physical_direction', 'rack_direction', 'status', 'rejection_reason')
+    event = 'exploring_node'
+    KEYS = EventRecord.KEYS + ('coordinate', 'bot_direction', 'physical_direction', 'rack_direction', 'status')
+    REJECTED_KEYS = KEYS + ('rejection_reason',)
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.bot_direction = event.get('bot_direction')
+        self.physical_direction = event.get('physical_direction')
+        self.rack_direction = event.get('rack_direction')
+        self.status = event.get('status')
+        self.rejection_reason = event.get('rejection_reason')
+
+    @classmethod
+    def from_fields(cls, event_id, timestamp, bot_id, x, y, bot_direction, physical_direction, rack_direction,
+                    status, rejection_reason=None):
+        """Build the record from parsed fields, without an event dict."""
+        record = cls.__new__(cls)
+        record.event_id, record.timestamp, record.bot_id = event_id, timestamp, bot_id
+        record.x, record.y = x, y
+        record.bot_direction, record.physical_direction, record.rack_direction = \
+            bot_direction, physical_direction, rack_direction
+        record.status, record.rejection_reason = status, rejection_reason
+        return record
+
+    def to_dict(self):
+        event = {
+            "event_id": self.event_id,
+            "event": "exploring_node",
+            "timestamp": self.timestamp,
+            "bot_id": self.bot_id,
+            "coordinate": {"x": self.x, "y": self.y} if self.x is not None else None,
+            "bot_direction": self.bot_direction,
+            "physical_direction": self.physical_direction,
+            "rack_direction": self.rack_direction,
+            "status": self.status
+        }
+        if self.rejection_reason is not None:
+            event["rejection_reason"] = self.rejection_reason
+        return event
+
+    def keys(self):
+        return self.KEYS if self.rejection_reason is None else self.REJECTED_KEYS
+
+
+class ProcessingNode(_EdgeRecord):
+    __slots__ = ()
+    event = 'processing_node'
+    KEYS = EventRecord.KEYS + ('coordinate', 'from_coordinate')
+
+    @classmethod
+    def from_fields(cls, event_id, timestamp, bot_id, x, y, from_x, from_y):
+        """Build the record from parsed fields, without an event dict."""
+        record = cls.__new__(cls)
+        record.event_id, record.timestamp, record.bot_id = event_id, timestamp, bot_id
+        record.x, record.y, record.from_x, record.from_y = x, y, from_x, from_y
+        return record
+
+    def to_dict(self):
+        return {
+            "event_id": self.event_id,
+            "event": "processing_node",
+            "timestamp": self.timestamp,
+            "bot_id": self.bot_id,
+            "coordinate": {"x": self.x, "y": self.y} if self.x is not None else None,
+            "from_coordinate": {"x": self.from_x, "y": self.from_y} if self.from_x is not None else None
+        }
+
+
+class ConflictCheck(EventRecord):
+    """
+    Conflict check around an anchor node. anchor_x / anchor_y are the anchor
+    and span the flat (x0, y0, x1, y1, ...) cells of its span, in order of
+    first appearance.
+    conflict_reason / conflict_type are None (and not keys) when no conflict
+    reason was found.
+    """
+    __slots__ = ('anchor_x', 'anchor_y', 'span', 'conflict_found', 'conflict_reason', 'conflict_type')
+    event = 'conflict_check'
+    KEYS = EventRecord.KEYS + ('anchor_coordinate', 'span', 'conflict_found')
+    CONFLICT_KEYS = KEYS + ('conflict_reason', 'conflict_type')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.anchor_x, self.anchor_y = _xy(event.get('anchor_coordinate'))
+        self.span = tuple(event.get('span') or ())
+        self.conflict_found = event.get('conflict_found')
+        self.conflict_reason = event.get('conflict_reason')
+        self.conflict_type = event.get('conflict_type')
+
+    @classmethod
+    def from_fields(cls, event_id, timestamp, bot_id, anchor_x, anchor_y, span, conflict_found,
+                    conflict_reason=None, conflict_type=None):
+        """Build the record from parsed fields, without an event dict."""
+        record = cls.__new__(cls)
+        record.event_id, record.timestamp, record.bot_id = event_id, timestamp, bot_id
+        record.anchor_x, record.anchor_y, record.span = anchor_x, anchor_y, span
+        record.conflict_found, record.conflict_reason, record.conflict_type = \
+            conflict_found, conflict_reason, conflict_type
+        return record
+
+    def to_dict(self):
+        event = {
+            "event_id": self.event_id,
+            "event": "conflict_check",
+            "timestamp": self.timestamp,
+            "bot_id": self.bot_id,
+            "anchor_coordinate": {"x": self.anchor_x, "y": self.anchor_y},
+            "span": self.span,
+            "conflict_found": self.conflict_found
+        }
+        if self.conflict_reason is not None:
+            event["conflict_reason"] = self.conflict_reason
+            event["conflict_type"] = self.conflict_type
+        return event
+
+    def keys(self):
+        return self.KEYS if self.conflict_reason is None else self.CONFLICT_KEYS
+
+    @property
+    def anchor_coordinate(self):
+        return {"x": self.anchor_x, "y": self.anchor_y}
+
+
+class ConflictDetected(_NodeRecord):
+    __slots__ = ('conflict_reason', 'conflict_type')
+    event = 'conflict_detected'
+    conflict_found = True
+    KEYS = EventRecord.KEYS + ('coordinate', 'conflict_found', 'conflict_reason', 'conflict_type')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.conflict_reason = event.get('conflict_reason')
+        self.conflict_type = event.get('conflict_type')
+
+
+class AddedNode(_EdgeRecord):
+    __slots__ = ('turn_tag', 'moving_status', 'bot_direction', 'physical_direction', 'rack_direction',
+                 'GCost', 'HCost', 'FScore', 'pause_time')
+    event = 'added_node'
+    KEYS = EventRecord.KEYS + ('coordinate', 'from_coordinate', 'turn_tag', 'moving_status', 'bot_direction',
+                               'physical_direction', 'rack_direction', 'GCost', 'HCost', 'FScore', 'pause_time')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.turn_tag = event.get('turn_tag')
+        self.moving_status = event.get('moving_status')
+        self.bot_direction = event.get('bot_direction')
+        self.physical_direction = event.get('physical_direction')
+        self.rack_direction = event.get('rack_direction')
+        self.GCost = event.get('GCost')
+        self.HCost = event.get('HCost')
+        self.FScore = event.get('FScore')
+        self.pause_time = event.get('pause_time')
+
+    @classmethod
+    def from_fields(cls, event_id, timestamp, bot_id, x, y, from_x, from_y, turn_tag, moving_status,
+                    bot_direction, physical_direction, rack_direction, GCost, HCost, FScore, pause_time):
+        """Build the record from parsed fields, without an event dict."""
+        record = cls.__new__(cls)
+        record.event_id, record.timestamp, record.bot_id = event_id, timestamp, bot_id
+        record.x, record.y, record.from_x, record.from_y = x, y, from_x, from_y
+        record.turn_tag, record.moving_status = turn_tag, moving_status
+        record.bot_direction, record.physical_direction, record.rack_direction = \
+            bot_direction, physical_direction, rack_direction
+        record.GCost, record.HCost, record.FScore, record.pause_time = GCost, HCost, FScore, pause_time
+        return record
+
+    def to_dict(self):
+        return {
+            "event_id": self.event_id,
+            "event": "added_node",
+            "timestamp": self.timestamp,
+            "bot_id": self.bot_id,
+            "coordinate": {"x": self.x, "y": self.y} if self.x is not None else None,
+            "from_coordinate": {"x": self.from_x, "y": self.from_y} if self.from_x is not None else None,
+            "turn_tag": self.turn_tag,
+            "moving_status": self.moving_status,
+            "bot_direction": self.bot_direction,
+            "physical_direction": self.physical_direction,
+            "rack_direction": self.rack_direction,
+            "GCost": self.GCost,
+            "HCost": self.HCost,
+            "FScore": self.FScore,
+            "pause_time": self.pause_time
+        }
+
+
+class PauseNode(_NodeRecord):
+    __slots__ = ('bot_direction', 'rack_direction', 'pause_time', 'reason')
+    event = 'pause_node'
+    KEYS = EventRecord.KEYS + ('coordinate', 'bot_direction', 'rack_direction', 'pause_time', 'reason')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.bot_direction = event.get('bot_direction')
+        self.rack_direction = event.get('rack_direction')
+        self.pause_time = event.get('pause_time')
+        self.reason = event.get('reason')
+
+
+class CannotRevisitNode(_EdgeRecord):
+    __slots__ = ('turn_tag', 'moving_status', 'bot_direction', 'rack_direction', 'reason')
+    event = 'cannot_revisit_node'
+    KEYS = EventRecord.KEYS + ('coordinate', 'from_coordinate', 'turn_tag', 'moving_status',
+                               'bot_direction', 'rack_direction', 'reason')
+
+    def __init__(self, event):
+        super().__init__(event)
+        self.turn_tag = event.get('turn_tag')
+        self.moving_status = event.get('moving_status')
+        self.bot_direction = event.get('bot_direction')
+        self.rack_direction = event.get('rack_direction')
+        self.reason = event.get('reason')
+
+
+# Record class for each event type produced by PathLogParser
+RECORD_TYPES = {
+    record_type.event: record_type
+    for record_type in (PathCalculationStarted, PathCalculationEnded, ChosenNode, NeighbourNodes, ExploringNode,
+                        ProcessingNode, ConflictCheck, ConflictDetected, AddedNode, PauseNode, CannotRevisitNode)
+}
+
+
+def event_record(event):
+    """Convert a parsed event dict into its EventRecord (records are returned as they are)."""
+    if isinstance(event, EventRecord):
+        return event
+    return RECORD_TYPES[event['event']](event)
+
+
+def events_to_dicts(events):
+    """Convert a list of events (records or dicts) into the parser's dicts, e.g. for JSON or pandas."""
+    return [event.to_dict() if isinstance(event, EventRecord) else event for event in events]
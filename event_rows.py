@@ -0,0 +1,26 @@
+# Helpers shared by the two queryable event stores, the in-memory
+# EventQueryIndex (query_service.py) and the SQLite EventDatabase (event_db.py):
+# row sets, timestamp query values and the serialized JSON records.
+import json
+
+import numpy as np
+
+# Records serialized at a time for a response
+STREAM_CHUNK_ROWS = 1000
+# Row set of a query that matches no events
+EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+
+def parse_timestamp_ms(text):
+    """Parse a log timestamp ("2024-05-01 10:00:00.123") to epoch milliseconds, or None."""
+    try:
+        value = np.datetime64(text.strip().replace(' ', 'T'), 'ms')
+    except ValueError:
+        return None
+    return None if np.isnat(value) else int(value.astype(np.int64))
+
+
+def project_record(record, fields):
+    """Re-serialize a JSON record keeping only the given fields."""
+    event = json.loads(record)
+    return json.dumps({name: value for name, value in event.items() if name in fields}, separators=(',', ':')).encode()
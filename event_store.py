@@ -0,0 +1,209 @@
+from itertools import repeat
+
+import numpy as np
+
+from log_parser import CONFLICT_TYPES, DIRECTIONS
+
+# Event types produced by PathLogParser, in a fixed order so that the
+# integer codes stored in the columns stay stable between runs.
+EVENT_TYPES = [
+    'path_calculation_started',
+    'path_calculation_ended',
+    'chosen_node',
+    'neighbour_nodes',
+    'exploring_node',
+    'processing_node',
+    'conflict_check',
+    'conflict_detected',
+    'added_node',
+    'pause_node',
+    'cannot_revisit_node',
+]
+EVENT_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+CONFLICT_TYPE_CODES = {name: code for code, name in enumerate(CONFLICT_TYPES)}
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
+# Sentinel for missing coordinates / bots in the integer columns
+MISSING = -1
+# Stands in for a missing coordinate dict while the coordinate columns are built
+NO_COORDINATE = {'x': MISSING, 'y': MISSING}
+# Event types that carry a from_coordinate / a conflict outcome
+EDGE_EVENTS = ('chosen_node', 'processing_node', 'added_node', 'cannot_revisit_node')
+CONFLICT_EVENTS = ('conflict_check', 'conflict_detected')
+
+
+def event_direction(event):
+    """Get the bot direction of an event, falling back to the source node's."""
+    direction = event.get('bot_direction')
+    if direction is None and 'src' in event:
+        direction = event['src'].get('bot_direction')
+    return direction
+
+
+def _rows_of(events, event_col, *names):
+    """Get the rows of the events of the given types, and those events."""
+    selected = np.zeros(len(event_col), dtype=bool)
+    for name in names:
+        selected |= event_col == EVENT_TYPE_CODES[name]
+    rows = np.flatnonzero(selected)
+    return rows, [events[row] for row in rows.tolist()]
+
+
+def build_event_columns(events):
+    """Convert a list of parsed events into a dictionary of NumPy columns.
+
+    The columns are aligned with the input list (row i describes events[i]):
+        event:           int8 event type code (see EVENT_TYPES), -1 if unknown
+        bot:             int32 index into the 'bot_ids' list, -1 if missing
+        timestamp_ms:    int64 milliseconds since epoch
+        has_timestamp:   bool
+        x, y:            int32 primary coordinate, -1 if missing
+        from_x, from_y:  int32 from_coordinate, -1 if missing
+        rejected:        bool, exploring_node rejected by the planner
+        conflict_found:  bool, conflict_check / conflict_detected with a conflict
+        conflict_type:   int8 code into CONFLICT_TYPES, -1 if no conflict
+        neighbor_count:  int32 number of parsed neighbours for neighbour_nodes
+        direction:       int8 bot direction code into DIRECTIONS, -1 if missing
+    """
+    n = len(events)
+
+    # One list comprehension per field, mapped to codes in C (map over dict.get) and
+    # converted to its column in a single np.fromiter call
+    kinds = [event.get('event') for event in events]
+    event_col = np.fromiter(map(EVENT_TYPE_CODES.get, kinds, repeat(MISSING)), np.int8, n)
+    path_starts = np.flatnonzero(event_col == EVENT_TYPE_CODES['path_calculation_started']).tolist()
+
+    bot_values = [event.get('bot_id') for event in events]
+    # dict.fromkeys keeps the bots in order of first appearance
+    bot_ids = [bot_id for bot_id in dict.fromkeys(bot_values) if bot_id]
+    bot_codes = {bot_id: code for code, bot_id in enumerate(bot_ids)}
+    bot_col = np.fromiter(map(bot_codes.get, bot_values, repeat(MISSING)), np.int32, n)
+
+    # Conflict checks are placed at their anchor and path starts (few rows) at their source
+    coords = [event.get('coordinate') or event.get('anchor_coordinate') or NO_COORDINATE for event in events]
+    for row in path_starts:
+        if coords[row] is NO_COORDINATE:
+            coords[row] = (events[row].get('src') or {}).get('coordinate') or NO_COORDINATE
+
+    # Fields only some event types carry are read from the rows of those types alone
+    from_x_col = np.full(n, MISSING, dtype=np.int32)
+    from_y_col = np.full(n, MISSING, dtype=np.int32)
+    rows, selected = _rows_of(events, event_col, *EDGE_EVENTS)
+    from_coords = [event.get('from_coordinate') or NO_COORDINATE for event in selected]
+    from_x_col[rows] = np.fromiter([coord['x'] for coord in from_coords], np.int32, len(rows))
+    from_y_col[rows] = np.fromiter([coord['y'] for coord in from_coords], np.int32, len(rows))
+
+    rejected_col = np.zeros(n, dtype=bool)
+    rows, selected = _rows_of(events, event_col, 'exploring_node')
+    rejected_col[rows] = np.fromiter([event.get('status') == 'rejected' for event in selected], bool, len(rows))
+
+    conflict_col = np.zeros(n, dtype=bool)
+    conflict_type_col = np.full(n, MISSING, dtype=np.int8)
+    rows, selected = _rows_of(events, event_col, *CONFLICT_EVENTS)
+    conflict_col[rows] = np.fromiter([bool(event.get('conflict_found')) for event in selected], bool, len(rows))
+    conflict_type_col[rows] = np.fromiter(
+        map(CONFLICT_TYPE_CODES.get, [event.get('conflict_type') for event in selected], repeat(MISSING)),
+        np.int8, len(rows)
+    )
+
+    neighbor_col = np.zeros(n, dtype=np.int32)
+    rows, selected = _rows_of(events, event_col, 'neighbour_nodes')
+    neighbor_col[rows] = np.fromiter(
+        map(len, [event.get('parsed_neighbors') or () for event in selected]), np.int32, len(rows)
+    )
+
+    directions = [event.get('bot_direction') for event in events]
+    for row in path_starts:
+        directions[row] = directions[row] or event_direction(events[row])
+    direction_col = np.fromiter(map(DIRECTION_CODES.get, directions, repeat(MISSING)), np.int8, n)
+
+    # Parse all timestamps at once (None becomes NaT) instead of calling strptime per event
+    ts = np.array([event.get('timestamp') for event in events], dtype='datetime64[ms]')
+    has_ts = ~np.isnat(ts)
+
+    return {
+        'event': event_col,
+        'bot': bot_col,
+        'bot_ids': bot_ids,
+        'timestamp_ms': ts.astype(np.int64),
+        'has_timestamp': has_ts,
+        'x': np.fromiter([coord['x'] for coord in coords], np.int32, n),
+        'y': np.fromiter([coord['y'] for coord in coords], np.int32, n),
+        'from_x': from_x_col,
+        'from_y': from_y_col,
+        'rejected': rejected_col,
+        'conflict_found': conflict_col,
+        'conflict_type': conflict_type_col,
+        'neighbor_count': neighbor_col,
+        'direction': direction_col,
+    }
+
+
+def build_path_index(columns):
+    """Index every path_calculation_started segment in the event columns.
+
+    An event belongs to a path segment when it comes after that bot's latest
+    path_calculation_started and no path_calculation_ended of the same bot
+    closed the segment in between; the closing end event is part of the
+    segment. Events of other bots interleaved in the log are not attributed.
+
+    Returns a dictionary with:
+        path_id:    int32 per event, index of its segment or -1
+        start_idx:  int64 per segment, row of the start event
+        end_idx:    int64 per segment, row of the end event or -1 if never closed
+        bot:        int32 per segment, bot code (see columns['bot_ids'])
+    """
+    event = columns['event']
+    bot = columns['bot']
+    n = len(event)
+    path_id = np.full(n, MISSING, dtype=np.int32)
+
+    start_idx = np.flatnonzero(event == EVENT_TYPE_CODES['path_calculation_started'])
+    if n == 0 or len(start_idx) == 0:
+        return {
+            'path_id': path_id,
+            'start_idx': start_idx,
+            'end_idx': np.full(len(start_idx), MISSING, dtype=np.int64),
+            'bot': bot[start_idx],
+        }
+
+    # Walk the events grouped by bot (stable, so log order is kept within a bot)
+    order = np.argsort(bot, kind='stable')
+    sorted_bot = bot[order]
+    sorted_event = event[order]
+    positions = np.arange(n)
+
+    is_start = sorted_event == EVENT_TYPE_CODES['path_calculation_started']
+    is_end = sorted_event == EVENT_TYPE_CODES['path_calculation_ended']
+
+    # Position of the latest start at or before each row
+    last_start = np.maximum.accumulate(np.where(is_start, positions, MISSING))
+    # Position of the latest end strictly before each row
+    last_end = np.maximum.accumulate(np.where(is_end, positions, MISSING))
+    prev_end = np.concatenate(([MISSING], last_end[:-1]))
+
+    safe_start = np.maximum(last_start, 0)
+    in_segment = (
+        (last_start >= 0)
+        & (last_start > prev_end)
+        & (sorted_bot[safe_start] == sorted_bot)
+        & (sorted_bot >= 0)
+    )
+
+    # Map sorted start positions to segment numbers in log order
+    segment_of_row = np.full(n, MISSING, dtype=np.int32)
+    segment_of_row[start_idx] = np.arange(len(start_idx), dtype=np.int32)
+    segment_of_sorted = segment_of_row[order]
+
+    path_id[order[in_segment]] = segment_of_sorted[safe_start[in_segment]]
+
+    end_idx = np.full(len(start_idx), MISSING, dtype=np.int64)
+    closing = np.flatnonzero((event == EVENT_TYPE_CODES['path_calculation_ended']) & (path_id >= 0))
+    end_idx[path_id[closing]] = closing
+
+    return {
+        'path_id': path_id,
+        'start_idx': start_idx,
+        'end_idx': end_idx,
+        'bot': bot[start_idx],
+    }
@@ -0,0 +1,313 @@
+"""
+Synthetic planner logs for scale testing.
+Runs a real A* search for every path request on a warehouse grid (rack
+blocks separated by aisles) with several bots planning concurrently, and
+writes the search as the planner logs it: every tag PathLogParser
+understands, conflict checks against the other bots' reserved paths and
+idle positions, and ordinary non-planner lines in between.
+
+Usage: python log_generator.py <output.log> [--lines N | --size 2G] [--seed S] ...
+"""
+import argparse
+import heapq
+import random
+from datetime import datetime, timedelta
+
+# (name, dx, dy); y grows towards north
+DIRECTIONS = [('north', 0, 1), ('east', 1, 0), ('south', 0, -1), ('west', -1, 0)]
+RACK_DIRECTIONS = ['north', 'east', 'south', 'west']
+TURN_COST = 1
+# Reserved steps this close to the step a cell is entered at are a time conflict
+TIME_CONFLICT_WINDOW = 1
+
+NOISE_LINES = [
+    "heartbeat ok battery={battery} pos={{{x},{y}}} speed=0.0",
+    "task_update task_id=T-{task} state=in_progress rack=R-{rack} station=PPS-{station}",
+    "<0.{pid}.0> sent msg #Ref<0.1.2.3> to charger_manager",
+    "grid_lock acquired cell={{{x},{y}}} holder=butler_{other} wait_ms={wait}",
+]
+
+
+def parse_size(text):
+    """Parse a byte count such as 500M or 2G."""
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class WarehouseGrid:
+    """
+    A width x height grid of rack blocks (rack_width x rack_depth cells)
+    separated by one-cell aisles. Bots drive in the aisles only.
+    """
+
+    def __init__(self, width, height, rack_width=2, rack_depth=4):
+        self.width = width
+        self.height = height
+        self.rack_width = rack_width
+        self.rack_depth = rack_depth
+        self.aisle_cells = [(x, y) for x in range(width) for y in range(height) if self.is_free(x, y)]
+
+    def is_free(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return x % (self.rack_width + 1) == 0 or y % (self.rack_depth + 1) == 0
+
+
+class PathPlanner:
+    """
+    A* search of one bot from src to dest, yielding the log records of the search.
+    Each record is a list of line bodies written together: a conflict check
+    block or a rejected exploring node and its "not included" line must not
+    be split by other bots' lines.
+    """
+
+    def __init__(self, generator, bot, src, dest):
+        self.generator = generator
+        self.rng = generator.rng
+        self.bot = bot
+        self.src = src
+        self.dest = dest
+        self.rack_direction = self.rng.choice(RACK_DIRECTIONS)
+        self.path = None
+
+    def heuristic(self, cell):
+        return abs(cell[0] - self.dest[0]) + abs(cell[1] - self.dest[1])
+
+    def records(self):
+        generator = self.generator
+        rng = self.rng
+        grid = generator.grid
+        rack = self.rack_direction
+        start_direction = rng.choice(RACK_DIRECTIONS)
+        yield [f"#path_calculation_started SRC = {{{{{self.src[0]},{self.src[1]}}},{start_direction},{rack}}} "
+               f"DEST = {{{{{self.dest[0]},{self.dest[1]}}},{rng.choice(RACK_DIRECTIONS)}}}"]
+
+        g_cost = {self.src: 0}
+        parent = {self.src: (self.src, start_direction)}
+        closed = set()
+        counter = 0
+        open_heap = [(self.heuristic(self.src), 0, counter, self.src)]
+        max_expansions = generator.max_expansions
+
+        while open_heap and len(closed) < max_expansions:
+            f, g, _, cell = heapq.heappop(open_heap)
+            if cell in closed or g != g_cost[cell]:
+                continue
+            closed.add(cell)
+            from_cell, direction = parent[cell]
+            h = self.heuristic(cell)
+            turn = 'no_turn_rotate' if from_cell == cell or parent[from_cell][1] == direction else 'turn_rotate'
+            yield [f"#chosen_node = {{{{{cell[0]},{cell[1]}}}, {{{from_cell[0]},{from_cell[1]}}}, rest, butler_moving, "
+                   f"{direction}, {direction}, {rack}, {turn}}}, GCost = {g}, HCost = {h}, FScore = {g + h}"]
+            yield [f"#processing_node = {{{{{cell[0]},{cell[1]}}}, {{{from_cell[0]},{from_cell[1]}}}, rest, "
+                   f"butler_moving, {direction}, {direction}, {rack}}}"]
+            if cell == self.dest:
+                self.path = self._trace(parent, cell)
+                if rng.random() < 0.9:
+                    yield [f"#path_calculation_ended path length = {len(self.path) - 1}"]
+                else:
+                    yield [f"Path calculation ended successfully, path length = {len(self.path) - 1}"]
+                return
+
+            neighbours = []
+            for name, dx, dy in DIRECTIONS:
+                nxt = (cell[0] + dx, cell[1] + dy)
+                if grid.is_free(*nxt):
+                    neighbours.append((name, nxt))
+            yield ["#neighbour_nodes = [" + ",".join(
+                f"{{{{{nxt[0]},{nxt[1]}}},{name},{rack},{'rest' if name == direction else 'no_turn'},butler_moving}}"
+                for name, nxt in neighbours) + "]"]
+
+            for name, nxt in neighbours:
+                turn_tag = 'no_turn' if name == direction else 'turn'
+                if nxt in closed:
+                    if nxt != from_cell:
+                        yield [f"#cannot_revisit_node {{{{{nxt[0]},{nxt[1]}}}, {{{cell[0]},{cell[1]}}}, {turn_tag}, "
+                               f"butler_moving, {name}, {rack}}}"]
+                    continue
+                step = g + 1
+                exploring = f"#exploring_node = {{{{{nxt[0]},{nxt[1]}}}, {name}, {name}, {rack}}}"
+                reservation = generator.reservation(nxt, self.bot)
+                if reservation is not None and abs(reservation[1] - step) <= TIME_CONFLICT_WINDOW:
+                    node = f"{{{{{nxt[0]},{nxt[1]}}}, {name}, {name}, {rack}}}"
+                    reason = f"reason = TIME CONFLICT with butler {reservation[0]}"
+                    # Planner versions put the node after or before the marker; emit both layouts
+                    if step % 2:
+                        yield [exploring, f"not included {node}, {reason}"]
+                    else:
+                        yield [exploring, f"{node} not included, {reason}"]
+                    continue
+
+                span = (nxt[0] + (nxt[0] - cell[0]), nxt[1] + (nxt[1] - cell[1]))
+                block = [exploring,
+                         f"#conflict_check AnchorCoord = {{{nxt[0]},{nxt[1]}}} "
+                         f"SpanCoords = [{{{nxt[0]},{nxt[1]}}},{{{span[0]},{span[1]}}}]"]
+                extra_cost = 0
+                pause_time = 0
+                idle_bot = generator.idle_bot_at(nxt, self.bot)
+                if idle_bot is not None:
+                    block.append(f"#conflict_check butler {idle_bot} has idle conflict at SpanCoord = {{{nxt[0]},{nxt[1]}}}")
+                    extra_cost += 5
+                elif generator.idle_bot_at(span, self.bot) is not None:
+                    block.append(f"#conflict_check Idle reservation on span coordinate = {{{span[0]},{span[1]}}}")
+                    extra_cost += 2
+                conflicts = "[]"
+                if reservation is not None:
+                    conflicts = f"[{{{reservation[0]},{reservation[1]}}}]"
+                    pause_time = rng.randrange(500, 5000)
+                movable = f"[{idle_bot}]" if idle_bot is not None else "[]"
+                block.append(f"#conflict_check [Check End] Reservation Conflict List = {conflicts} MovableIdleBots = {movable}")
+                yield block
+
+                new_g = g + 1 + (0 if name == direction else TURN_COST) + extra_cost
+                if new_g >= g_cost.get(nxt, new_g + 1):
+                    continue
+                g_cost[nxt] = new_g
+                parent[nxt] = (cell, name)
+                new_h = self.heuristic(nxt)
+                if pause_time:
+                    yield [f"#pause_node = {{{{{nxt[0]},{nxt[1]}}}, {name}, {rack}}}, PauseTime = {pause_time}"]
+                if rng.random() < 0.9:
+                    yield [f"\"#added_node\", Coor = {{{nxt[0]},{nxt[1]}}}, FromCoor = {{{cell[0]},{cell[1]}}}, "
+                           f"TurnTag = {turn_tag}, MovingStatus = butler_moving, BDir = {name}, PhyBDir = {name}, "
+                           f"RDir = {rack}, GCost = {new_g}, HCost = {new_h}, FScore = {new_g + new_h}, "
+                           f"PauseTime = {pause_time}"]
+                else:
+                    yield [f"#added_node: {{{{{nxt[0]},{nxt[1]}}}, {{{cell[0]},{cell[1]}}}, {turn_tag}, butler_moving}}, "
+                           f"g_cost: {new_g}, h_cost: {new_h}, f_score: {new_g + new_h}, bot_direction: {name}, "
+                           f"physical_direction: {name}, rack_direction: {rack}, pause_time: {pause_time}"]
+                counter += 1
+                heapq.heappush(open_heap, (new_g + new_h, new_g, counter, nxt))
+
+        yield ["#path_calculation_ended failed, no path found"]
+
+    @staticmethod
+    def _trace(parent, cell):
+        path = [cell]
+        while parent[cell][0] != cell:
+            cell = parent[cell][0]
+            path.append(cell)
+        return path[::-1]
+
+
+class LogGenerator:
+    """
+    Drives concurrent PathPlanners for a fleet of bots and writes their
+    interleaved records, with timestamps and non-planner lines, to a file.
+    """
+
+    def __init__(self, seed=0, width=60, height=40, bots=8, concurrency=4, noise=0.3,
+                 start_time=datetime(2024, 5, 1, 10, 0, 0)):
+        self.rng = random.Random(seed)
+        self.grid = WarehouseGrid(width, height)
+        self.max_expansions = 4 * width * height
+        self.noise = noise
+        self.concurrency = max(1, min(concurrency, bots))
+        self.clock = start_time
+        self.bot_ids = [str(10 + i) for i in range(bots)]
+        cells = self.rng.sample(self.grid.aisle_cells, bots)
+        self.positions = dict(zip(self.bot_ids, cells))
+        self.planning = set()
+        self._reservations = {}  # cell -> (bot_id, step) of the latest planned paths
+
+    def reservation(self, cell, bot_id):
+        """Get the (bot_id, step) reserving cell on another bot's planned path, or None."""
+        reserved = self._reservations.get(cell)
+        return reserved if reserved is not None and reserved[0] != bot_id else None
+
+    def idle_bot_at(self, cell, bot_id):
+        """Get the id of another bot standing idle on cell, or None."""
+        for other, position in self.positions.items():
+            if position == cell and other != bot_id and other not in self.planning:
+                return other
+        return None
+
+    def _start_planner(self):
+        idle = [bot_id for bot_id in self.bot_ids if bot_id not in self.planning]
+        bot_id = self.rng.choice(idle)
+        dest = self.rng.choice(self.grid.aisle_cells)
+        while dest == self.positions[bot_id]:
+            dest = self.rng.choice(self.grid.aisle_cells)
+        self.planning.add(bot_id)
+        planner = PathPlanner(self, bot_id, self.positions[bot_id], dest)
+        return planner, planner.records()
+
+    def _finish_planner(self, planner):
+        self.planning.discard(planner.bot)
+        if planner.path:
+            self._reservations = {
+                cell: reserved for cell, reserved in self._reservations.items() if reserved[0] != planner.bot
+            }
+            for step, cell in enumerate(planner.path):
+                self._reservations[cell] = (planner.bot, step)
+            self.positions[planner.bot] = planner.dest
+
+    def _prefix(self, bot_id):
+        self.clock += timedelta(milliseconds=self.rng.randrange(0, 4))
+        stamp = self.clock.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        return f"{stamp} [info] <0.{bot_id}.0>@planner:run:1 butler_id={bot_id} "
+
+    def _noise_line(self, bot_id):
+        rng = self.rng
+        x, y = self.positions[bot_id]
+        return rng.choice(NOISE_LINES).format(
+            battery=rng.randrange(20, 100), x=x, y=y, task=rng.randrange(100000), rack=rng.randrange(5000),
+            station=rng.randrange(1, 12), pid=rng.randrange(1000, 9999),
+            other=rng.choice(self.bot_ids), wait=rng.randrange(0, 50)
+        )
+
+    def write(self, output_path, max_lines=None, max_bytes=None):
+        """Write records until max_lines lines or max_bytes bytes are reached; return (lines, bytes, paths)."""
+        lines = size = paths = 0
+        active = [self._start_planner() for _ in range(self.concurrency)]
+        buffer = []
+        with open(output_path, 'w') as file:
+            while (max_lines is None or lines < max_lines) and (max_bytes is None or size < max_bytes):
+                slot = self.rng.randrange(len(active))
+                planner, records = active[slot]
+                try:
+                    record = next(records)
+                except StopIteration:
+                    self._finish_planner(planner)
+                    paths += 1
+                    active[slot] = self._start_planner()
+                    continue
+                if self.rng.random() < self.noise:
+                    record = record + [self._noise_line(planner.bot)] if len(record) == 1 else record
+                for body in record:
+                    line = self._prefix(planner.bot) + body + "\n"
+                    buffer.append(line)
+                    lines += 1
+                    size += len(line)
+                if len(buffer) >= 10000:
+                    file.writelines(buffer)
+                    buffer = []
+            file.writelines(buffer)
+        return lines, size, paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic planner log.")
+    parser.add_argument('output', help="log file to write")
+    parser.add_argument('--lines', type=int, help="stop after about this many lines (default 10000)")
+    parser.add_argument('--size', type=parse_size, help="stop after about this many bytes, e.g. 500M or 2G")
+    parser.add_argument('--seed', type=int, default=0, help="random seed; the same seed writes the same log")
+    parser.add_argument('--width', type=int, default=60, help="grid width in cells")
+    parser.add_argument('--height', type=int, default=40, help="grid height in cells")
+    parser.add_argument('--bots', type=int, default=8, help="bots in the fleet")
+    parser.add_argument('--concurrency', type=int, default=4, help="bots planning at the same time")
+    parser.add_argument('--noise', type=float, default=0.3,
+                        help="share of planner lines followed by a non-planner line")
+    args = parser.parse_args()
+
+    max_lines = args.lines if args.lines or args.size else 10000
+    generator = LogGenerator(args.seed, args.width, args.height, args.bots, args.concurrency, args.noise)
+    lines, size, paths = generator.write(args.output, max_lines, args.size)
+    print(f"Wrote {lines:,} lines ({size / 1e6:,.1f} MB, {paths:,} paths) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,141 +1,548 @@
+import heapq
 import json
 import re
+import sys
+import time
 from datetime import datetime
 import os
 
+from event_records import (
+    AddedNode,
+    ChosenNode,
+    ConflictCheck,
+    ExploringNode,
+    NeighbourNodes,
+    ProcessingNode,
+    event_record,
+    events_to_dicts
+)
+from term_parser import (
+    as_coordinate,
+    as_text,
+    as_xy,
+    first_node,
+    parse_payload,
+    term_item
+)
+
+# Conflict categories stored in the "conflict_type" field. The free-text
+# "conflict_reason" is kept for display; these constants are shared so that
+# every event holds the same string instance.
+CONFLICT_TIME = "time"
+CONFLICT_IDLE_RESERVATION = "idle_reservation"
+CONFLICT_IDLE = "idle"
+CONFLICT_RESERVATION = "reservation"
+CONFLICT_TYPES = [CONFLICT_TIME, CONFLICT_IDLE_RESERVATION, CONFLICT_IDLE, CONFLICT_RESERVATION]
+
+# Categorical values (directions, turn tags, moving statuses, bot ids, span
+# coordinates, rejection reasons) are interned as they are parsed (see term_parser.as_text), so
+# events share one string instance per value and comparisons against these
+# constants succeed on identity. DIRECTIONS also fixes the order of the
+# direction codes in the event columns.
+DIRECTIONS = ["north", "east", "south", "west"]
+
+TIMESTAMP_RE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})')
+DIGITS_RE = re.compile(r'\d+')
+
+# Binary ingestion: chunk size, and the tags / untagged markers that make a
+# line worth decoding. Other lines are skipped as raw bytes.
+CHUNK_SIZE = 1 << 20
+PLANNER_TAGS = (
+    b'path_calculation_started',
+    b'path_calculation_ended',
+    b'chosen_node',
+    b'neighbour_nodes',
+    b'exploring_node',
+    b'processing_node',
+    b'pause_node',
+    b'cannot_revisit_node',
+    b'conflict_check',
+    b'added_node',
+)
+# Case variants of the untagged "path calculation ended" marker found in raw bytes
+ENDED_MARKERS = (
+    b'path calculation ended',
+    b'Path calculation ended',
+    b'Path Calculation Ended',
+    b'PATH CALCULATION ENDED',
+)
+# Blocks where more than DENSE_TAG_SHARE of the lines in the first DENSITY_SAMPLE
+# bytes are candidates are decoded whole, which is faster than finding candidates
+DENSITY_SAMPLE = 1 << 16
+DENSE_TAG_SHARE = 0.35
+# Lines after an exploring node / conflict check that their handlers look at
+CONTEXT_LINES = 9
+
+# Handlers timed by ParserProfile, with the label they are reported under
+PROFILED_HANDLERS = {
+    '_parse_path_calculation_started': 'path_calculation_started',
+    '_parse_chosen_node': 'chosen_node',
+    '_parse_neighbour_nodes': 'neighbour_nodes',
+    '_parse_exploring_node': 'exploring_node',
+    '_parse_rejected_exploring_node': 'exploring_node (rejected)',
+    '_parse_processing_node': 'processing_node',
+    '_parse_pause_node': 'pause_node',
+    '_parse_cannot_revisit_node': 'cannot_revisit_node',
+    '_parse_conflict_check': 'conflict_check',
+    '_parse_time_conflict': 'time conflict (not included)',
+    '_parse_added_node': 'added_node',
+    '_parse_path_calculation_ended': 'path_calculation_ended',
+}
+# Slow paths taken when the fast one fails: name -> handler whose lines it is a
+# share of (None: every handled line)
+PROFILED_FALLBACKS = {
+    'added_node positional node': '_parse_added_node',
+    'timestamp regex search': None,
+}
+
+
+class ParserProfile:
+    """
+    Opt-in instrumentation of a PathLogParser run (PathLogParser(profile=True)).
+    Counts the lines read, the candidate lines that were decoded and those no
+    handler matched, and per handler the lines, events, dropped lines (lines
+    that produced no event) and cumulative time, plus fallback hit counts.
+    """
+
+    def __init__(self):
+        self.lines_read = 0
+        self.bytes_read = 0
+        self.seconds = 0.0
+        self.candidate_lines = 0
+        self.unmatched_lines = 0
+        self.handled = 0
+        self.handler_lines = {}
+        self.handler_events = {}
+        self.handler_seconds = {}
+        self.fallbacks = {}
+
+    def record(self, handler, seconds, events):
+        self.handled += 1
+        self.handler_lines[handler] = self.handler_lines.get(handler, 0) + 1
+        self.handler_events[handler] = self.handler_events.get(handler, 0) + events
+        self.handler_seconds[handler] = self.handler_seconds.get(handler, 0.0) + seconds
+
+    def lines_per_second(self):
+        return self.lines_read / self.seconds if self.seconds > 0 else 0.0
+
+    def dropped_lines(self):
+        """Get the number of handled lines that produced no event."""
+        return sum(self.handler_lines[name] - min(self.handler_events[name], self.handler_lines[name])
+                   for name in self.handler_lines)
+
+    def handler_rows(self):
+        """Get one row per handler that ran, slowest first."""
+        rows = []
+        for name, lines in self.handler_lines.items():
+            seconds = self.handler_seconds[name]
+            events = self.handler_events[name]
+            rows.append({
+                'handler': PROFILED_HANDLERS[name],
+                'lines': lines,
+                'events': events,
+                'dropped': lines - min(events, lines),
+                'total_ms': seconds * 1000,
+                'us_per_line': seconds * 1e6 / lines,
+                'time_share': seconds / self.seconds if self.seconds > 0 else 0.0
+            })
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def fallback_rows(self):
+        """Get the hits and hit rate of every fallback path."""
+        rows = []
+        for name, handler in PROFILED_FALLBACKS.items():
+            hits = self.fallbacks.get(name, 0)
+            base = self.handled if handler is None else self.handler_lines.get(handler, 0)
+            rows.append({'fallback': name, 'hits': hits, 'rate': hits / base if base else 0.0})
+        return rows
+
+    def format_report(self):
+        """Format the profile as a plain-text report."""
+        lines = [
+            f"Parsed {self.lines_read:,} lines ({self.bytes_read / 1e6:,.1f} MB) in {self.seconds:.2f} s: "
+            f"{self.lines_per_second():,.0f} lines/s",
+            f"Candidate lines decoded: {self.candidate_lines:,}, matched no handler: {self.unmatched_lines:,}, "
+            f"dropped by handlers: {self.dropped_lines():,}",
+            "",
+            f"{'handler':<30} {'lines':>10} {'events':>10} {'dropped':>8} {'total ms':>10} {'us/line':>8} {'time':>6}"
+        ]
+        for row in self.handler_rows():
+            lines.append(f"{row['handler']:<30} {row['lines']:>10,} {row['events']:>10,} {row['dropped']:>8,} "
+                         f"{row['total_ms']:>10.1f} {row['us_per_line']:>8.1f} {row['time_share']:>6.1%}")
+        lines.append("")
+        lines.append(f"{'fallback':<30} {'hits':>10} {'rate':>10}")
+        for row in self.fallback_rows():
+            lines.append(f"{row['fallback']:<30} {row['hits']:>10,} {row['rate']:>10.1%}")
+        return "\n".join(lines)
+
 class PathLogParser:
     """
     Parser for warehouse robot path calculation logs.
     Extracts structured data for visualization.
     """
     
-    def __init__(self):
+    def __init__(self, profile=False, records=False):
         self.events = []
         self.event_id = 1
+        # Handlers build typed EventRecords (see event_records.py); unless records=True they are
+        # converted to the parser's dicts as each chunk (or parse_lines call) finishes
+        self.records = records
+        # With profile=True, each parse fills a new ParserProfile (see _instrument)
+        self.profile = None
+        if profile:
+            self.profile = ParserProfile()
+            self._instrument()
+        
+    def parse_log_file(self, log_file_path, start_offset=0, end_offset=None, progress=None, first_event_id=1):
+        """Parse the log file and extract relevant information for visualization.
+
+        The file is read in binary chunks and only lines that can hold a
+        planner event are decoded: a line is a candidate if a known planner
+        tag follows one of its '#' characters, or if it carries one of the
+        untagged markers (time conflicts, "path calculation ended"). All
+        other lines are skipped without being decoded.
+        
+        start_offset / end_offset limit parsing to a byte range of the file
+        (both on line boundaries), e.g. a single path segment; first_event_id
+        is then the event_id its first event has in a full parse.
         
-    def parse_log_file(self, log_file_path):
-        """Parse the log file and extract relevant information for visualization."""
+        progress, if given, is called as progress(bytes_read, lines_read)
+        after every chunk, once self.events holds all the events of the
+        chunk. Returning False from it stops parsing early.
+        """
         self.events = []
-        self.event_id = 1
+        self.event_id = first_event_id
+        if self.profile is not None:
+            self.profile = ParserProfile()
+            started = time.perf_counter()
         
         try:
-            with open(log_file_path, 'r') as file:
-                lines = file.readlines()
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                # Looking for the start of path calculation using 
-                # path_calculation_started
-                if "#path_calculation_started" in line:
-                    self._parse_path_calculation_started(line)
-                
-                # Parse chosen node events
-                elif "#chosen_node" in line:
-                    self._parse_chosen_node(line)
-                
-                # Parse neighbour nodes
-                elif "#neighbour_nodes" in line:
-                    self._parse_neighbour_nodes(line)
-                
-                # Parse exploring node
-                elif "#exploring_node" in line:
-                    # Checking if it is tagged as "not included" in later lines in log file
-                    if i + 1 < len(lines) and "not included" in lines[i+1]:
-                        # rejected node
-                        self._parse_rejected_exploring_node(line, lines[i+1:i+3])
-                    else:
-                        # accepted node
-                        self._parse_exploring_node(line, "accepted")
-                
-                # Parse processing node
-                elif "#processing_node" in line:
-                    self._parse_processing_node(line)
-                
-                # Parse pause node
-                elif "#pause_node" in line:
-                    self._parse_pause_node(line)
-                
-                # Parse cannot revisit node
-                elif "#cannot_revisit_node" in line:
-                    self._parse_cannot_revisit_node(line)
-                
-                # Parse conflict check
-                elif "#conflict_check" in line:
-                    # Here multiple line data is collected for conflict_check to get more context
-                    conflict_lines = [line]
-                    j = i + 1
-                    while j < len(lines) and j < i + 10: #Till next 10 lines
-                        next_line = lines[j].strip()
-                        if "#conflict_check" in next_line or "[Check End]" in next_line:
-                            conflict_lines.append(next_line)
-                        if "[Check End]" in next_line:
-                            break
-                        j += 1
-                    
-                    self._parse_conflict_check(conflict_lines)
-                    
-                # to handle time conflict lines that don't follow the standard pattern
-                elif "not included" in line and "TIME CONFLICT" in line.upper():
-                    self._parse_time_conflict(line)
-                
-                # handling parsing of added node using different formats
-                elif "\"#added_node\"" in line or "#added_node" in line:
-                    self._parse_added_node(line)
-
-                # Parse path calculation ended
-                elif "#path_calculation_ended" in line or "path calculation ended" in line.lower():
-
-                    self._parse_path_calculation_ended(line)
-                
-                i += 1
+            carry = b''
+            bytes_read = lines_read = 0
+            with open(log_file_path, 'rb') as file:
+                file.seek(start_offset)
+                remaining = end_offset - start_offset if end_offset is not None else None
+                while True:
+                    size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                    data = file.read(size) if size > 0 else b''
+                    if remaining is not None:
+                        remaining -= len(data)
+                    at_eof = not data
+                    region = carry + data
+                    carry = b''
+                    if not at_eof:
+                        # Keep the trailing partial line for the next chunk
+                        cut = region.rfind(b'\n') + 1
+                        region, carry = region[:cut], region[cut:]
+                    events_before = len(self.events)
+                    carry = self._parse_region(region, at_eof) + carry
+                    self._publish(events_before)
+                    if progress is not None or self.profile is not None:
+                        bytes_read += len(data)
+                        lines_read += data.count(b'\n')
+                    if progress is not None and progress(bytes_read, lines_read) is False:
+                        break
+                    if at_eof:
+                        break
             
+            if self.profile is not None:
+                self.profile.seconds = time.perf_counter() - started
+                self.profile.lines_read = lines_read
+                self.profile.bytes_read = bytes_read
             return self.events
         
         except Exception as e:
             print(f"Error parsing log file: {str(e)}")
             return []
     
+    def parse_lines(self, lines):
+        """Parse already decoded log lines (e.g. from file.readlines())."""
+        self.events = []
+        self.event_id = 1
+        if self.profile is not None:
+            self.profile = ParserProfile()
+            started = time.perf_counter()
+        
+        self._parse_decoded(lines, True)
+        self._publish(0)
+        
+        if self.profile is not None:
+            self.profile.seconds = time.perf_counter() - started
+            self.profile.lines_read = len(lines)
+            self.profile.bytes_read = sum(len(line) for line in lines)
+        return self.events
+    
+    def _parse_decoded(self, lines, at_eof):
+        """Parse decoded lines; return the index of the first line left unparsed.
+
+        Unless at_eof, an exploring node / conflict check whose following
+        context lines are not all in lines yet is left for the next block.
+        """
+        for i in range(len(lines)):
+            line = lines[i].strip()
+            if "#exploring_node" in line or "#conflict_check" in line:
+                next_lines = lines[i + 1:i + 1 + CONTEXT_LINES]
+                if len(next_lines) < CONTEXT_LINES and not at_eof:
+                    return i
+            else:
+                next_lines = []
+            self._parse_line(line, next_lines)
+        return len(lines)
+    
+    def _instrument(self):
+        """Shadow _parse_line and the handlers with counting / timing wrappers on this instance."""
+        for name in PROFILED_HANDLERS:
+            setattr(self, name, self._timed_handler(name, getattr(self, name)))
+        
+        parse_line = self._parse_line
+        def counted_parse_line(line, next_lines):
+            profile = self.profile
+            handled = profile.handled
+            parse_line(line, next_lines)
+            profile.candidate_lines += 1
+            if profile.handled == handled:
+                profile.unmatched_lines += 1
+        self._parse_line = counted_parse_line
+    
+    def _timed_handler(self, name, handler):
+        def timed_handler(*args):
+            events_before = len(self.events)
+            started = time.perf_counter()
+            handler(*args)
+            self.profile.record(name, time.perf_counter() - started, len(self.events) - events_before)
+        return timed_handler
+    
+    def _count_fallback(self, name):
+        """Count a hit of a PROFILED_FALLBACKS path when profiling."""
+        if self.profile is not None:
+            self.profile.fallbacks[name] = self.profile.fallbacks.get(name, 0) + 1
+    
+    def _parse_region(self, region, at_eof):
+        """Parse the candidate lines of a block of complete lines.
+
+        Returns the unparsed tail of the block: a candidate whose following
+        context lines are not all in the block yet is left for the next chunk.
+        Blocks dense in planner lines (sampled candidate share) are decoded
+        whole and parsed like parse_lines instead.
+        """
+        sample = region[:DENSITY_SAMPLE]
+        if len(self._candidate_starts(sample)) > DENSE_TAG_SHARE * sample.count(b'\n'):
+            # Blocks end on a line boundary; b'\n' never occurs inside a UTF-8 sequence,
+            # so the decoded lines match the raw ones one for one
+            body = region[:-1] if region.endswith(b'\n') else region
+            lines = body.decode('utf-8', 'replace').split('\n')
+            unparsed = self._parse_decoded(lines, at_eof)
+            pos = len(body)
+            for _ in range(len(lines) - unparsed):
+                pos = region.rfind(b'\n', 0, pos)
+            return region[pos + 1:] if unparsed < len(lines) else b''
+        
+        for line_start in self._candidate_starts(region):
+            line_end = region.find(b'\n', line_start)
+            if line_end < 0:
+                line_end = len(region)
+            
+            line = region[line_start:line_end].decode('utf-8', 'replace').strip()
+            next_lines = []
+            if "#exploring_node" in line or "#conflict_check" in line:
+                next_lines = self._following_lines(region, line_end + 1, CONTEXT_LINES)
+                if len(next_lines) < CONTEXT_LINES and not at_eof:
+                    return region[line_start:]
+            self._parse_line(line, next_lines)
+        return b''
+    
+    def _candidate_starts(self, region):
+        """Get the start offsets of the lines worth decoding in a block, in order.
+
+        Scans the raw bytes with bytes.find: a '#' followed by a planner tag,
+        or one of the untagged markers that _parse_line also handles (the
+        "path calculation ended" marker in the case variants of ENDED_MARKERS).
+        Every scan yields increasing offsets, so they are merged in order.
+        """
+        tag_starts = []
+        hash_pos = region.find(b'#')
+        while hash_pos >= 0:
+            if region.startswith(PLANNER_TAGS, hash_pos + 1):
+                line_start = region.rfind(b'\n', 0, hash_pos) + 1
+                tag_starts.append(line_start)
+                # The rest of a candidate line needs no scanning
+                hash_pos = region.find(b'\n', hash_pos)
+                if hash_pos < 0:
+                    break
+            hash_pos = region.find(b'#', hash_pos + 1)
+        
+        marker_starts = []
+        for marker in (b'not included',) + ENDED_MARKERS:
+            starts = []
+            pos = region.find(marker)
+            while pos >= 0:
+                starts.append(region.rfind(b'\n', 0, pos) + 1)
+                pos = region.find(marker, pos + 1)
+            if starts:
+                marker_starts.append(starts)
+        if not marker_starts:
+            return tag_starts
+        
+        merged = []
+        for line_start in heapq.merge(tag_starts, *marker_starts):
+            if not merged or merged[-1] != line_start:
+                merged.append(line_start)
+        return merged
+    
+    def _following_lines(self, region, pos, count):
+        """Decode up to count lines of the block starting at byte offset pos."""
+        lines = []
+        while len(lines) < count and pos < len(region):
+            line_end = region.find(b'\n', pos)
+            if line_end < 0:
+                line_end = len(region)
+            lines.append(region[pos:line_end].decode('utf-8', 'replace'))
+            pos = line_end + 1
+        return lines
+    
+    def _parse_line(self, line, next_lines):
+        """Dispatch one stripped log line to its event handler.
+
+        next_lines holds the lines that follow it (up to CONTEXT_LINES), which
+        the rejected exploring node and conflict check handlers need.
+        """
+        # Looking for the start of path calculation using 
+        # path_calculation_started
+        if "#path_calculation_started" in line:
+            self._parse_path_calculation_started(line)
+        
+        # Parse chosen node events
+        elif "#chosen_node" in line:
+            self._parse_chosen_node(line)
+        
+        # Parse neighbour nodes
+        elif "#neighbour_nodes" in line:
+            self._parse_neighbour_nodes(line)
+        
+        # Parse exploring node
+        elif "#exploring_node" in line:
+            # Checking if it is tagged as "not included" in later lines in log file
+            if next_lines and "not included" in next_lines[0]:
+                # rejected node
+                self._parse_rejected_exploring_node(line, next_lines[:2])
+            else:
+                # accepted node
+                self._parse_exploring_node(line, "accepted")
+        
+        # Parse processing node
+        elif "#processing_node" in line:
+            self._parse_processing_node(line)
+        
+        # Parse pause node
+        elif "#pause_node" in line:
+            self._parse_pause_node(line)
+        
+        # Parse cannot revisit node
+        elif "#cannot_revisit_node" in line:
+            self._parse_cannot_revisit_node(line)
+        
+        # Parse conflict check
+        elif "#conflict_check" in line:
+            # Here multiple line data is collected for conflict_check to get more context
+            conflict_lines = [line]
+            for next_line in next_lines:
+                next_line = next_line.strip()
+                if "#conflict_check" in next_line or "[Check End]" in next_line:
+                    conflict_lines.append(next_line)
+                if "[Check End]" in next_line:
+                    break
+            
+            self._parse_conflict_check(conflict_lines)
+            
+        # to handle time conflict lines that don't follow the standard pattern
+        elif "not included" in line and "TIME CONFLICT" in line.upper():
+            self._parse_time_conflict(line)
+        
+        # handling parsing of added node using different formats
+        elif "\"#added_node\"" in line or "#added_node" in line:
+            self._parse_added_node(line)
+
+        # Parse path calculation ended
+        elif "#path_calculation_ended" in line or "path calculation ended" in line.lower():
+
+            self._parse_path_calculation_ended(line)
+    
     def save_to_json(self, output_file_path):
         """Save the parsed events to a JSON file."""
         try:
             with open(output_file_path, 'w') as file:
-                json.dump(self.events, file, indent=2)
+                json.dump(events_to_dicts(self.events), file, indent=2)
             return True
         except Exception as e:
             print(f"Error saving to JSON: {str(e)}")
             return False
     
+    def _emit(self, event):
+        """Append a parsed event dict as its EventRecord.
+
+        The hot handlers build their record directly with from_fields() instead.
+        """
+        self.events.append(event_record(event))
+    
+    def _publish(self, start):
+        """Convert the records appended since index start to dicts, unless emitting records."""
+        if not self.records:
+            self.events[start:] = [event.to_dict() for event in self.events[start:]]
+    
     def _extract_timestamp(self, line):
         """Extract timestamp from the log line"""
-        match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})', line)
+        # Lines normally start with the timestamp, which a slice check handles without a regex
+        if len(line) >= 23 and line[4] == '-' and line[10] == ' ' and line[19] == '.' and line[:4].isdigit():
+            return line[:23]
+        self._count_fallback('timestamp regex search')
+        match = TIMESTAMP_RE.search(line)
         if match:
             return match.group(1)
         return None
     
     def _extract_bot_id(self, line):
         """Extract bot ID from the log line."""
-        match = re.search(r'butler_id=(\d+)', line)
-        if match:
-            return match.group(1)
+        start = line.find('butler_id=')
+        if start >= 0:
+            match = DIGITS_RE.match(line, start + 10)
+            if match:
+                return sys.intern(match.group(0))
         return None
     
-    def _extract_coordinate(self, coord_str):
-        """Extract X,Y coordinates from a coordinate string."""
-        match = re.search(r'\{(\d+),(\d+)\}', coord_str)
-        if match:
-            return {
-                "x": int(match.group(1)),
-                "y": int(match.group(2))
-            }
+    def _tag_payload(self, line, tag):
+        """Parse the terms that follow a planner tag such as '#chosen_node'."""
+        start = line.find(tag)
+        payload = line[start + len(tag):] if start >= 0 else line
+        # Quoted tags ("#added_node") leave their closing quote behind
+        if payload.startswith('"'):
+            payload = payload[1:]
+        return parse_payload(payload)
+    
+    def _int_field(self, fields, *names):
+        """Get the first integer field among names (checked as given, then case-insensitively)."""
+        lowered = None
+        for name in names:
+            value = fields.get(name)
+            if value is None:
+                if lowered is None:
+                    lowered = {key.lower(): val for key, val in fields.items()}
+                value = lowered.get(name.lower())
+            if type(value) is int:
+                return value
         return None
     
-    def _extract_direction(self, dir_str):
-        """Extract direction from a direction string."""
-        dir_match = re.search(r'(north|south|east|west)', dir_str)
-        if dir_match:
-            return dir_match.group(1)
+    def _text_field(self, fields, *names):
+        """Get the first field among names as text (checked as given, then case-insensitively)."""
+        lowered = None
+        for name in names:
+            value = fields.get(name)
+            if value is None:
+                if lowered is None:
+                    lowered = {key.lower(): val for key, val in fields.items()}
+                value = lowered.get(name.lower())
+            if value is not None:
+                return as_text(value)
         return None
     
     def _parse_path_calculation_started(self, line):
@@ -143,26 +550,26 @@ class PathLogParser:
         timestamp = self._extract_timestamp(line)
         bot_id = self._extract_bot_id(line)
         
+        # Format: SRC = {{442,20},north,north} DEST = {{450,22},south}
+        _, fields = self._tag_payload(line, "#path_calculation_started")
+        
         # source information
-        src_match = re.search(r'SRC = \{\{(\d+),(\d+)\},(.*?)\}', line)
-        if src_match:
-            src_x, src_y = int(src_match.group(1)), int(src_match.group(2))
-            directions = src_match.group(3).split(',')
-            bot_direction = directions[0].strip() if len(directions) > 0 else None
-            
+        src = fields.get("SRC")
+        src_coord = as_coordinate(src[0]) if isinstance(src, tuple) and src else None
+        if src_coord:
             src_data = {
-                "coordinate": {"x": src_x, "y": src_y},
-                "bot_direction": bot_direction
+                "coordinate": src_coord,
+                "bot_direction": term_item(src, 1)
             }
         else:
             src_data = {}
         
         # destination information
-        dest_match = re.search(r'DEST = \{\{(\d+),(\d+)\}', line)
-        if dest_match:
-            dest_x, dest_y = int(dest_match.group(1)), int(dest_match.group(2))
+        dest = fields.get("DEST")
+        dest_coord = as_coordinate(dest[0]) if isinstance(dest, tuple) and dest else None
+        if dest_coord:
             dest_data = {
-                "coordinate": {"x": dest_x, "y": dest_y}
+                "coordinate": dest_coord
             }
         else:
             dest_data = {}
@@ -176,7 +583,7 @@ class PathLogParser:
             "dest": dest_data
         }
         
-        self.events.append(event)
+        self._emit(event)
         self.event_id += 1
     
     def _parse_chosen_node(self, line):
@@ -186,118 +593,50 @@ class PathLogParser:
         
         # Format: #chosen_node = {{442,20}, {444,20}, rest, butler_moving, east, east, south, no_turn_rotate}
         # Extracting coordinate information
-        coord_match = re.search(r'\{\{(\d+),(\d+)\}, \{(\d+),(\d+)\}', line)
-        if coord_match:
-            x, y = int(coord_match.group(1)), int(coord_match.group(2))
-            from_x, from_y = int(coord_match.group(3)), int(coord_match.group(4))
-            
-            # Extracting costs (gcost, hcost, fscore)
-            gcost_match = re.search(r'GCost = (\d+)', line)
-            hcost_match = re.search(r'HCost = (\d+)', line)
-            fscore_match = re.search(r'FScore = (\d+)', line)
-            
-            gcost = int(gcost_match.group(1)) if gcost_match else None
-            hcost = int(hcost_match.group(1)) if hcost_match else None
-            fscore = int(fscore_match.group(1)) if fscore_match else None
-
-            directions_match = re.search(r'\}, ([^,]+), ([^,]+), ([^,]+), ([^,]+), ([^,]+)', line)
-            
-            bot_direction = None
-            physical_direction = None
-            rack_direction = None
-            
-            if directions_match:
-                # In the format, the 3rd, 4th, and 5th groups are the directions
-                bot_direction = directions_match.group(3)
-                physical_direction = directions_match.group(4)
-                rack_direction = directions_match.group(5)
-            
-            event = {
-                "event_id": self.event_id,
-                "event": "chosen_node",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
-                "from_coordinate": {"x": from_x, "y": from_y},
-                "GCost": gcost,
-                "HCost": hcost,
-                "FScore": fscore,
-                "bot_direction": bot_direction,
-                "physical_direction": physical_direction,
-                "rack_direction": rack_direction
-            }
-            
-            self.events.append(event)
-            self.event_id += 1
+        terms, fields = self._tag_payload(line, "#chosen_node")
+        node = first_node(terms)
+        from_x, from_y = as_xy(node[1]) if node and len(node) > 1 else (None, None)
+        if from_x is None:
+            return
+        # After the two coordinates come turn tag, moving status and then the 3 directions
+        x, y = as_xy(node[0])
+        bot_dir, phys_dir, rack_dir = term_item(node, 4), term_item(node, 5), term_item(node, 6)
+        gcost = self._int_field(fields, "GCost")
+        hcost = self._int_field(fields, "HCost")
+        fscore = self._int_field(fields, "FScore")
+        
+        self.events.append(ChosenNode.from_fields(
+            self.event_id, timestamp, bot_id, x, y, from_x, from_y, gcost, hcost, fscore,
+            bot_dir, phys_dir, rack_dir
+        ))
+        self.event_id += 1
     
     def _parse_neighbour_nodes(self, line):
         """Parse the neighbor nodes event."""
         timestamp = self._extract_timestamp(line)
         bot_id = self._extract_bot_id(line)
         
-        # extracting raw neighbor nodes information
-        neighbors_match = re.search(r'#neighbour_nodes = \[(.*?)\]', line)
-        if neighbors_match:
-            neighbors_raw = neighbors_match.group(1)
-
-            
-            # Parsing individual neighbor nodes
-            parsed_neighbors = []
-            neighbor_entries = re.findall(r'\{\{(\d+),(\d+)\},(\w+),(\w+),(\w+),(\w+)?\}', neighbors_raw)
+        # Format: #neighbour_nodes = [{{x,y},bot_dir,rack_dir,turn_tag,moving_status}, ...]
+        tag_pos = line.find("#neighbour_nodes")
+        list_start = line.find("[", tag_pos)
+        if tag_pos >= 0 and list_start >= 0:
+            list_end = line.find("]", list_start)
+            neighbors_raw = line[list_start + 1:list_end] if list_end >= 0 else line[list_start + 1:]
             
-            for entry in neighbor_entries:
-                if len(entry) >= 5:
-                    x, y, bot_direction, rack_direction, turn_tag = entry[:5]
-                    moving_status = entry[5] if len(entry) > 5 else None
-                    
-                    neighbor = {
-                        "coordinate": {"x": int(x), "y": int(y)},
-                        "bot_direction": bot_direction,
-                        "rack_direction": rack_direction,
-                        "turn_tag": turn_tag,
-                        "moving_status": moving_status
-                    }
-                    parsed_neighbors.append(neighbor)
+            terms, _ = parse_payload(line[list_start:])
+            entries = terms[0] if terms and isinstance(terms[0], list) else []
             
-            if not parsed_neighbors:
-                # Split by '},{'  which separates neighbor entries
-                entries = neighbors_raw.split('},{')
-                for entry in entries:
-                    entry = entry.strip('{},')
-                    parts = entry.split(',')
-                    
-                    if len(parts) >= 4:
-                        # Extract coordinate
-                        coord_match = re.search(r'\{(\d+),(\d+)\}', parts[0] + ',' + parts[1])
-                        if coord_match:
-                            x, y = int(coord_match.group(1)), int(coord_match.group(2))
-                            # Determine indices for direction based on the match
-                            direction_start_idx = 2
-                            
-                            bot_direction = parts[direction_start_idx] if direction_start_idx < len(parts) else None
-                            rack_direction = parts[direction_start_idx + 1] if direction_start_idx + 1 < len(parts) else None
-                            turn_tag = parts[direction_start_idx + 2] if direction_start_idx + 2 < len(parts) else None
-                            moving_status = parts[direction_start_idx + 3] if direction_start_idx + 3 < len(parts) else None
-                            
-                            neighbor = {
-                                "coordinate": {"x": x, "y": y},
-                                "bot_direction": bot_direction,
-                                "rack_direction": rack_direction,
-                                "turn_tag": turn_tag,
-                                "moving_status": moving_status
-                            }
-                            parsed_neighbors.append(neighbor)
+            # One (x, y, bot_dir, rack_dir, turn_tag, moving_status) tuple per neighbour
+            neighbors = []
+            for entry in entries:
+                x, y = as_xy(entry[0]) if isinstance(entry, tuple) and len(entry) >= 3 else (None, None)
+                if x is not None:
+                    neighbors.append((x, y, term_item(entry, 1), term_item(entry, 2),
+                                      term_item(entry, 3), term_item(entry, 4)))
             
-            event = {
-                "event_id": self.event_id,
-                "event": "neighbour_nodes",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "neighbors_raw": neighbors_raw,
-                "parsed_neighbors": parsed_neighbors
-            }
-            
-            self.events.append(event)
+            self.events.append(NeighbourNodes.from_fields(
+                self.event_id, timestamp, bot_id, neighbors_raw, tuple(neighbors)
+            ))
             self.event_id += 1
     
     def _parse_exploring_node(self, line, status):
@@ -307,27 +646,14 @@ class PathLogParser:
         
         # Parse coordinates and directions
         # Format: #exploring_node = {{442,20}, east, east, south}
-        node_match = re.search(r'#exploring_node = \{\{(\d+),(\d+)\}, ([\w]+), ([\w]+), ([\w]+)\}', line)
+        node = self._exploring_node(line)
         
-        if node_match:
-            x, y = int(node_match.group(1)), int(node_match.group(2))
-            bot_direction = node_match.group(3)
-            physical_direction = node_match.group(4)
-            rack_direction = node_match.group(5)
-            
-            event = {
-                "event_id": self.event_id,
-                "event": "exploring_node",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
-                "bot_direction": bot_direction,
-                "physical_direction": physical_direction,
-                "rack_direction": rack_direction,
-                "status": status
-            }
+        if node:
+            x, y, bot_direction, physical_direction, rack_direction = node
             
-            self.events.append(event)
+            self.events.append(ExploringNode.from_fields(
+                self.event_id, timestamp, bot_id, x, y, bot_direction, physical_direction, rack_direction, status
+            ))
             self.event_id += 1
     
     def _parse_rejected_exploring_node(self, line, next_lines):
@@ -337,37 +663,32 @@ class PathLogParser:
         
         # Parsing coordinates and directions
         # Format: #exploring_node = {{442,20}, east, east, south}
-        node_match = re.search(r'#exploring_node = \{\{(\d+),(\d+)\}, ([\w]+), ([\w]+), ([\w]+)\}', line)
+        node = self._exploring_node(line)
         
-        if node_match:
-            x, y = int(node_match.group(1)), int(node_match.group(2))
-            bot_direction = node_match.group(3)
-            physical_direction = node_match.group(4)
-            rack_direction = node_match.group(5)
+        if node:
+            x, y, bot_direction, physical_direction, rack_direction = node
             
             # Get rejection reason from the next line of log file
             rejection_reason = "Unknown reason"
             if len(next_lines) > 0 and "reason =" in next_lines[0]:
                 reason_match = re.search(r'reason\s*=\s*(.+)$', next_lines[0])
                 if reason_match:
-                    rejection_reason = reason_match.group(1).strip()
-            
-            event = {
-                "event_id": self.event_id,
-                "event": "exploring_node",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
-                "bot_direction": bot_direction,
-                "physical_direction": physical_direction,
-                "rack_direction": rack_direction,
-                "status": "rejected",
-                "rejection_reason": rejection_reason
-            }
+                    rejection_reason = sys.intern(reason_match.group(1).strip())
             
-            self.events.append(event)
+            self.events.append(ExploringNode.from_fields(
+                self.event_id, timestamp, bot_id, x, y, bot_direction, physical_direction, rack_direction,
+                "rejected", rejection_reason
+            ))
             self.event_id += 1
     
+    def _exploring_node(self, line):
+        """Get (x, y, bot, physical and rack direction) of an exploring node line, or None."""
+        terms, _ = self._tag_payload(line, "#exploring_node")
+        node = first_node(terms)
+        if node and len(node) >= 4:
+            return as_xy(node[0]) + (term_item(node, 1), term_item(node, 2), term_item(node, 3))
+        return None
+    
     def _parse_processing_node(self, line):
         """Parse the processing node event."""
         timestamp = self._extract_timestamp(line)
@@ -375,23 +696,15 @@ class PathLogParser:
         
         # Parse coordinates
         # Format: #processing_node = {{442,20}, {444,20}, rest, butler_moving, south, south, south}
-        node_match = re.search(r'#processing_node = \{\{(\d+),(\d+)\}, \{(\d+),(\d+)\}', line)
+        terms, _ = self._tag_payload(line, "#processing_node")
+        node = first_node(terms)
+        from_x, from_y = as_xy(node[1]) if node and len(node) > 1 else (None, None)
+        if from_x is None:
+            return
+        x, y = as_xy(node[0])
         
-        if node_match:
-            x, y = int(node_match.group(1)), int(node_match.group(2))
-            from_x, from_y = int(node_match.group(3)), int(node_match.group(4))
-            
-            event = {
-                "event_id": self.event_id,
-                "event": "processing_node",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
-                "from_coordinate": {"x": from_x, "y": from_y}
-            }
-            
-            self.events.append(event)
-            self.event_id += 1
+        self.events.append(ProcessingNode.from_fields(self.event_id, timestamp, bot_id, x, y, from_x, from_y))
+        self.event_id += 1
     
     def _parse_conflict_check(self, conflict_lines):
         """Parse the conflict check event with multiple lines for context."""
@@ -399,76 +712,62 @@ class PathLogParser:
             return
             
         line = conflict_lines[0]  # First line with AnchorCoord
+        # Follow-up lines ([Check End] ...) carry no anchor and start no event
+        if "AnchorCoord" not in line:
+            return
         timestamp = self._extract_timestamp(line)
         bot_id = self._extract_bot_id(line)
         
         # Extracting anchor coordinate
-        anchor_match = re.search(r'AnchorCoord = \{(\d+),(\d+)\}', line)
-        if anchor_match:
-            anchor_x, anchor_y = int(anchor_match.group(1)), int(anchor_match.group(2))
+        _, fields = self._tag_payload(line, "#conflict_check")
+        anchor = as_coordinate(fields.get("AnchorCoord"))
+        if anchor:
+            anchor_x, anchor_y = anchor["x"], anchor["y"]
             
-            # Extracting span coordinates from all related lines to get complete information
-            span_coords = []
+            # Extracting span coordinates from all related lines to get complete information.
+            # Coordinates are kept as integer pairs, in order of first appearance
+            span_cells = []
             
-            # First check the initial line for span coordinates
-            initial_span_match = re.search(r'SpanCoords = \[(.*?)\]', line)
-            if initial_span_match:
-                spans_str = initial_span_match.group(1)
-                
-                for span in spans_str.split(','):
-                    span = span.strip()
-                    if span:
-                        span_coords.append(span)
-            
-            for cl in conflict_lines:
-                # Looking for span coordinates in multiple formats to prevent errors
-                span_match1 = re.search(r'span coordinate = \{(\d+),(\d+)\}', cl)
-                span_match2 = re.search(r'coordinate = \{(\d+),(\d+)\}', cl)
-                span_match3 = re.search(r'SpanCoord = \{(\d+),(\d+)\}', cl)
-                
-                if span_match1:
-                    x, y = span_match1.group(1), span_match1.group(2)
-                    span_entry = f"{{{x},{y}}}"
-                    if span_entry not in span_coords:
-                        span_coords.append(span_entry)
-                
-                elif span_match2:
-                    x, y = span_match2.group(1), span_match2.group(2)
-                    span_entry = f"{{{x},{y}}}"
-                    if span_entry not in span_coords:
-                        span_coords.append(span_entry)
+            for i, cl in enumerate(conflict_lines):
+                if i > 0:
+                    # Lines without a '{' carry no coordinate; skip tokenizing them
+                    if '{' not in cl:
+                        continue
+                    _, fields = self._tag_payload(cl, "#conflict_check")
                 
-                elif span_match3:
-                    x, y = span_match3.group(1), span_match3.group(2)
-                    span_entry = f"{{{x},{y}}}"
-                    if span_entry not in span_coords:
-                        span_coords.append(span_entry)
-                
-                # Also checking for span coordinates in SpanCoords format
-                additional_span_match = re.search(r'SpanCoords = \[(.*?)\]', cl)
-                if additional_span_match and cl != line:  # Avoid duplicate from the first line
-                    spans_str = additional_span_match.group(1)
-                    for span in spans_str.split(','):
-                        span = span.strip()
-                        if span and span not in span_coords:
-                            span_coords.append(span)
+                # SpanCoords = [{x,y},{x,y},...] lists, or a single
+                # "SpanCoord = {x,y}" / "span coordinate = {x,y}"
+                spans = fields.get("SpanCoords")
+                candidates = list(spans) if isinstance(spans, list) else []
+                candidates.append(fields.get("SpanCoord"))
+                candidates.append(fields.get("coordinate"))
+                for candidate in candidates:
+                    coord = as_coordinate(candidate)
+                    if coord:
+                        cell = (coord["x"], coord["y"])
+                        if cell not in span_cells:
+                            span_cells.append(cell)
             
             conflict_found = None
             conflict_reason = None
+            conflict_type = None
             
             for cl in conflict_lines:
                 # Checking for conflicts
                 if "TIME CONFLICT" in cl.upper():
                     conflict_found = True
                     conflict_reason = "TIME CONFLICT"
+                    conflict_type = CONFLICT_TIME
                     
                 elif "Idle reservation on span" in cl:
                     conflict_found = True
                     conflict_reason = "Idle reservation on span"
+                    conflict_type = CONFLICT_IDLE_RESERVATION
                     
                 elif "has idle conflict" in cl:
                     conflict_found = True
                     conflict_reason = "Idle conflict"
+                    conflict_type = CONFLICT_IDLE
                     
                 elif "Reservation Conflict List = []" in cl:
                     if conflict_found is None:  # Only set if not already determined
@@ -484,6 +783,7 @@ class PathLogParser:
                     if list_content and list_content.group(1).strip():
                         conflict_found = True
                         conflict_reason = f"Reservation conflict: {list_content.group(1).strip()}"
+                        conflict_type = CONFLICT_RESERVATION
                     elif conflict_found is None:
                         conflict_found = False
                 
@@ -495,22 +795,18 @@ class PathLogParser:
                         if conflict_list and conflict_list != "[]":
                             conflict_found = True
                             conflict_reason = f"Reservation conflict in check end: {conflict_list}"
+                            conflict_type = CONFLICT_RESERVATION
             
-            event = {
-                "event_id": self.event_id,
-                "event": "conflict_check",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "anchor_coordinate": {"x": anchor_x, "y": anchor_y},
-                "span_coords": span_coords,
-                "conflict_found": conflict_found
-            }
-            
+            # Flat (x0, y0, x1, y1, ...) tuple; see utils.span_cells / span_labels
+            span = tuple(value for cell in span_cells for value in cell)
             # reason for conflict
-            if conflict_found and conflict_reason:
-                event["conflict_reason"] = conflict_reason
+            if not (conflict_found and conflict_reason):
+                conflict_reason = conflict_type = None
             
-            self.events.append(event)
+            self.events.append(ConflictCheck.from_fields(
+                self.event_id, timestamp, bot_id, anchor_x, anchor_y, span, conflict_found,
+                conflict_reason, conflict_type
+            ))
             self.event_id += 1
     
     def _parse_time_conflict(self, line):
@@ -518,27 +814,31 @@ class PathLogParser:
         timestamp = self._extract_timestamp(line)
         bot_id = self._extract_bot_id(line)
         
-        coord_match = re.search(r'\{\{(\d+),(\d+)\}', line)
-        if coord_match:
-            x, y = int(coord_match.group(1)), int(coord_match.group(2))
+        # The node comes before or after "not included" depending on the planner
+        # version, so parse the whole payload after the bot id
+        bot_pos = line.find("butler_id=")
+        terms, _ = parse_payload(line[bot_pos:] if bot_pos >= 0 else line)
+        node = first_node(terms)
+        if node:
             
             # Extract reason
             reason = "TIME CONFLICT"
             reason_match = re.search(r'reason\s*=\s*(.+?)(?:,|$)', line)
             if reason_match:
-                reason = reason_match.group(1).strip()
+                reason = sys.intern(reason_match.group(1).strip())
             
             event = {
                 "event_id": self.event_id,
                 "event": "conflict_detected",
                 "timestamp": timestamp,
                 "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
+                "coordinate": as_coordinate(node[0]),
                 "conflict_found": True,
-                "conflict_reason": reason
+                "conflict_reason": reason,
+                "conflict_type": CONFLICT_TIME
             }
             
-            self.events.append(event)
+            self._emit(event)
             self.event_id += 1
             
     def _parse_path_calculation_ended(self, line):
@@ -571,7 +871,7 @@ class PathLogParser:
             "path_length": path_length
         }
         
-        self.events.append(event)
+        self._emit(event)
         self.event_id += 1
     
     def _parse_added_node(self, line):
@@ -579,70 +879,37 @@ class PathLogParser:
         timestamp = self._extract_timestamp(line)
         bot_id = self._extract_bot_id(line)
         
-        # Try different formats for coordinates for added_node
-        # Format 1: Coor = {441,20}, FromCoor = {442,20}
-        coord_match1 = re.search(r'Coor = \{(\d+),(\d+)\}, FromCoor = \{(\d+),(\d+)\}', line)
-        # Format 2: "#added_node", Coor = {444,20}, FromCoor = {444,20}
-        coord_match2 = re.search(r'"#added_node".*?Coor = \{(\d+),(\d+)\}, FromCoor = \{(\d+),(\d+)\}', line)
-        # Format 3: #added_node: {{442,20}, {444,20}, ...}
-        coord_match3 = re.search(r'#added_node.*?\{\{(\d+),(\d+)\},\s*\{(\d+),(\d+)\}', line)
+        # Supported formats:
+        #   "#added_node", Coor = {444,20}, FromCoor = {444,20}, TurnTag = ..., BDir = ..., GCost = ...
+        #   #added_node: {{442,20}, {444,20}, ...}, g_cost: 5, bot_direction: east, ...
+        terms, fields = self._tag_payload(line, "#added_node")
+        coordinate = as_coordinate(fields.get("Coor"))
+        from_coordinate = as_coordinate(fields.get("FromCoor"))
+        if not (coordinate and from_coordinate):
+            self._count_fallback('added_node positional node')
+            node = first_node(terms)
+            coordinate = as_coordinate(node[0]) if node else None
+            from_coordinate = as_coordinate(node[1]) if node and len(node) > 1 else None
+        if not (coordinate and from_coordinate):
+            return
         
-        coord_match = coord_match1 or coord_match2 or coord_match3
+        x, y, from_x, from_y = coordinate["x"], coordinate["y"], from_coordinate["x"], from_coordinate["y"]
+        turn_tag = self._text_field(fields, "TurnTag", "turn_tag")
+        moving_status = self._text_field(fields, "MovingStatus", "moving_status")
+        bot_dir = self._text_field(fields, "BDir", "bot_direction")
+        phys_dir = self._text_field(fields, "PhyBDir", "physical_direction")
+        rack_dir = self._text_field(fields, "RDir", "rack_direction")
         
-        if coord_match:
-            x, y = int(coord_match.group(1)), int(coord_match.group(2))
-            from_x, from_y = int(coord_match.group(3)), int(coord_match.group(4))
-            
-            # Extract turn tag
-
-            # turn_match = re.search(r'TurnTag = ([^,]+)', line) or re.search(r'turn_tag[=:]\s*([^,]+)', line, re.IGNORECASE)
-            turn_match = re.search(r'TurnTag = (\{[^}]+\}|[^,]+),', line)
-            turn_tag = turn_match.group(1) if turn_match else None
-            
-            # Extract moving status
-            status_match = re.search(r'MovingStatus = ([^,]+)', line) or re.search(r'moving_status[=:]\s*([^,]+)', line, re.IGNORECASE)
-            moving_status = status_match.group(1) if status_match else None
-            
-            # Extract directions (trying different formats)
-            dir_match = re.search(r'BDir = ([^,]+), PhyBDir = ([^,]+), RDir = ([^,]+)', line)
-            if not dir_match:
-                dir_match = re.search(r'bot_direction[=:]\s*([^,]+).*?physical_direction[=:]\s*([^,]+).*?rack_direction[=:]\s*([^,]+)', line, re.IGNORECASE)
-            
-            bot_dir = dir_match.group(1) if dir_match else None
-            phys_dir = dir_match.group(2) if dir_match else None
-            rack_dir = dir_match.group(3) if dir_match else None
-            
-            # Extract costs
-            gcost_match = re.search(r'GCost = (\d+)', line) or re.search(r'g_cost[=:]\s*(\d+)', line, re.IGNORECASE)
-            hcost_match = re.search(r'HCost = (\d+)', line) or re.search(r'h_cost[=:]\s*(\d+)', line, re.IGNORECASE)
-            fscore_match = re.search(r'FScore = (\d+)', line) or re.search(r'f_score[=:]\s*(\d+)', line, re.IGNORECASE)
-            pause_match = re.search(r'PauseTime = (\d+)', line) or re.search(r'pause_time[=:]\s*(\d+)', line, re.IGNORECASE)
-            
-            gcost = int(gcost_match.group(1)) if gcost_match else None
-            hcost = int(hcost_match.group(1)) if hcost_match else None
-            fscore = int(fscore_match.group(1)) if fscore_match else None
-            pause_time = int(pause_match.group(1)) if pause_match else 0
-            
-            event = {
-                "event_id": self.event_id,
-                "event": "added_node",
-                "timestamp": timestamp,
-                "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
-                "from_coordinate": {"x": from_x, "y": from_y},
-                "turn_tag": turn_tag,
-                "moving_status": moving_status,
-                "bot_direction": bot_dir,
-                "physical_direction": phys_dir,
-                "rack_direction": rack_dir,
-                "GCost": gcost,
-                "HCost": hcost,
-                "FScore": fscore,
-                "pause_time": pause_time
-            }
-            
-            self.events.append(event)
-            self.event_id += 1
+        gcost = self._int_field(fields, "GCost", "g_cost")
+        hcost = self._int_field(fields, "HCost", "h_cost")
+        fscore = self._int_field(fields, "FScore", "f_score")
+        pause_time = self._int_field(fields, "PauseTime", "pause_time") or 0
+        
+        self.events.append(AddedNode.from_fields(
+            self.event_id, timestamp, bot_id, x, y, from_x, from_y, turn_tag, moving_status,
+            bot_dir, phys_dir, rack_dir, gcost, hcost, fscore, pause_time
+        ))
+        self.event_id += 1
 
     def _parse_pause_node(self, line):
         """Parse pause node event."""
@@ -650,16 +917,15 @@ class PathLogParser:
         bot_id = self._extract_bot_id(line)
         
         # Format in log: #pause_node = {{442,20}, south, south}, PauseTime = 16449
-        coord_match = re.search(r'#pause_node\s*=\s*\{\{(\d+),(\d+)\},\s*([\w]+),\s*([\w]+)\}', line)
+        terms, fields = self._tag_payload(line, "#pause_node")
+        node = first_node(terms)
         
-        if coord_match:
-            x, y = int(coord_match.group(1)), int(coord_match.group(2))
-            bot_direction = coord_match.group(3)
-            rack_direction = coord_match.group(4)
+        if node and len(node) >= 3:
+            bot_direction = term_item(node, 1)
+            rack_direction = term_item(node, 2)
             
             # Extract pause time 
-            pause_time_match = re.search(r'PauseTime\s*=\s*(\d+)', line)
-            pause_time = int(pause_time_match.group(1)) if pause_time_match else 0
+            pause_time = self._int_field(fields, "PauseTime") or 0
             
             # Extract reason if available
             reason_match = re.search(r'reason\s*=\s*(.+?)(?:,|$)', line, re.IGNORECASE)
@@ -670,14 +936,14 @@ class PathLogParser:
                 "event": "pause_node",
                 "timestamp": timestamp,
                 "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
+                "coordinate": as_coordinate(node[0]),
                 "bot_direction": bot_direction,
                 "rack_direction": rack_direction,
                 "pause_time": pause_time,
                 "reason": reason
             }
             
-            self.events.append(event)
+            self._emit(event)
             self.event_id += 1
     
     def _parse_cannot_revisit_node(self, line):
@@ -686,15 +952,15 @@ class PathLogParser:
         bot_id = self._extract_bot_id(line)
         
         # Format in log: #cannot_revisit_node {{436,18}, {435,20}, rest, butler_moving, north, south}
-        coord_match = re.search(r'#cannot_revisit_node\s*\{\{(\d+),(\d+)\},\s*\{(\d+),(\d+)\},\s*(\w+),\s*(\w+),\s*(\w+),\s*(\w+)\}', line)
-        
-        if coord_match:
-            x, y = int(coord_match.group(1)), int(coord_match.group(2))
-            from_x, from_y = int(coord_match.group(3)), int(coord_match.group(4))
-            turn_tag = coord_match.group(5)
-            moving_status = coord_match.group(6)
-            bot_direction = coord_match.group(7)
-            rack_direction = coord_match.group(8)
+        terms, _ = self._tag_payload(line, "#cannot_revisit_node")
+        node = first_node(terms)
+        from_coord = as_coordinate(node[1]) if node and len(node) >= 6 else None
+        
+        if from_coord:
+            turn_tag = term_item(node, 2)
+            moving_status = term_item(node, 3)
+            bot_direction = term_item(node, 4)
+            rack_direction = term_item(node, 5)
             
             # Extract reason if available
             reason_match = re.search(r'reason\s*=\s*(.+?)(?:,|$)', line, re.IGNORECASE)
@@ -705,8 +971,8 @@ class PathLogParser:
                 "event": "cannot_revisit_node",
                 "timestamp": timestamp,
                 "bot_id": bot_id,
-                "coordinate": {"x": x, "y": y},
-                "from_coordinate": {"x": from_x, "y": from_y},
+                "coordinate": as_coordinate(node[0]),
+                "from_coordinate": from_coord,
                 "turn_tag": turn_tag,
                 "moving_status": moving_status,
                 "bot_direction": bot_direction,
@@ -714,9 +980,15 @@ class PathLogParser:
                 "reason": reason
             }
             
-            self.events.append(event)
+            self._emit(event)
             self.event_id += 1
 
+def profile_log_file(log_file_path):
+    """Parse a log file with profiling on and return its ParserProfile."""
+    parser = PathLogParser(profile=True)
+    parser.parse_log_file(log_file_path)
+    return parser.profile
+
 def parse_log_to_json(log_file_path, output_file_path=None):
     """
     Parse a path calculation log file and convert to JSON.
@@ -733,3 +1005,25 @@ def parse_log_to_json(log_file_path, output_file_path=None):
         parser.save_to_json(output_file_path)
     
     return events
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--profile"]
+    if not args:
+        print("Usage: python log_parser.py <log_file> [output_file] [--profile]")
+        sys.exit(1)
+    
+    log_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
+
+    if "--profile" in sys.argv:
+        # The report goes to stderr so the JSON on stdout can still be piped
+        parser = PathLogParser(profile=True)
+        events = parser.parse_log_file(log_file)
+        if output_file:
+            parser.save_to_json(output_file)
+        print(parser.profile.format_report(), file=sys.stderr)
+    else:
+        events = parse_log_to_json(log_file, output_file)
+    
+    if not output_file:
+        print(json.dumps(events, indent=2))
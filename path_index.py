@@ -0,0 +1,211 @@
+import os
+import threading
+from collections import deque
+
+from log_parser import CHUNK_SIZE, PathLogParser
+
+# Logs at least this large are indexed by byte offset and parsed one path segment at a time
+LAZY_PARSE_MIN_BYTES = 256 * 1024 * 1024
+# Parsed segments kept in memory per index
+MAX_CACHED_SEGMENTS = 32
+
+START_TAG = b'#path_calculation_started'
+END_TAG = b'#path_calculation_ended'
+END_MARKER = b'path calculation ended'
+# Event types that open and close a path segment
+BOUNDARY_EVENTS = ('path_calculation_started', 'path_calculation_ended')
+
+
+class PathOffsetIndex:
+    """
+    Byte-offset index of the path segments of a log file.
+    Each segment records where its path_calculation_started line begins and
+    where the bot's matching path_calculation_ended line ends, so selecting a
+    path parses only that byte range. Parsed segments are cached.
+    """
+
+    def __init__(self, log_file_path, segments, max_cached_segments=MAX_CACHED_SEGMENTS):
+        self.log_file_path = log_file_path
+        self.segments = segments
+        self.max_cached_segments = max_cached_segments
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.segments)
+
+    def bot_ids(self):
+        """Get the sorted bot ids that have at least one path segment."""
+        return sorted({segment['bot_id'] for segment in self.segments if segment['bot_id']})
+
+    def segments_for_bot(self, bot_id=None):
+        """Get the segments of one bot, or all segments if bot_id is None."""
+        if bot_id is None:
+            return list(self.segments)
+        return [segment for segment in self.segments if segment['bot_id'] == bot_id]
+
+    def load_segment(self, segment_id):
+        """Parse the events in a segment's byte range, cached after the first call.
+
+        Like slicing a full parse between the start and end events, the
+        result holds the events of every bot logged inside the range.
+        """
+        with self._cache_lock:
+            events = self._cache.pop(segment_id, None)
+        if events is None:
+            segment = self.segments[segment_id]
+            # Number the events as a full parse would, so ids do not collide across segments
+            events = PathLogParser().parse_log_file(
+                self.log_file_path, segment['start_offset'], segment['end_offset'],
+                first_event_id=segment['first_event_id']
+            )
+        with self._cache_lock:
+            self._cache.pop(segment_id, None)
+            if len(self._cache) >= self.max_cached_segments:
+                # Drop the least recently used segment (dicts keep insertion order)
+                del self._cache[next(iter(self._cache))]
+            self._cache[segment_id] = events
+        return events
+
+    def cached_segments(self):
+        """Get the event lists of the segments currently cached."""
+        with self._cache_lock:
+            return list(self._cache.values())
+
+
+def _find_line_starts(text, marker, starts):
+    """Add the start offset of every line of text that contains marker."""
+    pos = text.find(marker)
+    while pos >= 0:
+        starts.add(text.rfind(b'\n', 0, pos) + 1)
+        pos = text.find(marker, pos + 1)
+
+
+def _scan_boundaries(parser, region, region_offset):
+    """Find the path start / end lines in a block of complete lines.
+
+    Returns (line start offset, line end offset, event) tuples in file order,
+    the event parsed from that line alone (so its event_id is not the one of
+    a full parse).
+    """
+    starts = set()
+    _find_line_starts(region, START_TAG, starts)
+    _find_line_starts(region, END_TAG, starts)
+    # bytes.lower() keeps offsets, so the case-insensitive marker is found the same way
+    _find_line_starts(region.lower(), END_MARKER, starts)
+
+    boundaries = []
+    for line_start in sorted(starts):
+        line_end = region.find(b'\n', line_start)
+        line_end = len(region) if line_end < 0 else line_end + 1
+        line = region[line_start:line_end].decode('utf-8', 'replace')
+        # Parse the single line so it is read exactly as in a full parse
+        for event in parser.parse_lines([line]):
+            if event.event in BOUNDARY_EVENTS:
+                boundaries.append((region_offset + line_start, region_offset + line_end, event))
+    return boundaries
+
+
+def _boundary_events(log_file_path):
+    """Get the path start / end events of a full parse of a log file, in file order.
+
+    The file goes through the parser's own dispatch, so the event_ids account
+    for every line a handler drops or reads differently from its markers.
+    Other events are discarded chunk by chunk.
+    """
+    parser = PathLogParser(records=True)
+    events = []
+
+    def collect(bytes_read, lines_read):
+        events.extend(event for event in parser.events if event.event in BOUNDARY_EVENTS)
+        parser.events.clear()
+
+    parser.parse_log_file(log_file_path, progress=collect)
+    return events
+
+
+def _same_event(event, other):
+    """Whether two events differ at most in their event_id."""
+    return dict(event.to_dict(), event_id=None) == dict(other.to_dict(), event_id=None)
+
+
+def _coordinate_label(coord):
+    return f"({coord.get('x')},{coord.get('y')})" if coord else "(?,?)"
+
+
+def build_path_offset_index(log_file_path):
+    """Index the path segments of a log file in one pass over its bytes.
+
+    Only path_calculation_started / ended lines are decoded to find their
+    offsets; every other line is skipped as raw bytes. The event_ids of the
+    start / end events come from a full parse that keeps only those events
+    (see _boundary_events). A segment runs from a start line to the next end
+    line of the same bot (see utils.get_path_calculation_events), or to the
+    end of the file if the path never ended.
+
+    Each segment is a dictionary with:
+        segment:       position in the index
+        bot_id, timestamp, src, dest, label
+        start_offset:  byte offset of the start line
+        end_offset:    byte offset just past the end line (or the file size)
+        closed:        whether a matching end line was found
+        first_event_id: event_id of the start event in a full parse
+    """
+    parser = PathLogParser(records=True)
+    scanned = []
+    region_offset = 0
+    carry = b''
+    with open(log_file_path, 'rb') as file:
+        while True:
+            data = file.read(CHUNK_SIZE)
+            region = carry + data
+            carry = b''
+            if data:
+                # Keep the trailing partial line for the next chunk
+                cut = region.rfind(b'\n') + 1
+                region, carry = region[:cut], region[cut:]
+            scanned.extend(_scan_boundaries(parser, region, region_offset))
+            region_offset += len(region)
+            if not data:
+                break
+
+    # Pair each event of the full parse with its line; scanned lines the full
+    # parse does not dispatch to a start / end handler are not boundaries
+    events = deque(_boundary_events(log_file_path))
+    boundaries = []
+    for line_start, line_end, line_event in scanned:
+        if events and _same_event(events[0], line_event):
+            boundaries.append((line_start, line_end, events.popleft()))
+
+    segments = []
+    open_segments = {}  # bot_id -> segments still waiting for their end line
+    for line_start, line_end, event in boundaries:
+        bot_id = event.bot_id
+        if event.event == 'path_calculation_started':
+            src = _coordinate_label(event.get('src', {}).get('coordinate'))
+            dest = _coordinate_label(event.get('dest', {}).get('coordinate'))
+            segment = {
+                'segment': len(segments),
+                'bot_id': bot_id,
+                'timestamp': event.get('timestamp'),
+                'src': src,
+                'dest': dest,
+                'label': f"Path {len(segments) + 1}: {src} → {dest}",
+                'start_offset': line_start,
+                'end_offset': None,
+                'closed': False,
+                'first_event_id': event.event_id,
+            }
+            segments.append(segment)
+            open_segments.setdefault(bot_id, []).append(segment)
+        else:
+            for segment in open_segments.pop(bot_id, []):
+                segment['end_offset'] = line_end
+                segment['closed'] = True
+
+    file_size = os.path.getsize(log_file_path)
+    for segment in segments:
+        if segment['end_offset'] is None:
+            segment['end_offset'] = file_size
+
+    return PathOffsetIndex(log_file_path, segments)
@@ -0,0 +1,622 @@
+import fnmatch
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from dataset_registry import DATABASE_SUFFIXES, is_event_database
+from event_db import EventDatabase
+from event_filter import compile_filter
+from event_rows import EMPTY_ROWS, STREAM_CHUNK_ROWS, parse_timestamp_ms, project_record
+from event_store import EVENT_TYPE_CODES, MISSING, build_event_columns
+from log_parser import PathLogParser
+
+# Events converted to columns at a time while the index is built
+INDEX_BATCH_SIZE = 100000
+# Seconds between scans of a watched directory
+POLL_SECONDS = 2.0
+# Datasets not queried for this long are evicted from memory
+IDLE_SECONDS = 15 * 60
+# Responses up to this size are sent in one piece; larger ones are streamed in chunks of about this size
+STREAM_BUFFER_BYTES = 64 * 1024
+
+# Event columns kept for filter expressions (see event_filter.py), besides the bot codes
+FILTER_COLUMNS = ('event', 'timestamp_ms', 'has_timestamp', 'x', 'y', 'from_x', 'from_y', 'rejected',
+                  'conflict_found', 'conflict_type', 'neighbor_count', 'direction')
+
+
+def load_events(path):
+    """Load events from a parsed JSON file (as written by log_parser.py) or parse a log file."""
+    if path.endswith('.json'):
+        with open(path, 'r') as file:
+            return json.load(file)
+    return PathLogParser().parse_log_file(path)
+
+
+def open_dataset(path):
+    """Open a SQLite event database (see event_db.py) in place, or build a query index of a .json / .log file."""
+    if is_event_database(path):
+        return EventDatabase(path)
+    return EventQueryIndex(load_events(path))
+
+
+def _batches(events, size):
+    """Split an iterable of events into lists of at most size events."""
+    batch = []
+    for event in events:
+        batch.append(event)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _group_rows(keys):
+    """Map each distinct key to the ascending rows holding it."""
+    if len(keys) == 0:
+        return {}
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    # A stable sort keeps the rows of each key ascending
+    return {sorted_keys[start].item(): order[start:end] for start, end in zip(starts.tolist(), ends.tolist())}
+
+
+def parse_coordinate(text):
+    """Parse an "x,y" query value, or None if it is not two integers."""
+    try:
+        x, y = (int(value) for value in text.split(','))
+    except ValueError:
+        return None
+    return x, y
+
+
+def parse_count(text, minimum):
+    """Parse an integer query value of at least minimum; raise ValueError otherwise."""
+    value = int(text)
+    if value < minimum:
+        raise ValueError(f"must be at least {minimum}")
+    return value
+
+
+def page_rows(rows, cursor=None, limit=None):
+    """Get at most limit of the rows, starting at row cursor.
+
+    Cursors are row numbers, so a page stays valid however the other pages
+    were cut. Returns (page rows, cursor of the next page or None after the
+    last page).
+    """
+    if cursor is None:
+        start = 0
+    elif isinstance(rows, range):
+        start = min(cursor, len(rows))
+    else:
+        start = int(np.searchsorted(rows, cursor, side='left'))
+    end = len(rows) if limit is None else min(start + limit, len(rows))
+    next_cursor = int(rows[end]) if end < len(rows) else None
+    return rows[start:end], next_cursor
+
+
+def json_array(record_chunks):
+    """Join chunks of JSON records into the pieces of one JSON array."""
+    yield b'['
+    separator = b''
+    for records in record_chunks:
+        if records:
+            yield separator + b','.join(records)
+            separator = b','
+    yield b']'
+
+
+class EventQueryIndex:
+    """
+    Read-only query index over parsed events.
+    Bot and src / dest coordinate lookups go through hash indexes, timestamp
+    lookups through a sorted timestamp column. With several filters, only
+    the smallest candidate set is looked up and the other filters are checked
+    on its rows through the bot / timestamp columns. Filter expressions are
+    evaluated as NumPy masks over the event columns kept by the index. Every
+    event is serialized to JSON once when the index is built, so answering a
+    query only joins bytes.
+    """
+
+    def __init__(self, events, batch_size=INDEX_BATCH_SIZE):
+        self.records = []
+        bot_ids = {}
+        bot_chunks = []
+        timestamp_chunks = []
+        column_chunks = {name: [] for name in FILTER_COLUMNS}
+        src_keys = []
+        dest_keys = []
+        start_rows = []
+        start_code = EVENT_TYPE_CODES['path_calculation_started']
+
+        # Events are indexed in batches so an event generator never has to be held in memory
+        for batch in _batches(events, batch_size):
+            offset = len(self.records)
+            columns = build_event_columns(batch)
+            batch_bot_codes = np.array(
+                [bot_ids.setdefault(bot_id, len(bot_ids)) for bot_id in columns['bot_ids']] + [MISSING],
+                dtype=np.int32
+            )
+            # MISSING (-1) picks the trailing MISSING entry
+            bot_chunks.append(batch_bot_codes[columns['bot']])
+            timestamp_chunks.append(
+                np.where(columns['has_timestamp'], columns['timestamp_ms'], np.iinfo(np.int64).min)
+            )
+            for name, chunks in column_chunks.items():
+                chunks.append(columns[name])
+            for i in np.flatnonzero(columns['event'] == start_code).tolist():
+                event = batch[i]
+                src = (event.get('src') or {}).get('coordinate') or {}
+                dest = (event.get('dest') or {}).get('coordinate') or {}
+                start_rows.append(offset + i)
+                src_keys.append((src.get('x'), src.get('y')))
+                dest_keys.append((dest.get('x'), dest.get('y')))
+            self.records.extend(json.dumps(event, separators=(',', ':')).encode() for event in batch)
+
+        self.bot_ids = list(bot_ids)
+        self._bot_codes = bot_ids
+        self._bots = np.concatenate(bot_chunks) if bot_chunks else np.empty(0, dtype=np.int32)
+        self._bot_rows = {
+            self.bot_ids[code]: rows for code, rows in _group_rows(self._bots).items() if code != MISSING
+        }
+
+        self._timestamps = np.concatenate(timestamp_chunks) if timestamp_chunks else np.empty(0, dtype=np.int64)
+        # Column layout of event_store.build_event_columns, with bot codes shared by every batch
+        self.columns = build_event_columns([]) if not self.records else {
+            name: np.concatenate(chunks) for name, chunks in column_chunks.items()
+        }
+        self.columns['bot'] = self._bots
+        self.columns['bot_ids'] = self.bot_ids
+
+        self._timestamp_order = np.argsort(self._timestamps, kind='stable')
+        self._sorted_timestamps = self._timestamps[self._timestamp_order]
+
+        self._src_rows = {}
+        self._dest_rows = {}
+        for row, src, dest in zip(start_rows, src_keys, dest_keys):
+            self._src_rows.setdefault(src, []).append(row)
+            self._dest_rows.setdefault(dest, []).append(row)
+        self._src_rows = {key: np.array(rows, dtype=np.int64) for key, rows in self._src_rows.items()}
+        self._dest_rows = {key: np.array(rows, dtype=np.int64) for key, rows in self._dest_rows.items()}
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, row):
+        """Get the JSON record of a row, or None if there is no such row."""
+        return self.records[row] if 0 <= row < len(self.records) else None
+
+    def page(self, cursor=None, limit=None, **filters):
+        """Get (rows, next cursor) of the events matching the query filters; see page_rows."""
+        return page_rows(self.query(**filters), cursor, limit)
+
+    def timestamp_rows(self, start_ms, end_ms):
+        """Get the ascending rows with start_ms <= timestamp <= end_ms."""
+        lo = np.searchsorted(self._sorted_timestamps, start_ms, side='left')
+        hi = np.searchsorted(self._sorted_timestamps, end_ms, side='right')
+        return np.sort(self._timestamp_order[lo:hi])
+
+    def query(self, bot_id=None, timestamp=None, start=None, dest=None, time_from=None, time_to=None, where=None):
+        """Get the ascending rows of the events matching every given filter.
+
+        Returns a NumPy array, or a range over every row when no filter is
+        given (so an unfiltered page never materializes the whole log).
+
+        Filters follow the /api/steps endpoint of server.js:
+            bot_id:              exact bot id
+            timestamp:           exact timestamp text
+            start / dest:        (x, y) src / dest coordinate of path_calculation_started events
+            time_from / time_to: inclusive timestamp range (either end may be left open)
+        and where, a filter expression (see event_filter.py; ValueError if it is invalid).
+        """
+        # Compiled first, so an invalid expression is reported whatever the other filters match
+        expression = compile_filter(where) if where is not None else None
+        # One (candidate rows, row predicate) pair per filter
+        filters = []
+        if bot_id is not None:
+            code = self._bot_codes.get(bot_id, MISSING)
+            filters.append((self._bot_rows.get(bot_id, EMPTY_ROWS), lambda rows: self._bots[rows] == code))
+        ranges = []
+        if timestamp is not None:
+            ranges.append((parse_timestamp_ms(timestamp),) * 2)
+        if time_from is not None or time_to is not None:
+            ranges.append((
+                parse_timestamp_ms(time_from) if time_from is not None else np.iinfo(np.int64).min + 1,
+                parse_timestamp_ms(time_to) if time_to is not None else np.iinfo(np.int64).max
+            ))
+        for start_ms, end_ms in ranges:
+            if start_ms is None or end_ms is None:
+                return EMPTY_ROWS
+            filters.append((
+                self.timestamp_rows(start_ms, end_ms),
+                lambda rows, start_ms=start_ms, end_ms=end_ms:
+                    (self._timestamps[rows] >= start_ms) & (self._timestamps[rows] <= end_ms)
+            ))
+        for coordinate, coordinate_rows in ((start, self._src_rows), (dest, self._dest_rows)):
+            if coordinate is not None:
+                matching = coordinate_rows.get(coordinate, EMPTY_ROWS)
+                filters.append((matching, lambda rows, matching=matching: np.isin(rows, matching)))
+        if expression is not None:
+            mask = expression.mask(self.columns)
+            filters.append((np.flatnonzero(mask), lambda rows: mask[rows]))
+
+        if not filters:
+            return range(len(self.records))
+        # Look up the smallest candidate set and check the other filters on its rows only
+        filters.sort(key=lambda item: len(item[0]))
+        rows = filters[0][0]
+        for _, predicate in filters[1:]:
+            if len(rows) == 0:
+                break
+            rows = rows[predicate(rows)]
+        return rows
+
+    def record_chunks(self, rows, fields=None):
+        """Yield the JSON records of rows, STREAM_CHUNK_ROWS at a time, keeping only fields if given."""
+        records = self.records
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = rows[start:start + STREAM_CHUNK_ROWS]
+            chunk = [records[row] for row in (chunk.tolist() if isinstance(chunk, np.ndarray) else chunk)]
+            if fields:
+                chunk = [project_record(record, fields) for record in chunk]
+            yield chunk
+
+
+class CatalogEntry:
+    """A named dataset of a DatasetCatalog: its source file and, once built, its query index."""
+
+    def __init__(self, name, path=None, signature=None):
+        self.name = name
+        self.path = path
+        self.signature = signature      # (mtime_ns, size) of the file the index was built from
+        self.seen_signature = signature  # signature at the latest scan
+        self.index = None
+        self.state = 'loading'          # loading / ready / evicted / failed
+        self.error = None
+        self.loaded_at = None
+        self.last_used = time.monotonic()
+
+
+class DatasetCatalog:
+    """
+    Named query indexes over the parsed logs (.json), log files (.log) and
+    event databases (.db / .sqlite, see event_db.py) of a directory.
+    A watcher thread polls the directory; new or changed files are indexed by a
+    builder thread once they stop changing, and the new index replaces the old
+    one in a single reference swap, so requests never wait for a build and
+    requests already running finish on the index they started with.
+    Datasets not queried for idle_seconds are evicted and rebuilt on their next request.
+    """
+
+    def __init__(self, directory=None, pattern='*', poll_seconds=POLL_SECONDS, idle_seconds=IDLE_SECONDS):
+        self.directory = directory
+        self.pattern = pattern
+        self.poll_seconds = poll_seconds
+        self.idle_seconds = idle_seconds
+        self.default_name = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._builds = queue.Queue()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Scan the directory, then keep watching it and building indexes in the background; return self."""
+        self.scan()
+        # Files already there at startup are built right away
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.path is not None and entry.signature is None:
+                    entry.signature = entry.seen_signature
+                    self._builds.put(entry.name)
+        self._threads = [
+            threading.Thread(target=self._watch, daemon=True),
+            threading.Thread(target=self._build_queued, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._builds.put(None)
+
+    def put(self, name, index):
+        """Serve an index that was built in memory (it is not watched or evicted)."""
+        entry = CatalogEntry(name)
+        entry.index = index
+        entry.state = 'ready'
+        entry.loaded_at = time.time()
+        with self._lock:
+            self._entries[name] = entry
+
+    def get(self, name=None):
+        """Get (index, state) of a dataset, or of the default one if name is None.
+
+        The index is None while the dataset is loading or evicted (an evicted
+        dataset is queued for a rebuild) and state is None for unknown names.
+        """
+        with self._lock:
+            entry = self._entries.get(name if name is not None else self._default_name())
+            if entry is None:
+                return None, None
+            entry.last_used = time.monotonic()
+            if entry.index is None and entry.state == 'evicted':
+                entry.state = 'loading'
+                entry.signature = entry.seen_signature
+                self._builds.put(entry.name)
+            return entry.index, entry.state
+
+    def datasets(self):
+        """Get one dictionary per dataset: name, state, events, loaded_at, idle_seconds, error."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.values())
+        return [
+            {
+                'name': entry.name,
+                'state': entry.state,
+                'events': len(entry.index) if entry.index is not None else None,
+                'loaded_at': entry.loaded_at,
+                'idle_seconds': round(now - entry.last_used, 1),
+                'error': entry.error,
+            }
+            for entry in entries
+        ]
+
+    def scan(self):
+        """Pick up new, changed and removed files and evict idle datasets."""
+        files = {}
+        if self.directory is not None:
+            for file_name in os.listdir(self.directory):
+                path = os.path.join(self.directory, file_name)
+                if file_name.endswith(('.json', '.log') + DATABASE_SUFFIXES) and fnmatch.fnmatch(file_name, self.pattern) \
+                        and os.path.isfile(path):
+                    stat = os.stat(path)
+                    files[file_name] = (path, (stat.st_mtime_ns, stat.st_size))
+
+        now = time.monotonic()
+        with self._lock:
+            for name, entry in list(self._entries.items()):
+                if entry.path is not None and name not in files:
+                    del self._entries[name]
+            for name, (path, signature) in files.items():
+                entry = self._entries.get(name)
+                if entry is None:
+                    # Built once the file looks the same at the next scan (i.e. it is no longer being written)
+                    self._entries[name] = CatalogEntry(name, path, None)
+                    self._entries[name].seen_signature = signature
+                    continue
+                stable = signature == entry.seen_signature
+                entry.seen_signature = signature
+                if stable and signature != entry.signature and entry.state != 'evicted':
+                    entry.signature = signature
+                    self._builds.put(name)
+            for entry in self._entries.values():
+                if entry.path is not None and entry.index is not None and entry.state == 'ready' \
+                        and now - entry.last_used > self.idle_seconds:
+                    entry.index = None
+                    entry.state = 'evicted'
+
+    def _default_name(self):
+        """The configured default dataset, else the most recently loaded one (lock held)."""
+        if self.default_name is not None:
+            return self.default_name
+        loaded = [entry for entry in self._entries.values() if entry.loaded_at is not None]
+        return max(loaded, key=lambda entry: entry.loaded_at).name if loaded else None
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_seconds):
+            self.scan()
+
+    def _build_queued(self):
+        while True:
+            name = self._builds.get()
+            if name is None:
+                return
+            with self._lock:
+                entry = self._entries.get(name)
+            if entry is None:
+                continue
+            try:
+                index = open_dataset(entry.path)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                with self._lock:
+                    entry.state = 'failed' if entry.index is None else 'ready'
+                    entry.error = str(e)
+                continue
+            with self._lock:
+                entry.index = index
+                entry.state = 'ready'
+                entry.error = None
+                entry.loaded_at = time.time()
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET /api/steps and GET /api/step/<id> from the server's DatasetCatalog.
+    Both take dataset=<file name> to pick a dataset (the default one otherwise),
+    and GET /api/datasets lists the datasets with their state.
+    On top of the server.js filters, /api/steps takes:
+        where:           filter expression, e.g. event in (conflict_check, pause_node) and x > 100
+                         (see event_filter.py; 400 if it is invalid)
+        limit / cursor:  page size, and the X-Next-Cursor header of the previous page
+        fields:          comma-separated event fields to keep (also for /api/step/<id>)
+        format=ndjson:   one event per line instead of a JSON array
+                         (also selected by Accept: application/x-ndjson)
+    Large responses are streamed with chunked transfer encoding, so server
+    memory stays bounded by the chunk size rather than by the result size.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; don't hold the body back waiting for an ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        fields = frozenset(name for name in params.get('fields', '').split(',') if name) or None
+        if url.path == '/api/datasets':
+            self._send_json(200, json.dumps(self.server.catalog.datasets()).encode())
+            return
+        if not (url.path == '/api/steps' or url.path.startswith('/api/step/')):
+            self._send_json(404, b'{"error":"Not found"}')
+            return
+
+        # Take the dataset's current index once, so a reload swapping it in doesn't affect this request
+        index, state = self.server.catalog.get(params.get('dataset') or None)
+        if index is None:
+            if state is None:
+                self._send_json(404, b'{"error":"Dataset not found"}')
+            elif state == 'failed':
+                self._send_json(500, b'{"error":"Dataset failed to load"}')
+            else:
+                self._send_json(503, json.dumps({'error': f"Dataset is {state}"}).encode(),
+                                headers={'Retry-After': str(max(int(self.server.catalog.poll_seconds), 1))})
+            return
+
+        if url.path == '/api/steps':
+            self._get_steps(index, params, fields)
+        else:
+            try:
+                row = int(url.path[len('/api/step/'):])
+            except ValueError:
+                row = -1
+            record = index.record(row) if row >= 0 else None
+            if record is not None:
+                self._send_json(200, project_record(record, fields) if fields else record)
+            else:
+                self._send_json(404, b'{"error":"Step not found"}')
+
+    def _get_steps(self, index, params, fields):
+        try:
+            limit = parse_count(params['limit'], 1) if params.get('limit') else None
+            cursor = parse_count(params['cursor'], 0) if params.get('cursor') else None
+        except ValueError as e:
+            self._send_json(400, json.dumps({'error': f"Invalid limit or cursor: {e}"}).encode())
+            return
+        ndjson = params.get('format') == 'ndjson' or 'application/x-ndjson' in self.headers.get('Accept', '')
+
+        coordinates = {}
+        for name in ('start', 'dest'):
+            if params.get(name):
+                coordinates[name] = parse_coordinate(params[name])
+        if any(coordinate is None for coordinate in coordinates.values()):
+            # Unparseable coordinates match nothing, as in server.js
+            rows, next_cursor = EMPTY_ROWS, None
+        else:
+            try:
+                rows, next_cursor = index.page(
+                    cursor, limit,
+                    bot_id=params.get('bot_id') or None,
+                    timestamp=params.get('timestamp') or None,
+                    start=coordinates.get('start'),
+                    dest=coordinates.get('dest'),
+                    time_from=params.get('from') or None,
+                    time_to=params.get('to') or None,
+                    where=params.get('where') or None,
+                )
+            except ValueError as e:
+                self._send_json(400, json.dumps({'error': f"Invalid where: {e}"}).encode())
+                return
+        headers = {'X-Next-Cursor': str(next_cursor)} if next_cursor is not None else {}
+
+        chunks = index.record_chunks(rows, fields)
+        if ndjson:
+            self._send_stream('application/x-ndjson', (b''.join(record + b'\n' for record in records) for records in chunks), headers)
+        else:
+            self._send_stream('application/json', json_array(chunks), headers)
+
+    def _send_json(self, status, body, content_type='application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self._send_common_headers(headers)
+        self.wfile.write(body)
+
+    def _send_stream(self, content_type, pieces, headers):
+        """Send the body pieces in one response if they are small, else stream them in chunks."""
+        buffered = []
+        size = 0
+        for piece in pieces:
+            buffered.append(piece)
+            size += len(piece)
+            if size >= STREAM_BUFFER_BYTES:
+                break
+        else:
+            self._send_json(200, b''.join(buffered), content_type, headers)
+            return
+
+        # HTTP/1.0 clients don't understand chunks; they read until the connection closes
+        chunked = self.request_version != 'HTTP/1.0'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        self._send_common_headers(headers)
+        for piece in pieces:
+            buffered.append(piece)
+            size += len(piece)
+            if size >= STREAM_BUFFER_BYTES:
+                self._write_chunk(b''.join(buffered), chunked)
+                buffered = []
+                size = 0
+        self._write_chunk(b''.join(buffered), chunked)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, data, chunked):
+        if not data:
+            return
+        if chunked:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        else:
+            self.wfile.write(data)
+
+    def _send_common_headers(self, headers):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'X-Next-Cursor')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate the cost of a query
+
+
+def create_server(catalog, host='', port=3000):
+    """Create a threaded HTTP server answering queries from a DatasetCatalog (call serve_forever to run it)."""
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    server.catalog = catalog
+    return server
+
+
+if __name__ == "__main__":
+    # A directory serves every .json / .log / .db file in it; a file is served (and reloaded) on its own
+    path = sys.argv[1] if len(sys.argv) > 1 else '../parsed_log.json'
+    port = int(os.environ.get('PORT', 3000))
+
+    if os.path.isdir(path):
+        catalog = DatasetCatalog(path)
+    else:
+        catalog = DatasetCatalog(os.path.dirname(path) or '.', pattern=os.path.basename(path))
+        catalog.default_name = os.path.basename(path)
+    catalog.start()
+    print(f"Watching {path}; datasets load in the background.")
+    server = create_server(catalog, port=port)
+    print(f"Server is running on port {port}")
+    server.serve_forever()
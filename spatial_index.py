@@ -0,0 +1,156 @@
+import numpy as np
+
+from event_store import EVENT_TYPE_CODES, MISSING, build_event_columns
+
+DEFAULT_BUCKET_SIZE = 16
+
+
+class SpatialIndex:
+    """
+    Grid-bucketed index over event coordinates.
+    Answers "which events fall inside this viewport up to this step" without
+    scanning every event: entries are sorted by (bucket, row) so each bucket
+    column of the viewport is one contiguous slice.
+    """
+
+    def __init__(self, x, y, bucket_size=DEFAULT_BUCKET_SIZE, pinned_rows=None):
+        self.bucket_size = bucket_size
+        rows = np.flatnonzero((x != MISSING) & (y != MISSING))
+        xs = x[rows].astype(np.int64)
+        ys = y[rows].astype(np.int64)
+        keys = (xs // bucket_size) << 32 | (ys // bucket_size)
+
+        order = np.lexsort((rows, keys))
+        self._keys = keys[order]
+        self._rows = rows[order]
+        self._x = xs[order]
+        self._y = ys[order]
+
+        # Rows returned for every viewport (e.g. path starts, so src/dest markers stay visible)
+        if pinned_rows is None:
+            pinned_rows = np.empty(0, dtype=np.int64)
+        self._pinned_rows = np.sort(np.asarray(pinned_rows, dtype=np.int64))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def query(self, min_x, min_y, max_x, max_y, min_row=0, max_row=None):
+        """Return the sorted event rows inside the viewport and the [min_row, max_row] step range."""
+        # Coordinates are never negative, so clamp the bucket range at 0
+        size = self.bucket_size
+        min_bx, max_bx = max(int(min_x), 0) // size, int(max_x) // size
+        min_by, max_by = max(int(min_y), 0) // size, int(max_y) // size
+
+        slices = []
+        for bx in range(min_bx, max_bx + 1):
+            start = np.searchsorted(self._keys, bx << 32 | min_by, side='left')
+            end = np.searchsorted(self._keys, bx << 32 | max_by, side='right')
+            if end > start:
+                slices.append(np.arange(start, end))
+        positions = np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+        # Buckets on the viewport border can hold points just outside it
+        x = self._x[positions]
+        y = self._y[positions]
+        rows = self._rows[positions]
+        inside = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y) & (rows >= min_row)
+        if max_row is not None:
+            inside &= rows <= max_row
+        rows = rows[inside]
+
+        pinned = self._pinned_rows[self._pinned_rows >= min_row]
+        if max_row is not None:
+            pinned = pinned[pinned <= max_row]
+        return np.union1d(rows, pinned)
+
+
+def build_spatial_index(events, columns=None, bucket_size=DEFAULT_BUCKET_SIZE):
+    """Build a SpatialIndex over the primary coordinate of each event.
+
+    path_calculation_started rows are pinned so that the source and
+    destination of a path are drawn whatever the viewport.
+    """
+    if columns is None:
+        columns = build_event_columns(events)
+    path_starts = np.flatnonzero(columns['event'] == EVENT_TYPE_CODES['path_calculation_started'])
+    return SpatialIndex(columns['x'], columns['y'], bucket_size=bucket_size, pinned_rows=path_starts)
+
+
+# Smallest tile edge of the level-of-detail pyramid; each level doubles it
+MIN_TILE_SIZE = 4
+# Switch from per-node layers to tiles when the view is wider than this many cells
+LOD_THRESHOLD = 150
+# Aim for at most this many tiles across the view
+MAX_TILES_ACROSS = 100
+
+
+class TilePyramid:
+    """
+    Level-of-detail pyramid of N x N tiles over event coordinates.
+    Every level assigns each event row to a tile once at load time, so the
+    tile counts for any step are a single bincount over the rows up to it.
+    """
+
+    def __init__(self, columns, min_tile_size=MIN_TILE_SIZE):
+        self.columns = columns
+        x = columns['x'].astype(np.int64)
+        y = columns['y'].astype(np.int64)
+        self._valid = (x != MISSING) & (y != MISSING)
+        self.levels = []
+
+        if not self._valid.any():
+            return
+        span = max(x[self._valid].max(), y[self._valid].max()) + 1
+
+        size = min_tile_size
+        while True:
+            keys = np.where(self._valid, (x // size) << 32 | (y // size), -1)
+            tile_keys, tile_of_row = np.unique(keys, return_inverse=True)
+            # The -1 key of rows without coordinates sorts first; drop it from the tiles
+            if tile_keys[0] == -1:
+                tile_keys = tile_keys[1:]
+                tile_of_row = tile_of_row - 1
+            self.levels.append({
+                'size': size,
+                'tile_of_row': tile_of_row.astype(np.int32),
+                'tile_x': (tile_keys >> 32) * size,
+                'tile_y': (tile_keys & 0xFFFFFFFF) * size,
+            })
+            if size >= span:
+                break
+            size *= 2
+
+    def extent(self, max_row=None):
+        """Bounding box (min_x, min_y, max_x, max_y) of events up to max_row, or None."""
+        valid = self._valid if max_row is None else self._valid[:max_row + 1]
+        if not valid.any():
+            return None
+        x = self.columns['x'][:len(valid)][valid]
+        y = self.columns['y'][:len(valid)][valid]
+        return int(x.min()), int(y.min()), int(x.max()), int(y.max())
+
+    def level_for(self, width, height, max_tiles_across=MAX_TILES_ACROSS):
+        """Pick the finest level that keeps the view within max_tiles_across tiles."""
+        for level in self.levels:
+            if max(width, height) / level['size'] <= max_tiles_across:
+                return level
+        return self.levels[-1] if self.levels else None
+
+    def tiles(self, level, max_row=None, viewport=None):
+        """Return (tile_x, tile_y, counts) of non-empty tiles for events up to max_row."""
+        tile_of_row = level['tile_of_row'] if max_row is None else level['tile_of_row'][:max_row + 1]
+        counts = np.bincount(tile_of_row[tile_of_row >= 0], minlength=len(level['tile_x']))
+        keep = counts > 0
+        if viewport is not None:
+            min_x, min_y, max_x, max_y = viewport
+            size = level['size']
+            keep &= ((level['tile_x'] + size > min_x) & (level['tile_x'] <= max_x) &
+                     (level['tile_y'] + size > min_y) & (level['tile_y'] <= max_y))
+        return level['tile_x'][keep], level['tile_y'][keep], counts[keep]
+
+
+def build_tile_pyramid(events, columns=None, min_tile_size=MIN_TILE_SIZE):
+    """Precompute the level-of-detail tile pyramid for a dataset."""
+    if columns is None:
+        columns = build_event_columns(events)
+    return TilePyramid(columns, min_tile_size=min_tile_size)
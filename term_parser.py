@@ -0,0 +1,156 @@
+import sys
+
+
+def _number(token):
+    """Convert a numeric-looking token to int or float, keeping it as text if it is neither."""
+    try:
+        return int(token)
+    except ValueError:
+        try:
+            return float(token)
+        except ValueError:
+            return token
+
+
+def tokenize(text):
+    """Split a payload into tokens: brackets, '=', numbers and words.
+
+    Commas and whitespace only separate tokens, and ':' is treated like '='.
+    Padding the punctuation and calling str.split keeps the whole scan in C,
+    which is much cheaper than a tokenizing regex in CPython.
+    """
+    return (text.replace(',', ' ')
+                .replace('{', ' { ')
+                .replace('}', ' } ')
+                .replace('[', ' [ ')
+                .replace(']', ' ] ')
+                .replace('=', ' = ')
+                .replace(':', ' = ')
+                .split())
+
+
+def parse_payload(text):
+    """Parse the Erlang-style terms of a planner log line in a single scan.
+
+    Curly braces become tuples, square brackets lists, numbers ints (or
+    floats), quoted strings and bare words str. Top-level "Name = value"
+    (or "Name: value") pairs are collected into a dictionary; all other
+    top-level values are returned in order.
+
+    Example:
+        parse_payload("= {{442,20}, {444,20}, rest}, GCost = 10")
+        -> ([((442, 20), (444, 20), 'rest')], {'GCost': 10})
+
+    Returns:
+        (terms, fields) tuple
+    """
+    terms = []
+    fields = {}
+    stack = []          # (parent items, opening bracket) for every open container
+    current = terms     # items of the innermost open container
+    name = None         # pending field name waiting for its value
+
+    # Checks are ordered by how often each token kind shows up in planner lines
+    for token in tokenize(text):
+        if token == '{' or token == '[':
+            stack.append((current, token))
+            current = []
+            continue
+
+        elif token == '}' or token == ']':
+            if not stack:
+                continue  # stray closing bracket
+            items = current
+            current, opener = stack.pop()
+            value = tuple(items) if opener == '{' else items
+
+        elif token.isdigit():
+            value = int(token)
+
+        elif token == '=':
+            # Only a bare word right before it at the top level names a field
+            if not stack and terms and terms[-1].__class__ is str:
+                name = terms.pop()
+            continue
+
+        else:
+            first = token[0]
+            if first == '-' or first.isdigit():
+                value = _number(token)
+            elif first == '"' or first == "'":
+                value = token.strip('"\'')
+            else:
+                value = token
+
+        if name is not None and not stack:
+            fields[name] = value
+            name = None
+        else:
+            current.append(value)
+
+    # Close containers left open by a truncated line
+    while stack:
+        items = current
+        current, opener = stack.pop()
+        current.append(tuple(items) if opener == '{' else items)
+    if name is not None and terms:
+        fields[name] = terms.pop()
+
+    return terms, fields
+
+
+def format_term(term):
+    """Render a parsed term back to compact log syntax, e.g. ('rotate', 'east') -> '{rotate,east}'."""
+    if isinstance(term, tuple):
+        return '{' + ','.join(format_term(item) for item in term) + '}'
+    if isinstance(term, list):
+        return '[' + ','.join(format_term(item) for item in term) + ']'
+    return str(term)
+
+
+def as_coordinate(term):
+    """Return {"x": .., "y": ..} if the term is an {X,Y} non-negative integer pair, else None."""
+    if term.__class__ is tuple and len(term) == 2:
+        x, y = term
+        # Grid cells are never negative; the spatial and conflict indexes pack them unsigned
+        if x.__class__ is int and y.__class__ is int and x >= 0 and y >= 0:
+            return {"x": x, "y": y}
+    return None
+
+
+def as_xy(term):
+    """Return (x, y) if the term is an {X,Y} non-negative integer pair, else (None, None)."""
+    if term.__class__ is tuple and len(term) == 2:
+        x, y = term
+        if x.__class__ is int and y.__class__ is int and x >= 0 and y >= 0:
+            return x, y
+    return None, None
+
+
+def as_text(term):
+    """Return a term as the string the log shows for it, or None if missing.
+
+    The text is interned: terms read this way are categorical (directions,
+    turn tags, statuses...), so every event shares one instance per value.
+    """
+    if term is None:
+        return None
+    if isinstance(term, str):
+        return sys.intern(term)
+    return sys.intern(format_term(term))
+
+
+def term_item(term, index):
+    """Get term[index] as interned text (see as_text), or None if the term is too short."""
+    if isinstance(term, (tuple, list)) and index < len(term):
+        item = term[index]
+        return sys.intern(item) if item.__class__ is str else as_text(item)
+    return None
+
+
+def first_node(terms):
+    """Return the first top-level tuple whose first element is an {X,Y} coordinate."""
+    for term in terms:
+        if isinstance(term, tuple) and term and as_coordinate(term[0]):
+            return term
+    return None
@@ -0,0 +1,129 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import compute_path_analytics, compute_path_latencies, latency_by_window, latency_percentiles
+
+TIMESTAMP = "2024-05-01 10:00:00.000"
+
+
+def _event(event_id, event, bot_id='7', timestamp=TIMESTAMP, **fields):
+    return dict(event_id=event_id, event=event, timestamp=timestamp, bot_id=bot_id, **fields)
+
+
+def _chosen(event_id, coordinate):
+    return _event(event_id, 'chosen_node', coordinate=coordinate, from_coordinate={'x': 0, 'y': 0})
+
+
+def test_re_expansions_skip_chosen_nodes_without_coordinate():
+    events = [
+        _event(1, 'path_calculation_started', src={'coordinate': {'x': 0, 'y': 0}}, dest={}),
+        _chosen(2, {'x': 1, 'y': 0}),
+        _chosen(3, None),
+        _chosen(4, {'x': 1, 'y': 0}),
+        _chosen(5, None),
+        _event(6, 'path_calculation_ended', status='success', path_length=1.0),
+        _event(7, 'path_calculation_started', src={'coordinate': {'x': 5, 'y': 5}}, dest={}),
+        _chosen(8, None),
+        _chosen(9, {'x': 5, 'y': 6}),
+    ]
+    analytics = compute_path_analytics(events)
+    assert analytics['nodes_expanded'].tolist() == [4, 2]
+    assert analytics['re_expansions'].tolist() == [1, 0]
+    assert analytics['wasted_ratio'].tolist() == [0.25, 0.0]
+
+
+def test_path_metrics():
+    events = [
+        _event(1, 'path_calculation_started', src={'coordinate': {'x': 0, 'y': 0}},
+               dest={'coordinate': {'x': 2, 'y': 0}}),
+        _event(2, 'neighbour_nodes', parsed_neighbors=[(1, 0), (0, 1), (2, 2)]),
+        _event(3, 'exploring_node', coordinate={'x': 1, 'y': 0}, status='accepted'),
+        _event(4, 'exploring_node', coordinate={'x': 0, 'y': 1}, status='rejected'),
+        _chosen(5, {'x': 1, 'y': 0}),
+        _event(6, 'conflict_check', anchor_coordinate={'x': 2, 'y': 0}, span=(2, 0), conflict_found=True,
+               conflict_type='time'),
+        _event(7, 'conflict_check', anchor_coordinate={'x': 2, 'y': 1}, span=(), conflict_found=False),
+        _chosen(8, {'x': 1, 'y': 0}),
+        _event(9, 'cannot_revisit_node', coordinate={'x': 0, 'y': 0}, from_coordinate={'x': 1, 'y': 0}),
+        _event(10, 'path_calculation_ended', timestamp="2024-05-01 10:00:00.100", status='success',
+               path_length=2.0),
+        _event(11, 'path_calculation_started', bot_id='8', src={'coordinate': {'x': 5, 'y': 5}}, dest={}),
+        _event(12, 'chosen_node', bot_id='8', timestamp="2024-05-01 10:00:00.030",
+               coordinate={'x': 5, 'y': 6}, from_coordinate={'x': 5, 'y': 5}),
+    ]
+    first, second = compute_path_analytics(events).to_dict('records')
+    assert first['bot_id'] == '7' and second['bot_id'] == '8'
+    assert (first['start_idx'], first['end_idx'], first['completed']) == (0, 9, True)
+    assert (second['start_idx'], second['end_idx'], second['completed']) == (10, -1, False)
+    assert (first['src'], first['dest'], second['dest']) == ("(0,0)", "(2,0)", "(?,?)")
+    assert first['nodes_expanded'] == 2
+    assert (first['explored_accepted'], first['explored_rejected'], first['accept_ratio']) == (1, 1, 0.5)
+    assert first['branching_factor'] == 3.0
+    assert (first['re_expansions'], first['wasted_ratio'], first['cannot_revisit']) == (1, 0.5, 1)
+    assert (first['duration_ms'], first['ms_per_expansion']) == (100.0, 50.0)
+    assert (first['conflict_checks'], first['conflicts_found'], first['conflict_checks_per_expansion']) == (2, 1, 1.0)
+    # An unclosed path lasts until its last timestamp; ratios without a denominator are NaN
+    assert second['duration_ms'] == 30.0
+    assert math.isnan(second['accept_ratio']) and math.isnan(second['branching_factor'])
+
+
+def test_no_paths_give_empty_analytics():
+    assert compute_path_analytics([_chosen(1, {'x': 1, 'y': 1})]).empty
+
+
+def _planned(event_id, bot_id, started, ended):
+    """A started / ended event pair for one path."""
+    return [
+        _event(event_id, 'path_calculation_started', bot_id=bot_id, timestamp=started,
+               src={'coordinate': {'x': 0, 'y': 0}}, dest={}),
+        _event(event_id + 1, 'path_calculation_ended', bot_id=bot_id, timestamp=ended, status='success',
+               path_length=1.0),
+    ]
+
+
+def test_latencies_of_completed_paths():
+    events = (
+        _planned(1, '7', "2024-05-01 10:00:00.000", "2024-05-01 10:00:00.100")
+        + _planned(3, '8', "2024-05-01 10:00:00.500", "2024-05-01 10:00:00.750")
+        + _planned(5, '7', "2024-05-01 10:00:01.000", None)
+        + _planned(7, '7', "2024-05-01 10:00:01.200", "2024-05-01 10:00:01.500")
+        + _planned(9, '8', "2024-05-01 10:00:02.000", "2024-05-01 10:00:02.010")[:1]
+    )
+    latencies = compute_path_latencies(events)
+    # The path without an end timestamp and the unclosed path are left out
+    assert latencies['path'].tolist() == [0, 1, 3]
+    assert latencies['bot_id'].tolist() == ['7', '8', '7']
+    assert latencies['start_idx'].tolist() == [0, 2, 6]
+    assert latencies['end_idx'].tolist() == [1, 3, 7]
+    assert latencies['latency_ms'].tolist() == [100, 250, 300]
+    assert str(latencies['start_time'].iloc[2]) == "2024-05-01 10:00:01.200000"
+
+
+def test_latency_percentiles_per_bot_and_window():
+    events = []
+    for i, latency_ms in enumerate([100, 200, 300, 400, 500]):
+        events += _planned(2 * i + 1, '7', f"2024-05-01 10:00:0{i}.000", f"2024-05-01 10:00:0{i}.{latency_ms}")
+    events += _planned(11, '8', "2024-05-01 10:00:01.500", "2024-05-01 10:00:01.550")
+    latencies = compute_path_latencies(events)
+
+    by_bot = latency_percentiles(latencies, 'bot_id')
+    assert by_bot.index.tolist() == ['7', '8']
+    assert by_bot.loc['7'].tolist() == [5, 300.0, 460.0, 496.0, 500]
+    assert by_bot.loc['8'].tolist() == [1, 50.0, 50.0, 50.0, 50]
+
+    by_window = latency_by_window(latencies, 2)
+    assert by_window['paths'].tolist() == [3, 2, 1]
+    assert by_window['max'].tolist() == [200, 400, 500]
+    assert [str(window) for window in by_window.index] == [
+        "2024-05-01 10:00:00", "2024-05-01 10:00:02", "2024-05-01 10:00:04",
+    ]
+
+
+def test_latency_percentiles_of_no_paths():
+    latencies = compute_path_latencies(_planned(1, '7', "2024-05-01 10:00:00.000", None))
+    assert latencies.empty
+    assert list(latency_percentiles(latencies, 'bot_id').columns) == ['paths', 'p50', 'p90', 'p99', 'max']
+    assert latency_by_window(latencies, 60).empty
@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conflict_index import build_conflict_cells, build_hotspot_index, query_hotspots
+from log_parser import CONFLICT_TYPES
+
+TIMESTAMP = "2024-05-01 10:00:00.000"
+
+
+def _check(event_id, bot_id, anchor, span, conflict_type=None):
+    event = dict(event_id=event_id, event='conflict_check', timestamp=TIMESTAMP, bot_id=bot_id,
+                 anchor_coordinate={'x': anchor[0], 'y': anchor[1]}, span=span, conflict_found=True)
+    if conflict_type is not None:
+        event.update(conflict_reason=conflict_type.upper(), conflict_type=conflict_type)
+    return event
+
+
+EVENTS = [
+    _check(1, '7', (2, 0), (2, 0, 3, 0), 'time'),
+    _check(2, '8', (3, 0), (3, 1), 'reservation'),
+    dict(_check(3, '8', (9, 9), (9, 9, 9, 8)), conflict_found=False),
+    dict(event_id=4, event='conflict_detected', timestamp=TIMESTAMP, bot_id='9', coordinate={'x': 3, 'y': 0},
+         conflict_found=True, conflict_reason="TIME CONFLICT", conflict_type='time'),
+    # A conflict without a recognised reason counts as unknown
+    _check(5, '7', (5, 5), ()),
+    dict(event_id=6, event='chosen_node', timestamp=TIMESTAMP, bot_id='7', coordinate={'x': 3, 'y': 0},
+         from_coordinate={'x': 2, 'y': 0}),
+]
+
+
+def _cells(hotspots):
+    return hotspots.index.tolist()
+
+
+def test_conflict_cells_are_anchor_and_span_counted_once_per_check():
+    cells = build_conflict_cells(EVENTS)
+    assert sorted(zip(cells['row'].tolist(), cells['x'].tolist(), cells['y'].tolist())) == [
+        (0, 2, 0), (0, 3, 0), (1, 3, 0), (1, 3, 1), (3, 3, 0), (4, 5, 5),
+    ]
+    types = dict(zip(cells['row'].tolist(), cells['conflict_type'].tolist()))
+    assert types == {0: CONFLICT_TYPES.index('time'), 1: CONFLICT_TYPES.index('reservation'),
+                     3: CONFLICT_TYPES.index('time'), 4: -1}
+
+
+def test_hotspots_count_conflicts_per_cell():
+    hotspots = build_hotspot_index(EVENTS)
+    # Most contested cell first, ties in cell order
+    assert _cells(hotspots) == [(3, 0), (2, 0), (3, 1), (5, 5)]
+    contested = hotspots.loc[(3, 0)]
+    assert contested['count'] == 3
+    assert (contested['time_count'], contested['reservation_count'], contested['idle_count']) == (2, 1, 0)
+    assert contested['bots'] == 3 and contested['bot_ids'] == ['7', '8', '9']
+    assert hotspots.loc[(5, 5)]['unknown_count'] == 1
+
+
+def test_query_hotspots_filters_and_ranks():
+    hotspots = build_hotspot_index(EVENTS)
+    assert _cells(query_hotspots(hotspots, min_x=3)) == [(3, 0), (3, 1), (5, 5)]
+    assert _cells(query_hotspots(hotspots, max_x=3, min_y=1)) == [(3, 1)]
+    assert _cells(query_hotspots(hotspots, bot_id='9')) == [(3, 0)]
+    assert _cells(query_hotspots(hotspots, min_count=2)) == [(3, 0)]
+    assert _cells(query_hotspots(hotspots, top=2)) == [(3, 0), (2, 0)]
+    # Ranking by one conflict type uses that type's count
+    reservations = query_hotspots(hotspots, conflict_type='reservation')
+    assert _cells(reservations) == [(3, 0), (3, 1)]
+    assert reservations['count'].tolist() == [1, 1]
+
+
+def test_no_conflicts_give_an_empty_index():
+    hotspots = build_hotspot_index(EVENTS[2:3] + EVENTS[5:])
+    assert hotspots.empty
+    assert 'time_count' in hotspots.columns and 'unknown_count' in hotspots.columns
+    assert query_hotspots(hotspots, min_x=0).empty
@@ -0,0 +1,135 @@
+import os
+import shutil
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset_registry
+from dataset_registry import DatasetRegistry, file_content_hash
+from log_generator import LogGenerator
+from log_parser import PathLogParser
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "generated.log")
+    LogGenerator(seed=19).write(path, max_lines=3000)
+    return path
+
+
+def _other_log(tmp_path, seed):
+    path = str(tmp_path / f"generated_{seed}.log")
+    LogGenerator(seed=seed).write(path, max_lines=3000)
+    return path
+
+
+def test_acquire_parses_the_log(log_path):
+    registry = DatasetRegistry()
+    handle = registry.acquire(log_path)
+    dataset = handle.dataset
+    assert dataset.key == file_content_hash(log_path)
+    assert dataset.parse_job.wait(10)
+    assert dataset.events() == PathLogParser().parse_log_file(log_path)
+    assert registry.stats() == [{
+        'key': dataset.key, 'file': log_path, 'refcount': 1,
+        'memory_bytes': dataset.memory_bytes(), 'parsing': False,
+    }]
+    handle.release()
+
+
+def test_concurrent_acquires_load_the_content_once(log_path, tmp_path, monkeypatch):
+    built = []
+    entered = threading.Event()
+    proceed = threading.Event()
+
+    class SlowDataset(dataset_registry.Dataset):
+        def __init__(self, key, log_file_path):
+            built.append(log_file_path)
+            entered.set()
+            proceed.wait()
+            super().__init__(key, log_file_path)
+
+    monkeypatch.setattr(dataset_registry, 'Dataset', SlowDataset)
+    registry = DatasetRegistry()
+    copy_path = str(tmp_path / "copy.log")
+    shutil.copyfile(log_path, copy_path)
+    paths = [log_path, copy_path, log_path, copy_path]
+    handles = [None] * len(paths)
+
+    def acquire(i):
+        handles[i] = registry.acquire(paths[i])
+
+    threads = [threading.Thread(target=acquire, args=(i,)) for i in range(len(paths))]
+    threads[0].start()
+    assert entered.wait(10)
+    for thread in threads[1:]:
+        thread.start()
+    proceed.set()
+    for thread in threads:
+        thread.join(10)
+    # Files with the same content share one dataset, loaded once
+    assert built == [log_path]
+    assert len({id(handle.dataset) for handle in handles}) == 1
+    assert handles[0].dataset.refcount == len(paths)
+    for handle in handles:
+        handle.release()
+
+
+def test_refcount_follows_handles(log_path):
+    registry = DatasetRegistry()
+    first = registry.acquire(log_path)
+    second = registry.acquire(log_path)
+    dataset = first.dataset
+    assert second.dataset is dataset
+    assert dataset.refcount == 2
+    first.release()
+    assert first.released and not second.released
+    assert dataset.refcount == 1
+    # Releasing a handle again has no effect
+    first.release()
+    assert dataset.refcount == 1
+    second.release()
+    assert dataset.refcount == 0
+    # An unreferenced dataset within budget stays loaded and is shared again
+    third = registry.acquire(log_path)
+    assert third.dataset is dataset
+    assert dataset.refcount == 1
+    third.release()
+
+
+def test_garbage_collected_handle_releases_its_reference(log_path):
+    registry = DatasetRegistry()
+    handle = registry.acquire(log_path)
+    dataset = handle.dataset
+    del handle
+    assert dataset.refcount == 0
+
+
+def test_unreferenced_datasets_are_evicted_least_recently_used_first(log_path, tmp_path):
+    registry = DatasetRegistry()
+    paths = [log_path, _other_log(tmp_path, 23), _other_log(tmp_path, 29)]
+    handles = [registry.acquire(path) for path in paths]
+    datasets = [handle.dataset for handle in handles]
+    for dataset in datasets:
+        assert dataset.parse_job.wait(10)
+    handles[1].release()
+    handles[0].release()
+    assert len(registry.stats()) == 3
+    sizes = [dataset.memory_bytes() for dataset in datasets]
+    # Room for two of the three datasets; eviction runs on the next release
+    registry.memory_budget = sum(sizes) - min(sizes) // 2
+    extra = registry.acquire(paths[2])
+    extra.release()
+    # Dataset 1 was released first, so it is the least recently used
+    assert [stats['key'] for stats in registry.stats()] == [datasets[0].key, datasets[2].key]
+    assert datasets[1].parse_job._cancelled.is_set()
+    # Referenced datasets are kept even when over budget
+    registry.memory_budget = 0
+    extra = registry.acquire(paths[2])
+    extra.release()
+    assert [stats['key'] for stats in registry.stats()] == [datasets[2].key]
+    handles[2].release()
+    assert registry.stats() == []
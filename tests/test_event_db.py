@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_db import EventDatabase
+from log_generator import LogGenerator
+from log_parser import PathLogParser
+from query_service import EventQueryIndex
+from utils import get_path_calculation_events
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "generated.log")
+    LogGenerator(seed=13).write(path, max_lines=5000)
+    return path
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = EventDatabase(str(tmp_path / "events.db"), max_cached_segments=2)
+    yield database
+    database.close()
+
+
+def _json(events):
+    """The events as their JSON records decode (tuples become lists)."""
+    return json.loads(json.dumps(events))
+
+
+def _all_pages(store, limit, **filters):
+    rows = []
+    cursors = []
+    page, cursor = store.page(limit=limit, **filters)
+    rows.extend(page.tolist() if hasattr(page, 'tolist') else list(page))
+    while cursor is not None:
+        cursors.append(cursor)
+        page, cursor = store.page(cursor=cursor, limit=limit, **filters)
+        assert 0 < len(page) <= limit
+        rows.extend(page.tolist() if hasattr(page, 'tolist') else list(page))
+    return rows, cursors
+
+
+def test_import_numbers_rows_and_skips_repeated_content(log_path, database):
+    events = PathLogParser().parse_log_file(log_path)
+    assert database.import_log(log_path) == len(events)
+    assert database.import_log(log_path) == 0
+    assert database.import_events(events[:10], source="again") == 10
+    assert len(database) == len(events) + 10
+    assert database.log_count() == 2
+    assert database.events(range(len(events), len(events) + 10)) == _json(events[:10])
+    assert json.loads(database.record(3)) == _json(events[3])
+    assert database.record(len(database)) is None
+
+
+def test_cursor_pages_match_query_index(log_path, database):
+    events = PathLogParser().parse_log_file(log_path)
+    database.import_events(events)
+    index = EventQueryIndex(events)
+    bot_id = index.bot_ids[0]
+    for filters in ({}, {'bot_id': bot_id}, {'where': "event == chosen_node and x < 20"},
+                    {'time_from': "2024-05-01 10:00:03", 'time_to': "2024-05-01 10:00:20"}):
+        expected = list(index.query(**filters))
+        assert expected
+        assert database.query(**filters).tolist() == expected
+        for store in (index, database):
+            rows, cursors = _all_pages(store, 7, **filters)
+            assert rows == expected
+            # Each cursor is the first row of its page
+            assert cursors == expected[7::7]
+
+
+def test_segments_load_the_rows_of_their_path(log_path, database):
+    events = PathLogParser().parse_log_file(log_path)
+    database.import_events(events)
+    paths = get_path_calculation_events(events)
+    segments = database.segments_for_bot()
+    assert len(segments) == len(paths)
+    for segment, path in zip(segments, paths):
+        end = path['end_idx'] if path['end_idx'] is not None else len(events) - 1
+        assert segment['closed'] == (path['end_idx'] is not None)
+        assert database.load_segment(segment['segment']) == _json(events[path['start_idx']:end + 1])
+    # Only the max_cached_segments most recently loaded segments are kept
+    assert len(database.cached_segments()) == 2
+    assert database.load_segment(len(segments)) == []
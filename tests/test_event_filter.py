@@ -0,0 +1,100 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_db import EventDatabase
+from event_filter import compile_filter
+from event_store import build_event_columns
+from log_generator import LogGenerator
+from log_parser import PathLogParser
+
+EVENTS = [
+    {'event_id': 1, 'event': 'chosen_node', 'timestamp': "2024-05-01 10:00:01.000", 'bot_id': '7',
+     'coordinate': {'x': 3, 'y': 4}, 'from_coordinate': {'x': 2, 'y': 4}, 'bot_direction': 'east'},
+    {'event_id': 2, 'event': 'exploring_node', 'timestamp': "2024-05-01 10:00:02.000", 'bot_id': '7',
+     'coordinate': {'x': 4, 'y': 4}, 'bot_direction': 'north', 'status': 'rejected'},
+    {'event_id': 3, 'event': 'conflict_check', 'timestamp': "2024-05-01 10:00:03.000", 'bot_id': '12',
+     'anchor_coordinate': {'x': 10, 'y': 1}, 'span': (10, 1), 'conflict_found': True,
+     'conflict_reason': "TIME CONFLICT", 'conflict_type': 'time'},
+    {'event_id': 4, 'event': 'path_calculation_ended', 'timestamp': None, 'bot_id': '12',
+     'status': 'success', 'path_length': 3.0},
+]
+
+
+def _rows(expression, events=EVENTS):
+    return compile_filter(expression).rows(build_event_columns(events)).tolist()
+
+
+@pytest.mark.parametrize("expression", [
+    "",
+    "x >",
+    "colour == red",
+    "event == walking",
+    "event < chosen_node",
+    "x between 1",
+    "(x == 1",
+    "x == 1 y == 2",
+    "t between 10:00:00 and '2024-05-01 10:00:05'",
+    "x == $",
+])
+def test_invalid_expressions_raise_value_error(expression):
+    with pytest.raises(ValueError):
+        compile_filter(expression)
+
+
+def test_masks_over_event_columns():
+    assert _rows("event == chosen_node") == [0]
+    assert _rows("event in (chosen_node, conflict_check)") == [0, 2]
+    assert _rows("event not in (chosen_node, conflict_check)") == [1, 3]
+    assert _rows("bot_id == 12") == [2, 3]
+    assert _rows("bot_id == 99") == []
+    assert _rows("x between 3 and 4 and y == 4") == [0, 1]
+    # not negates the whole condition, so it also selects the event without a coordinate
+    assert _rows("not x < 5") == [2, 3]
+    assert _rows("rejected or conflict_found") == [1, 2]
+    assert _rows("direction == north") == [1]
+    assert _rows("conflict_type == time") == [2]
+    # Events without a value for a field match no condition on it
+    assert _rows("t > 10:00:01.500") == [1, 2]
+    assert _rows("t <= '2024-05-01 10:00:02'") == [0, 1]
+    assert _rows("from_x == 2 or from_x != 2") == [0]
+
+
+def test_mask_is_boolean_and_aligned_with_events():
+    mask = compile_filter("bot_id == 7").mask(build_event_columns(EVENTS))
+    assert mask.dtype == np.bool_
+    assert mask.tolist() == [True, True, False, False]
+
+
+def test_masks_and_sql_select_the_same_rows(tmp_path):
+    log_path = str(tmp_path / "generated.log")
+    LogGenerator(seed=11).write(log_path, max_lines=5000)
+    events = PathLogParser().parse_log_file(log_path)
+    database = EventDatabase(str(tmp_path / "events.db"))
+    database.import_events(events)
+    columns = build_event_columns(events)
+    bot_id = columns['bot_ids'][0]
+    try:
+        for expression in [
+            "event == chosen_node",
+            f"bot_id == {bot_id} and event in (added_node, chosen_node)",
+            "x between 5 and 20 and not y > 10",
+            "event != exploring_node or x < 3",
+            "t > 10:00:05 and t < 10:00:30",
+            "t between '2024-05-01 10:00:02' and '2024-05-01 10:00:09.500'",
+            f"not (bot_id in ({bot_id}, nobody) or x >= 4)",
+        ]:
+            rows = compile_filter(expression).rows(columns)
+            assert len(rows) > 0, expression
+            assert database.query(where=expression).tolist() == rows.tolist(), expression
+    finally:
+        database.close()
+
+
+def test_sql_rejects_fields_the_database_does_not_store():
+    with pytest.raises(ValueError):
+        compile_filter("rejected and x == 1").sql()
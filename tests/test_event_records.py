@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_records import EventRecord, event_record, events_to_dicts
+from log_generator import LogGenerator
+from log_parser import PathLogParser
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "generated.log")
+    LogGenerator(seed=17).write(path, max_lines=5000)
+    return path
+
+
+def test_records_equal_the_default_dicts(log_path):
+    events = PathLogParser().parse_log_file(log_path)
+    records = PathLogParser(records=True).parse_log_file(log_path)
+    assert len(records) == len(events)
+    assert all(isinstance(record, EventRecord) for record in records)
+    assert not any(isinstance(event, EventRecord) for event in events)
+    assert records == events
+    assert events_to_dicts(records) == events
+    # Every event type of the log is covered
+    assert len({event['event'] for event in events}) > 5
+
+
+def test_records_round_trip_through_dicts(log_path):
+    for event in PathLogParser().parse_log_file(log_path):
+        record = event_record(event)
+        assert record == event
+        assert record.to_dict() == event
+        assert list(record.to_dict()) == list(event)
+        assert event_record(record) is record
+        assert json.loads(json.dumps(record.to_dict())) == json.loads(json.dumps(event))
+
+
+def test_dict_style_reads_match_the_dict(log_path):
+    for event in PathLogParser().parse_log_file(log_path):
+        record = event_record(event)
+        assert list(record) == list(event)
+        assert dict(record.items()) == event
+        for key, value in event.items():
+            assert key in record
+            assert record[key] == value
+            assert record.get(key) == value
+        assert 'no_such_field' not in record
+        assert record.get('no_such_field', 'default') == 'default'
+        with pytest.raises(KeyError):
+            record['no_such_field']
+
+
+def test_records_are_not_hashable_and_compare_by_value():
+    event = {'event_id': 4, 'event': 'path_calculation_ended', 'timestamp': "2024-05-01 10:00:05.000",
+             'bot_id': '7', 'status': 'success', 'path_length': 2.0}
+    record = event_record(event)
+    assert record == event_record(dict(event))
+    assert record != dict(event, path_length=3.0)
+    with pytest.raises(TypeError):
+        hash(record)
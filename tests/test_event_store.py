@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import DIRECTION_CODES, EVENT_TYPE_CODES, MISSING, build_event_columns, event_direction
+from log_generator import LogGenerator
+from log_parser import CONFLICT_TYPES, DIRECTIONS, PathLogParser
+
+
+def _parse(tmp_path):
+    log_path = str(tmp_path / "generated.log")
+    LogGenerator(seed=37).write(log_path, max_lines=5000)
+    return PathLogParser().parse_log_file(log_path)
+
+
+def test_direction_column_follows_directions(tmp_path):
+    events = _parse(tmp_path)
+    columns = build_event_columns(events)
+    direction = columns['direction']
+    assert direction.dtype == np.int8
+    assert DIRECTION_CODES == {'north': 0, 'east': 1, 'south': 2, 'west': 3}
+    for row, event in enumerate(events):
+        name = event_direction(event)
+        assert direction[row] == (DIRECTION_CODES[name] if name is not None else MISSING)
+    assert set(direction.tolist()) - {MISSING} == set(range(len(DIRECTIONS)))
+    # Path starts take the direction of their source node
+    starts = np.flatnonzero(columns['event'] == EVENT_TYPE_CODES['path_calculation_started'])
+    assert (direction[starts] != MISSING).all()
+
+
+def test_categorical_fields_share_one_string_per_value(tmp_path):
+    events = _parse(tmp_path)
+    values = {}
+    for event in events:
+        for key in ('bot_id', 'bot_direction', 'physical_direction', 'rack_direction', 'turn_tag',
+                    'moving_status', 'conflict_type', 'rejection_reason'):
+            value = event.get(key)
+            if isinstance(value, str):
+                assert values.setdefault((key, value), value) is value, (key, value)
+    assert any(key == 'bot_id' for key, _ in values)
+    # Directions and conflict types are the constants themselves
+    for (key, value), shared in values.items():
+        if key.endswith('direction') and value in DIRECTIONS:
+            assert shared is DIRECTIONS[DIRECTIONS.index(value)]
+        if key == 'conflict_type':
+            assert shared is CONFLICT_TYPES[CONFLICT_TYPES.index(value)]
@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_generator import LogGenerator
+from log_parser import CONFLICT_TIME, PathLogParser
+from path_index import build_path_offset_index
+
+PREFIX = "2024-05-01 10:00:00.004 [info] <0.14.0>@planner:run:1 butler_id=7 "
+
+
+def _time_conflicts(events):
+    return [event for event in events if event['event'] == 'conflict_detected']
+
+
+def test_time_conflict_node_after_marker():
+    line = PREFIX + "not included {{40,15}, west, west, north}, reason = TIME CONFLICT with butler 10"
+    conflicts = _time_conflicts(PathLogParser().parse_lines([line]))
+    assert len(conflicts) == 1
+    assert conflicts[0]['coordinate'] == {'x': 40, 'y': 15}
+    assert conflicts[0]['conflict_reason'] == "TIME CONFLICT with butler 10"
+    assert conflicts[0]['conflict_type'] == CONFLICT_TIME
+
+
+def test_time_conflict_node_before_marker():
+    line = PREFIX + "{{3,4}, east} not included, reason = TIME CONFLICT at 10:00:01, other"
+    conflicts = _time_conflicts(PathLogParser().parse_lines([line]))
+    assert len(conflicts) == 1
+    assert conflicts[0]['coordinate'] == {'x': 3, 'y': 4}
+    assert conflicts[0]['conflict_reason'] == "TIME CONFLICT at 10:00:01"
+
+
+def test_generated_time_conflicts_in_both_layouts(tmp_path):
+    log_path = str(tmp_path / "generated.log")
+    LogGenerator(seed=3).write(log_path, max_lines=20000)
+    with open(log_path) as file:
+        lines = file.readlines()
+    marker_lines = [line for line in lines if "not included" in line]
+    assert any(line.find("{{") < line.find("not included") for line in marker_lines)
+    assert any(line.find("{{") > line.find("not included") for line in marker_lines)
+
+    for events in (PathLogParser().parse_log_file(log_path), PathLogParser().parse_lines(lines)):
+        assert len(_time_conflicts(events)) == len(marker_lines)
+        rejected = [event for event in events if event.get('status') == 'rejected']
+        assert len(rejected) == len(marker_lines)
+
+
+def test_segment_event_ids_match_full_parse(tmp_path):
+    log_path = str(tmp_path / "generated.log")
+    LogGenerator(seed=5).write(log_path, max_lines=20000)
+    by_id = {event['event_id']: event for event in PathLogParser().parse_log_file(log_path)}
+    index = build_path_offset_index(log_path)
+    assert len(index) > 1
+    for segment_id in range(len(index)):
+        for event in index.load_segment(segment_id):
+            assert by_id[event['event_id']] == event
+
+
+def test_negative_coordinates_are_rejected():
+    lines = [
+        PREFIX + "#path_calculation_started SRC = {{-3,4},north,north} DEST = {{5,5},north}",
+        PREFIX + "#chosen_node = {{-3,4}, {2,4}, rest, butler_moving, north, north, rack, no_turn_rotate}, "
+                 "GCost = 1, HCost = 2, FScore = 3",
+        PREFIX + "\"#added_node\", Coor = {3,-4}, FromCoor = {2,4}, TurnTag = rest, GCost = 1",
+        PREFIX + "not included {{-40,15}, west, west, north}, reason = TIME CONFLICT with butler 10",
+    ]
+    events = PathLogParser().parse_lines(lines)
+    assert events[0]['event'] == 'path_calculation_started'
+    assert 'coordinate' not in events[0]['src']
+    assert all(event['event'] != 'chosen_node' for event in events)
+    for event in events:
+        assert event.get('coordinate') is None or min(event['coordinate'].values()) >= 0
+
+
+HAND_WRITTEN_LOG = [
+    "#path_calculation_started SRC = {{1,1},north,north} DEST = {{3,1},north}",
+    "#exploring_node = {{2,1}, east, east, north}",
+    "not included {{2,1}, east, east, north}, reason = already in closed list",
+    "#chosen_node = {{2,1}, {1,1}, rest, butler_moving, east, east, north, no_turn_rotate}, "
+    "GCost = 1, HCost = 1, FScore = 2",
+    "#processing_node = {{-2,1}, {1,1}, rest, butler_moving, east, east, north}",
+    "#neighbour_nodes = [{{3,1},east,north,rest,butler_moving}] not included",
+    "Path Calculation Ended successfully, path length = 2",
+    "#path_calculation_started SRC = {{3,1},east,north} DEST = {{3,4},north}",
+    "#conflict_check AnchorCoord = {3,2} SpanCoords = [{3,2}] not included",
+    "#conflict_check [Check End] Reservation Conflict List = [] MovableIdleBots = []",
+    "#exploring_node = {{3,2}, north, north, north} #added_node",
+    "PATH CALCULATION ENDED, path length = 3",
+]
+
+
+def test_segment_event_ids_match_full_parse_of_hand_written_log(tmp_path):
+    log_path = str(tmp_path / "hand.log")
+    with open(log_path, "w") as file:
+        file.writelines(PREFIX + line + "\n" for line in HAND_WRITTEN_LOG)
+    events = PathLogParser().parse_log_file(log_path)
+    starts = [event['event_id'] for event in events if event['event'] == 'path_calculation_started']
+    index = build_path_offset_index(log_path)
+    assert [segment['first_event_id'] for segment in index.segments] == starts
+    for segment_id in range(len(index)):
+        segment_events = index.load_segment(segment_id)
+        first = segment_events[0]['event_id']
+        assert segment_events == events[first - 1:first - 1 + len(segment_events)]
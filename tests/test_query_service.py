@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query_service import EventQueryIndex, page_rows
+
+EVENTS = [
+    {'event_id': 1, 'event': 'path_calculation_started', 'timestamp': "2024-05-01 10:00:01.000", 'bot_id': '7',
+     'src': {'coordinate': {'x': 1, 'y': 1}, 'bot_direction': 'north'}, 'dest': {'coordinate': {'x': 3, 'y': 1}}},
+    {'event_id': 2, 'event': 'chosen_node', 'timestamp': "2024-05-01 10:00:02.000", 'bot_id': '7',
+     'coordinate': {'x': 2, 'y': 1}, 'from_coordinate': {'x': 1, 'y': 1}},
+    {'event_id': 3, 'event': 'path_calculation_started', 'timestamp': "2024-05-01 10:00:02.000", 'bot_id': '8',
+     'src': {'coordinate': {'x': 5, 'y': 5}, 'bot_direction': 'east'}, 'dest': {'coordinate': {'x': 3, 'y': 1}}},
+    {'event_id': 4, 'event': 'chosen_node', 'timestamp': "2024-05-01 10:00:04.000", 'bot_id': '8',
+     'coordinate': {'x': 6, 'y': 5}, 'from_coordinate': {'x': 5, 'y': 5}},
+    {'event_id': 5, 'event': 'path_calculation_ended', 'timestamp': "2024-05-01 10:00:05.000", 'bot_id': '7',
+     'status': 'success', 'path_length': 2.0},
+]
+
+
+def test_page_rows_cursors_are_row_numbers():
+    rows = [2, 5, 9, 14]
+    assert page_rows(rows, limit=2) == ([2, 5], 9)
+    assert page_rows(rows, cursor=9, limit=2) == ([9, 14], None)
+    # A cursor between rows starts at the next matching row
+    assert page_rows(rows, cursor=6, limit=1) == ([9], 14)
+    assert page_rows(rows, cursor=15) == ([], None)
+    assert page_rows(range(10), cursor=8, limit=5) == (range(8, 10), None)
+
+
+def test_query_filters():
+    index = EventQueryIndex(EVENTS, batch_size=2)
+    assert index.query() == range(5)
+    assert index.query(bot_id='7').tolist() == [0, 1, 4]
+    assert index.query(bot_id='9').tolist() == []
+    assert index.query(timestamp="2024-05-01 10:00:02").tolist() == [1, 2]
+    assert index.query(time_from="2024-05-01 10:00:02", time_to="2024-05-01 10:00:04").tolist() == [1, 2, 3]
+    assert index.query(time_from="2024-05-01 10:00:04.500").tolist() == [4]
+    assert index.query(dest=(3, 1)).tolist() == [0, 2]
+    assert index.query(start=(5, 5), dest=(3, 1)).tolist() == [2]
+    assert index.query(bot_id='7', where="event == chosen_node").tolist() == [1]
+    assert index.query(timestamp="not a time").tolist() == []
+    with pytest.raises(ValueError):
+        index.query(bot_id='9', where="event ==")
+
+
+def test_pages_follow_cursors_over_a_filter():
+    index = EventQueryIndex(EVENTS)
+    rows, cursor = index.page(limit=2, where="event != chosen_node")
+    assert rows.tolist() == [0, 2] and cursor == 4
+    rows, cursor = index.page(cursor=cursor, limit=2, where="event != chosen_node")
+    assert rows.tolist() == [4] and cursor is None
+
+
+def test_records_are_compact_json_and_project_fields():
+    index = EventQueryIndex(EVENTS)
+    assert json.loads(index.record(1)) == EVENTS[1]
+    assert index.record(5) is None
+    chunks = list(index.record_chunks(index.query(bot_id='8'), fields={'event_id', 'event'}))
+    assert [json.loads(record) for chunk in chunks for record in chunk] == [
+        {'event_id': 3, 'event': 'path_calculation_started'},
+        {'event_id': 4, 'event': 'chosen_node'},
+    ]
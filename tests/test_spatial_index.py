@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import EVENT_TYPE_CODES, MISSING, build_event_columns
+from log_generator import LogGenerator
+from log_parser import PathLogParser
+from spatial_index import MAX_TILES_ACROSS, build_spatial_index, build_tile_pyramid
+
+
+@pytest.fixture
+def columns(tmp_path):
+    log_path = str(tmp_path / "generated.log")
+    LogGenerator(seed=31).write(log_path, max_lines=5000)
+    return build_event_columns(PathLogParser().parse_log_file(log_path))
+
+
+def _scan(columns, min_x, min_y, max_x, max_y, min_row=0, max_row=None):
+    """The rows a query should return, found by scanning every event."""
+    x, y = columns['x'], columns['y']
+    rows = np.arange(len(x))
+    inside = (x != MISSING) & (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+    inside |= columns['event'] == EVENT_TYPE_CODES['path_calculation_started']
+    inside &= rows >= min_row
+    if max_row is not None:
+        inside &= rows <= max_row
+    return rows[inside].tolist()
+
+
+def test_viewport_queries_match_a_full_scan(columns):
+    index = build_spatial_index(None, columns, bucket_size=8)
+    assert len(index) == int(((columns['x'] != MISSING) & (columns['y'] != MISSING)).sum())
+    n = len(columns['x'])
+    for viewport in [(0, 0, 1000, 1000), (3, 5, 17, 16), (8, 8, 15, 15), (-10, -10, 4, 4), (500, 500, 600, 600)]:
+        for min_row, max_row in [(0, None), (0, n // 3), (n // 4, n // 2)]:
+            expected = _scan(columns, *viewport, min_row=min_row, max_row=max_row)
+            assert index.query(*viewport, min_row=min_row, max_row=max_row).tolist() == expected
+
+
+def test_path_starts_are_returned_for_every_viewport(columns):
+    index = build_spatial_index(None, columns)
+    starts = np.flatnonzero(columns['event'] == EVENT_TYPE_CODES['path_calculation_started'])
+    assert len(starts) > 0
+    assert index.query(500, 500, 600, 600).tolist() == starts.tolist()
+
+
+def test_tile_counts_cover_the_located_events(columns):
+    pyramid = build_tile_pyramid(None, columns, min_tile_size=4)
+    located = (columns['x'] != MISSING) & (columns['y'] != MISSING)
+    sizes = [level['size'] for level in pyramid.levels]
+    assert sizes[0] == 4 and all(b == 2 * a for a, b in zip(sizes, sizes[1:]))
+    # The coarsest tile covers every coordinate
+    assert len(pyramid.levels[-1]['tile_x']) == 1
+    max_row = len(located) // 2
+    for level in pyramid.levels:
+        tile_x, tile_y, counts = pyramid.tiles(level)
+        assert counts.sum() == located.sum()
+        assert (tile_x % level['size'] == 0).all() and (tile_y % level['size'] == 0).all()
+        assert pyramid.tiles(level, max_row=max_row)[2].sum() == located[:max_row + 1].sum()
+
+    level = pyramid.levels[0]
+    tile_x, tile_y, counts = pyramid.tiles(level, viewport=(0, 0, 7, 3))
+    assert set(zip(tile_x.tolist(), tile_y.tolist())) <= {(0, 0), (4, 0)}
+    x, y = columns['x'], columns['y']
+    assert counts.sum() == (located & (x < 8) & (y < 4)).sum()
+
+
+def test_extent_and_level_for(columns):
+    pyramid = build_tile_pyramid(None, columns)
+    located = (columns['x'] != MISSING) & (columns['y'] != MISSING)
+    x, y = columns['x'][located], columns['y'][located]
+    assert pyramid.extent() == (x.min(), y.min(), x.max(), y.max())
+    assert pyramid.level_for(10, 10) is pyramid.levels[0]
+    width = pyramid.levels[1]['size'] * MAX_TILES_ACROSS
+    assert pyramid.level_for(width, 1) is pyramid.levels[1]
+    assert pyramid.level_for(10 ** 9, 10 ** 9) is pyramid.levels[-1]
+
+
+def test_events_without_coordinates_give_no_tiles():
+    events = [{'event_id': 1, 'event': 'path_calculation_ended', 'timestamp': None, 'bot_id': '7',
+               'status': 'success', 'path_length': 0.0}]
+    pyramid = build_tile_pyramid(events)
+    assert pyramid.levels == []
+    assert pyramid.extent() is None
+    assert pyramid.level_for(10, 10) is None
+    assert build_spatial_index(events).query(0, 0, 10, 10).tolist() == []
@@ -1,9 +1,9 @@
 import os
 import json
-import pandas as pd
-import streamlit as st
 import tempfile
 
+from event_records import events_to_dicts
+
 def get_log_files(directory="."):
     """Get list of log files in the directory."""
     log_files = []
@@ -22,7 +22,18 @@ def extract_bot_id_from_filename(filename):
 
 def events_to_dataframe(events):
     """Convert parsed events to a pandas DataFrame."""
-    return pd.DataFrame(events)
+    # Imported here so the parser helpers stay usable without pandas
+    import pandas as pd
+    return pd.DataFrame(events_to_dicts(events))
+
+def span_cells(event):
+    """Get the (x, y) span cells of a conflict check from its flat span tuple."""
+    span = event.get('span') or ()
+    return list(zip(span[0::2], span[1::2]))
+
+def span_labels(event):
+    """Get the span cells of a conflict check as "{x,y}" labels for display."""
+    return [f"{{{x},{y}}}" for x, y in span_cells(event)]
 
 def get_min_max_coordinates(events):
     """Get the minimum and maximum x,y coordinates from events."""
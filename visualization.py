@@ -1,13 +1,26 @@
 import streamlit as st                    
   
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import math
 
 from collections import defaultdict
 
+from analytics import (
+    compute_path_analytics,
+    compute_path_latencies,
+    latency_by_window,
+    latency_percentiles
+)
+from conflict_index import build_hotspot_index, query_hotspots
+from event_store import EVENT_TYPE_CODES, event_direction
+from log_parser import CONFLICT_TYPES, DIRECTIONS
+from spatial_index import LOD_THRESHOLD
+from utils import span_labels
+
+# Arrow offset of the current-position marker for each bot direction
+DIRECTION_ARROWS = dict(zip(DIRECTIONS, [(0, 0.5), (0.5, 0), (0, -0.5), (-0.5, 0)]))
+
 def track_priority_queue(events, current_step_idx):
     """Track the state of the priority queue up to the current step.
     The priority queue is updated based on added_node and chosen_node events:
@@ -16,58 +29,130 @@ def track_priority_queue(events, current_step_idx):
     Returns a list of nodes currently in the priority queue, sorted by F-score.
     """
     
-    priority_queue = []                    
+    # Queued nodes by (x, y), in the order they were first added
+    queue = {}
 
-    for i, event in enumerate(events[:current_step_idx+1]):
+    for event in events[:current_step_idx+1]:
         event_type = event.get('event')
         if event_type == 'added_node':
             # Adding node to priority queue
-            if all(k in event for k in ['coordinate', 'GCost', 'HCost', 'FScore']):
-                node = {
-                    'coordinate': event['coordinate'],
-                    'from_coordinate': event.get('from_coordinate'),
-                    'GCost': event['GCost'],
-                    'HCost': event['HCost'], 
-                    'FScore': event['FScore'],
-                    'bot_direction': event.get('bot_direction'),
-                    'physical_direction': event.get('physical_direction'),
-                    'rack_direction': event.get('rack_direction'),
-                    'turn_tag': event.get('turn_tag'),
-                    'moving_status': event.get('moving_status'),
-                    'pause_time': event.get('pause_time', 0)
-                }
-                # Checking if this node is already in the queue
-                existing_idx = None
-                for idx, q_node in enumerate(priority_queue):
-                    if (q_node['coordinate'].get('x') == node['coordinate'].get('x') and 
-                        q_node['coordinate'].get('y') == node['coordinate'].get('y')):
-                        existing_idx = idx
-                        break
-                if existing_idx is not None:
-                    # Update existing node if it has a better score
-                    if node['FScore'] < priority_queue[existing_idx]['FScore']:
-                        priority_queue[existing_idx] = node
-                else:
-                    # Add new node
-                    priority_queue.append(node)
-                    
+            if not all(k in event for k in ['coordinate', 'GCost', 'HCost', 'FScore']):
+                continue
+            cell = (event['coordinate'].get('x'), event['coordinate'].get('y'))
+            node = {
+                'coordinate': event['coordinate'],
+                'from_coordinate': event.get('from_coordinate'),
+                'GCost': event['GCost'],
+                'HCost': event['HCost'], 
+                'FScore': event['FScore'],
+                'bot_direction': event.get('bot_direction'),
+                'physical_direction': event.get('physical_direction'),
+                'rack_direction': event.get('rack_direction'),
+                'turn_tag': event.get('turn_tag'),
+                'moving_status': event.get('moving_status'),
+                'pause_time': event.get('pause_time', 0)
+            }
         elif event_type == 'chosen_node':
             # Remove node from priority queue
-            if 'coordinate' in event:
-                x, y = event['coordinate'].get('x'), event['coordinate'].get('y')
-                # Find and remove the node with matching coordinates
-                for idx, node in enumerate(priority_queue):
-                    if (node['coordinate'].get('x') == x and 
-                        node['coordinate'].get('y') == y):
-                        priority_queue.pop(idx)
-                        break            
+            if event.get('coordinate'):
+                queue.pop((event['coordinate'].get('x'), event['coordinate'].get('y')), None)
+            continue
+        else:
+            continue
+        
+        # A node already in the queue is replaced (in place) only by a better score
+        existing = queue.get(cell)
+        if existing is None or node['FScore'] < existing['FScore']:
+            queue[cell] = node
 
     # Ascending sort by FScore
+    priority_queue = list(queue.values())
     priority_queue.sort(key=lambda x: (x['FScore'], x['HCost']))
     return priority_queue
 
-def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max_y, event_type_filters=None):
-    current_events = events[:current_step_idx+1] if current_step_idx < len(events) else events                    
+def create_tile_overview(events, current_step_idx, tile_pyramid, extent):
+    """Build a low-zoom overview figure: event counts per tile instead of per-node markers."""
+    level = tile_pyramid.level_for(extent[2] - extent[0], extent[3] - extent[1])
+    size = level['size']
+    tile_x, tile_y, counts = tile_pyramid.tiles(level, current_step_idx, viewport=extent)
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=tile_x + size / 2,
+        y=tile_y + size / 2,
+        z=counts,
+        colorscale='Blues',
+        colorbar=dict(title='Events'),
+        hovertemplate="Tile center (%{x}, %{y})<br>Events: %{z}<extra></extra>",
+        name='Event Density'
+    ))
+
+    # The chosen path stays readable at any zoom, so it is drawn on top of the tiles
+    columns = tile_pyramid.columns
+    step_event = columns['event'][:current_step_idx + 1]
+    chosen = step_event == EVENT_TYPE_CODES['chosen_node']
+    if chosen.any():
+        fig.add_trace(go.Scattergl(
+            x=columns['x'][:current_step_idx + 1][chosen],
+            y=columns['y'][:current_step_idx + 1][chosen],
+            mode='lines',
+            line=dict(color='green', width=2),
+            name='Chosen Path'
+        ))
+
+    starts = np.flatnonzero(step_event == EVENT_TYPE_CODES['path_calculation_started'])
+    if len(starts):
+        start_event = events[starts[-1]]
+        src = start_event.get('src', {}).get('coordinate')
+        dest = start_event.get('dest', {}).get('coordinate')
+        if src:
+            fig.add_trace(go.Scatter(x=[src['x']], y=[src['y']], mode='markers',
+                                     marker=dict(color='blue', size=12, symbol='circle'), name='Source'))
+        if dest:
+            fig.add_trace(go.Scatter(x=[dest['x']], y=[dest['y']], mode='markers',
+                                     marker=dict(color='purple', size=12, symbol='circle'), name='Destination'))
+
+    if current_step_idx < len(columns['x']) and columns['x'][current_step_idx] >= 0:
+        fig.add_trace(go.Scatter(
+            x=[columns['x'][current_step_idx]],
+            y=[columns['y'][current_step_idx]],
+            mode='markers',
+            marker=dict(color='black', size=12, symbol='diamond'),
+            name='Current Position'
+        ))
+
+    fig.update_layout(
+        title=f'Warehouse Overview ({size}x{size} tiles)',
+        xaxis=dict(title='X Coordinate', range=[extent[0] - size, extent[2] + size]),
+        yaxis=dict(title='Y Coordinate', range=[extent[1] - size, extent[3] + size],
+                   scaleanchor='x', scaleratio=1),
+        hovermode='closest',
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    )
+    return fig
+
+def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max_y, event_type_filters=None,
+                              spatial_index=None, viewport=None, tile_pyramid=None):
+    """Build the grid figure for the events up to current_step_idx.
+
+    When a spatial_index and a viewport (min_x, min_y, max_x, max_y) are given,
+    only the events inside the viewport are drawn and the grid is limited to it.
+    When a tile_pyramid is given and the view is wider than LOD_THRESHOLD
+    cells, an aggregated tile overview is drawn instead of per-node layers.
+    """
+    if tile_pyramid is not None and tile_pyramid.levels:
+        extent = viewport or tile_pyramid.extent(current_step_idx)
+        if extent and max(extent[2] - extent[0], extent[3] - extent[1]) > LOD_THRESHOLD:
+            return create_tile_overview(events, current_step_idx, tile_pyramid, extent)
+
+    if spatial_index is not None and viewport is not None:
+        # Viewport culling: only events inside the requested area (plus the current event)
+        visible_rows = spatial_index.query(*viewport, max_row=current_step_idx)
+        if current_step_idx < len(events):
+            visible_rows = np.union1d(visible_rows, [current_step_idx])
+        current_events = [events[i] for i in visible_rows]
+    else:
+        current_events = events[:current_step_idx+1] if current_step_idx < len(events) else events                    
   
     if event_type_filters is None:
         event_type_filters = {
@@ -93,6 +178,7 @@ def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max
     src_coord = None
     dest_coord = None
     all_coords = [] # To determine relevant area on the plot/grid                                                                               
+    current_event = events[current_step_idx] if current_step_idx < len(events) else None
 
     for event in current_events:
         event_type = event.get('event')
@@ -146,7 +232,7 @@ def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max
                 all_coords.append((x, y))
               
           # Extracting neighbouring nodes if the current event is neighbour_nodes
-        if event_type == 'neighbour_nodes' and event == events[current_step_idx] and 'parsed_neighbors' in event:
+        if event_type == 'neighbour_nodes' and event is current_event and 'parsed_neighbors' in event:
             for neighbor in event['parsed_neighbors']:
                 if 'coordinate' in neighbor:
                     x, y = neighbor['coordinate'].get('x'), neighbor['coordinate'].get('y')
@@ -160,7 +246,9 @@ def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max
     # Determine the visible area based on the nodes we need to display
     # Add a small buffer around the area
     buffer = 2
-    if all_coords:
+    if spatial_index is not None and viewport is not None:
+        visible_min_x, visible_min_y, visible_max_x, visible_max_y = viewport
+    elif all_coords:
         visible_min_x = max(min_x, min(coord[0] for coord in all_coords) - buffer)
         visible_max_x = min(max_x, max(coord[0] for coord in all_coords) + buffer)
         visible_min_y = max(min_y, min(coord[1] for coord in all_coords) - buffer)
@@ -303,20 +391,14 @@ def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max
     #             name='Destination'
     #         ))
     
-    current_event = events[current_step_idx] if current_step_idx < len(events) else None
     if current_event:
         event_type = current_event.get('event')
         coord = None
-        direction = None
+        direction = event_direction(current_event)
         
         if 'coordinate' in current_event:
             coord = (current_event['coordinate'].get('x'), current_event['coordinate'].get('y'))
         
-        if 'bot_direction' in current_event:
-            direction = current_event['bot_direction']
-        elif 'src' in current_event and 'bot_direction' in current_event['src']:
-            direction = current_event['src']['bot_direction']
-        
         if coord and direction:
             fig.add_trace(go.Scatter(
                 x=[coord[0]],
@@ -326,15 +408,7 @@ def create_grid_visualization(events, current_step_idx, min_x, min_y, max_x, max
                 name='Current Position'
             ))
             
-            dx, dy = 0, 0
-            if direction == 'north':
-                dx, dy = 0, 0.5
-            elif direction == 'south':
-                dx, dy = 0, -0.5
-            elif direction == 'east':
-                dx, dy = 0.5, 0
-            elif direction == 'west':
-                dx, dy = -0.5, 0
+            dx, dy = DIRECTION_ARROWS.get(direction, (0, 0))
             
             fig.add_trace(go.Scatter(
                 x=[coord[0], coord[0] + dx],
@@ -465,8 +539,8 @@ def display_event_details(event):
         
         st.write(f"Conflict Found: {event.get('conflict_found')}")
         
-        if 'span_coords' in event:
-            spans = event.get('span_coords')
+        if 'span' in event:
+            spans = span_labels(event)
             span_display = spans[:5]
             if len(spans) > 5:
                 span_display.append('...')
@@ -703,6 +777,154 @@ def display_metrics(events):
         
         st.plotly_chart(fig, use_container_width=True)
 
+def display_parser_profile(profile):
+    """Display a ParserProfile: overall throughput, per-handler time and fallback hit rates."""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(label="Lines/sec", value=f"{profile.lines_per_second():,.0f}")
+    col2.metric(label="Candidate Lines", value=f"{profile.candidate_lines:,}")
+    col3.metric(label="Unmatched Lines", value=f"{profile.unmatched_lines:,}")
+    col4.metric(label="Dropped Lines", value=f"{profile.dropped_lines():,}")
+    st.caption(f"{profile.lines_read:,} lines ({profile.bytes_read / 1e6:,.1f} MB) parsed in {profile.seconds:.2f} s. "
+               "Dropped lines reached a handler but produced no event.")
+
+    st.markdown("**Time per handler**")
+    st.dataframe(profile.handler_rows(), use_container_width=True, hide_index=True, column_config={
+        'total_ms': st.column_config.NumberColumn("total ms", format="%.1f"),
+        'us_per_line': st.column_config.NumberColumn("µs/line", format="%.1f"),
+        'time_share': st.column_config.ProgressColumn("share of parse time", min_value=0.0, max_value=1.0)
+    })
+
+    st.markdown("**Fallback paths**")
+    st.dataframe(profile.fallback_rows(), use_container_width=True, hide_index=True, column_config={
+        'rate': st.column_config.ProgressColumn("hit rate", min_value=0.0, max_value=1.0)
+    })
+
+def display_path_analytics(events, analytics_df=None):
+    """Display planner efficiency metrics for every path in the log as a sortable table.
+
+    analytics_df can be passed in when compute_path_analytics was already run for the events.
+    """
+    if analytics_df is None:
+        analytics_df = compute_path_analytics(events)
+    if analytics_df.empty:
+        st.info("No path calculations found in the log.")
+        return
+    st.caption("One row per path calculation. Click a column header to sort.")
+    st.dataframe(analytics_df.round(3), use_container_width=True, hide_index=True)
+
+def display_latency_analytics(events, latencies=None):
+    """Display planning latency percentiles per bot and per time window, with a slowest-path drill-down.
+
+    latencies can be passed in when compute_path_latencies was already run for the events.
+    """
+    if latencies is None:
+        latencies = compute_path_latencies(events)
+    if latencies.empty:
+        st.info("No completed path calculations with timestamps found in the log.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        budget_ms = st.number_input("Cycle budget (ms)", min_value=1, value=100, step=10, key="latency_budget_ms")
+    with col2:
+        window_seconds = st.number_input("Time window (s)", min_value=1, value=60, step=10, key="latency_window_s")
+    with col3:
+        slowest_n = st.number_input("Slowest paths to show", min_value=1, value=10, step=5, key="latency_slowest_n")
+
+    over_budget = int((latencies['latency_ms'] > budget_ms).sum())
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    metric_col1.metric(label="Completed Paths", value=len(latencies))
+    metric_col2.metric(label="Over Budget", value=over_budget)
+    metric_col3.metric(label="Max Latency", value=f"{latencies['latency_ms'].max()} ms")
+
+    fig = go.Figure(go.Histogram(x=latencies['latency_ms'], nbinsx=50))
+    fig.add_vline(x=budget_ms, line_dash='dash', line_color='red')
+    fig.update_layout(
+        title="Planning Latency Distribution",
+        xaxis_title="Latency (ms)",
+        yaxis_title="Paths",
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("**Latency per bot (ms)**")
+    st.dataframe(latency_percentiles(latencies, 'bot_id').round(1), use_container_width=True)
+
+    st.markdown("**Latency per time window (ms)**")
+    st.dataframe(latency_by_window(latencies, window_seconds).round(1), use_container_width=True)
+
+    st.markdown(f"**Slowest {int(slowest_n)} paths**")
+    st.dataframe(latencies.nlargest(int(slowest_n), 'latency_ms'), use_container_width=True, hide_index=True)
+
+def display_conflict_hotspots(events, hotspots=None):
+    """Display the most contested grid cells across the whole log, with region/type/bot filters.
+
+    hotspots can be passed in when build_hotspot_index was already run for the events.
+    """
+    if hotspots is None:
+        hotspots = build_hotspot_index(events)
+    if hotspots.empty:
+        st.info("No conflicts found in the log.")
+        return
+
+    bot_ids = sorted({bot for bots in hotspots['bot_ids'] for bot in bots})
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        conflict_type = st.selectbox("Conflict type", ["All"] + CONFLICT_TYPES, key="hotspot_conflict_type")
+    with col2:
+        bot_id = st.selectbox("Bot involved", ["All"] + bot_ids, key="hotspot_bot_id")
+    with col3:
+        top = st.number_input("Cells to show", min_value=1, value=20, step=10, key="hotspot_top")
+
+    # Slider bounds need lo < hi, so widen single-row/column ranges by one cell
+    x_values = hotspots.index.get_level_values('x')
+    y_values = hotspots.index.get_level_values('y')
+    x_lo, y_lo = int(x_values.min()), int(y_values.min())
+    x_hi, y_hi = max(int(x_values.max()), x_lo + 1), max(int(y_values.max()), y_lo + 1)
+    region_col1, region_col2 = st.columns(2)
+    with region_col1:
+        x_range = st.slider("X range", x_lo, x_hi, (x_lo, x_hi), key="hotspot_x_range")
+    with region_col2:
+        y_range = st.slider("Y range", y_lo, y_hi, (y_lo, y_hi), key="hotspot_y_range")
+
+    result = query_hotspots(
+        hotspots,
+        min_x=x_range[0], max_x=x_range[1],
+        min_y=y_range[0], max_y=y_range[1],
+        conflict_type=None if conflict_type == "All" else conflict_type,
+        bot_id=None if bot_id == "All" else bot_id
+    )
+    if result.empty:
+        st.info("No conflicts match the selected filters.")
+        return
+
+    shown = result.head(int(top)).reset_index()
+    fig = go.Figure(go.Scatter(
+        x=result.index.get_level_values('x'),
+        y=result.index.get_level_values('y'),
+        mode='markers',
+        marker=dict(
+            color=result['count'],
+            colorscale='Reds',
+            size=10,
+            symbol='square',
+            showscale=True,
+            colorbar=dict(title='Conflicts')
+        ),
+        hovertext=[f"({x}, {y}): {c} conflicts" for (x, y), c in zip(result.index, result['count'])],
+        hoverinfo='text'
+    ))
+    fig.update_layout(
+        title="Conflict Hotspots",
+        xaxis_title="X Coordinate",
+        yaxis=dict(title="Y Coordinate", scaleanchor='x', scaleratio=1),
+        height=400,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(shown, use_container_width=True, hide_index=True)
+
 def calculate_path_metrics(events):
     if not events:
         return {}